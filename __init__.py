@@ -1,4 +1,4 @@
-from . import app, db, gui
+from . import app, db
 from .app import (
     UsageError,
     CommandError,
@@ -8,10 +8,18 @@ from .app import (
     DirectoryError,
     Root,
     load_technologies,
-    AVAILABLE_TEMPLATES,
     ADMINS_FILE_PATH,
     AVAILABLE_COMMANDS,
     main,
 )
 
-from .gui import LazyProjectGUI
+
+def __getattr__(name):
+    """Import the Qt-based GUI and the catalog-backed settings only when used."""
+    if name == "AVAILABLE_TEMPLATES":
+        return app.AVAILABLE_TEMPLATES
+    if name in ("gui", "LazyProjectGUI"):
+        from . import gui
+
+        return gui if name == "gui" else gui.LazyProjectGUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,11 +6,17 @@ and technology loading.
 
 Imports:
 - ProjectError, UsageError, CommandError, DirectoryError, TemplateError, 
-- AdminDataError: Custom error classes.
+- AdminDataError, OptionError, MaterializeError, ArchiveError, StorageError,
+  CancelledError, ManifestError, BatchError, DaemonError: Custom error classes.
 - TemplateCommands, Root: Classes or functions related to templates and root operations.
-- load_technologies: Function to load available technologies.
-- ADMINS_FILE_PATH, AVAILABLE_COMMANDS, AVAILABLE_TEMPLATES: Configuration constants.
-- technologies: Dictionary or list of technologies.
+- load_technologies, get_technologies, available_templates: Functions to load available
+  technologies and templates; the catalog is only read on first use.
+- ADMINS_FILE_PATH, BLOBS_DIR, MANIFESTS_DIR, SQLITE_FILE_PATH, STORAGE_BACKEND,
+  AVAILABLE_COMMANDS, AVAILABLE_TEMPLATES, DEFAULT_WORKERS, INLINE_FILE_LIMIT,
+  INLINE_TEMPLATE_LIMIT, MAX_FILE_SIZE: Configuration constants
+  (AVAILABLE_TEMPLATES is resolved lazily).
+- COMMAND_ARGUMENTS, CONSOLE_OPTIONS: The arguments and options listed by UsageError.
+- technologies: Dictionary or list of technologies (resolved lazily).
 - main: Entry point for managing commands.
 
 This module sets up the necessary components and configurations for the application.
@@ -23,12 +29,37 @@ from .settings import (
     DirectoryError,
     TemplateError,
     AdminDataError,
+    OptionError,
+    MaterializeError,
+    ArchiveError,
+    StorageError,
+    CancelledError,
+    ManifestError,
+    BatchError,
+    DaemonError,
     TemplateCommands,
     Root,
     load_technologies,
+    get_technologies,
+    available_templates,
     ADMINS_FILE_PATH,
+    BLOBS_DIR,
+    MANIFESTS_DIR,
+    SQLITE_FILE_PATH,
+    STORAGE_BACKEND,
     AVAILABLE_COMMANDS,
-    AVAILABLE_TEMPLATES,
-    technologies,
+    DEFAULT_WORKERS,
+    INLINE_FILE_LIMIT,
+    INLINE_TEMPLATE_LIMIT,
+    MAX_FILE_SIZE,
+    COMMAND_ARGUMENTS,
+    CONSOLE_OPTIONS,
 )
 from .manage import main
+
+
+def __getattr__(name):
+    """Resolve the catalog-backed settings (AVAILABLE_TEMPLATES, technologies) lazily."""
+    if name in ("AVAILABLE_TEMPLATES", "technologies"):
+        return getattr(settings, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
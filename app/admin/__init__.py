@@ -8,4 +8,10 @@ from .deploy_adm import (
     create_nested_files,
     create_project_files,
     create_project_files_two,
+    sync_project_files,
 )
+from .serialize_adm import scan_tree, update_tree, build_project_structure
+from .archive_adm import pack_template, unpack_template, read_archive_header
+from .render_adm import TemplateRenderer, compile_template, default_variables
+from .batch_adm import read_batch_manifest, run_batch
+from .ignore_adm import IgnoreMatcher, compile_rule, read_ignore_file
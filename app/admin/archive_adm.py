@@ -0,0 +1,212 @@
+"""
+This module packs templates into ASAR archives and scaffolds projects from them.
+
+An ASAR archive is a small pickled JSON header describing the file tree, with
+the offset and size of every file, followed by the concatenated file bodies.
+Unpacking maps the archive with mmap and writes each body straight from the
+mapping into its target file, without decoding it into Python strings.
+
+The layout is the one produced by the asar tool and read by asarPy, so the
+archives can be inspected with either.
+
+Functions:
+- pack_template: Packs a project tree into an ASAR archive.
+- read_archive_header: Reads the header of an ASAR archive.
+- unpack_template: Creates a project from an ASAR archive.
+
+Imports:
+- mmap: For reading file bodies directly from the archive.
+- struct: For the pickle framing of the archive header.
+"""
+
+import json
+import mmap
+import shutil
+import struct
+
+from app.settings import ArchiveError
+from db.tree import blob_store_of
+from .deploy_adm import create_project_files_two
+
+
+def _align4(size):
+    """Round size up to a multiple of 4, as pickle strings are padded."""
+    return (size + 3) & ~3
+
+
+def _build_header(tree, bodies, offset):
+    """
+    Build the ASAR header entries of a project tree.
+
+    Args:
+        tree (list): The project tree.
+        bodies (list): Receives the file nodes in archive order.
+        offset (int): Offset of the next file body in the data section.
+
+    Returns:
+        tuple: (header entries, offset after the last body).
+    """
+    entries = {}
+    for node in tree:
+        if node.get("is_folder"):
+            files, offset = _build_header(node.get("children", []), bodies, offset)
+            entries[node["name"]] = {"files": files}
+        else:
+            size = _node_size(node)
+            entries[node["name"]] = {"size": size, "offset": str(offset)}
+            bodies.append(node)
+            offset += size
+    return entries, offset
+
+
+def _node_size(node):
+    """Return the size in bytes of a file node body."""
+    if "blob" in node:
+        return node["size"]
+    return len((node.get("content") or "").encode("utf-8"))
+
+
+def pack_template(project_tree, archive_path, blob_store=None):
+    """
+    Pack a project tree into an ASAR archive.
+
+    Args:
+        project_tree (list): The structure of the project.
+        archive_path (str): Path of the archive to write.
+        blob_store (BlobStore): Store holding the bodies of blob file nodes.
+
+    Returns:
+        int: Number of files packed.
+    """
+    bodies = []
+    files, _ = _build_header(project_tree, bodies, 0)
+    header = json.dumps({"files": files}, ensure_ascii=False).encode("utf-8")
+    padded = _align4(len(header))
+    header_pickle = (
+        struct.pack("<II", 4 + padded, len(header))
+        + header
+        + b"\0" * (padded - len(header))
+    )
+
+    with open(archive_path, "wb") as archive:
+        archive.write(struct.pack("<II", 4, len(header_pickle)))
+        archive.write(header_pickle)
+        for node in bodies:
+            if "blob" in node:
+                store = blob_store_of(node, blob_store)
+                with open(store.path(node["blob"]), "rb") as blob:
+                    shutil.copyfileobj(blob, archive)
+            else:
+                archive.write((node.get("content") or "").encode("utf-8"))
+    return len(bodies)
+
+
+def read_archive_header(view):
+    """
+    Read the header of an ASAR archive.
+
+    Args:
+        view: Bytes-like view of the whole archive.
+
+    Returns:
+        tuple: (header dict, offset of the data section).
+
+    Raises:
+        ValueError: If the archive framing is invalid.
+    """
+    if len(view) < 16:
+        raise ValueError("archive is too short")
+    size_payload, header_pickle_size = struct.unpack_from("<II", view, 0)
+    if size_payload != 4:
+        raise ValueError("invalid size pickle")
+    _, header_size = struct.unpack_from("<II", view, 8)
+    if 16 + header_size > len(view):
+        raise ValueError("header exceeds archive size")
+    header = json.loads(bytes(view[16 : 16 + header_size]))
+    return header, 8 + header_pickle_size
+
+
+def _check_name(name):
+    """
+    Raise ValueError for a header entry name that is not a plain file name.
+
+    Archives come from other machines, so a name must not lead out of the
+    directory it is unpacked into ("..", an absolute path, a separator) or
+    be one the file system cannot hold (empty, NUL).
+    """
+    if name in ("", ".", "..") or "/" in name or "\\" in name or "\0" in name:
+        raise ValueError(f"invalid entry name {name!r}")
+
+
+def _tree_from_header(files, view, base, views):
+    """
+    Rebuild a project tree whose file nodes hold views into the archive.
+
+    Entry names are checked with _check_name, so the tree only writes below
+    the project directory.
+
+    Args:
+        files (dict): The "files" mapping of a header directory entry.
+        view (memoryview): View over the whole archive.
+        base (int): Offset of the data section.
+        views (list): Receives every slice so the caller can release them.
+
+    Returns:
+        list: The project tree.
+
+    Raises:
+        ValueError: For an invalid entry name or a body outside the archive.
+    """
+    tree = []
+    for name, entry in files.items():
+        _check_name(name)
+        if "files" in entry:
+            children = _tree_from_header(entry["files"], view, base, views)
+            tree.append({"name": name, "is_folder": True, "children": children})
+        else:
+            start = base + int(entry["offset"])
+            end = start + entry["size"]
+            if start < base or end < start or end > len(view):
+                raise ValueError(f"file '{name}' exceeds archive size")
+            data = view[start:end]
+            views.append(data)
+            tree.append({"name": name, "is_folder": False, "data": data})
+    return tree
+
+
+def unpack_template(archive_path, project_dir, project_name, workers=1):
+    """
+    Create a project from an ASAR archive.
+
+    The project layout is the same as deserializing the packed template.
+
+    Args:
+        archive_path (str): Path of the archive to read.
+        project_dir (str): The directory where the project will be created.
+        project_name (str): The name of the project.
+        workers (int): Number of threads used to write file contents.
+
+    Raises:
+        ArchiveError: If the archive cannot be read.
+    """
+    try:
+        with open(archive_path, "rb") as archive:
+            mapping = mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as exc:
+        raise ArchiveError(archive_path, str(exc)) from exc
+
+    views = []
+    try:
+        with memoryview(mapping) as view:
+            try:
+                header, base = read_archive_header(view)
+                tree = _tree_from_header(header.get("files", {}), view, base, views)
+            except (ValueError, KeyError, TypeError) as exc:
+                raise ArchiveError(archive_path, str(exc)) from exc
+            try:
+                create_project_files_two(project_dir, project_name, tree, workers)
+            finally:
+                for data in views:
+                    data.release()
+    finally:
+        mapping.close()
@@ -0,0 +1,278 @@
+"""
+This module creates many projects from one manifest in a single run.
+
+A manifest lists items of (technology, target directory, project name,
+variables), as a JSON list of objects (or an object with an "items" list) or
+as a CSV file with a header row. Every template the manifest needs is read
+from the catalog once, in the parent process. The items are then
+materialized by a process pool whose workers inherit the parsed templates, so
+no worker imports the app or parses the catalog again per project.
+
+Manifest fields:
+- name: The project name (required).
+- technology: The template; defaults to the technology part of the name.
+- dir: Target directory, relative to the batch directory; defaults to it.
+- variables: Placeholder values (JSON object). In a CSV manifest every other
+  non-empty column is a variable.
+
+Functions:
+- read_batch_manifest: Reads and validates the items of a manifest file.
+- run_batch: Materializes the items and reports outcomes and throughput.
+
+The metrics the pool workers record (see app.metrics) are merged into the
+registry of the parent, so --metrics-file covers the whole batch.
+
+Imports:
+- csv, json: For reading manifests.
+- concurrent.futures: For the process pool.
+"""
+
+import contextlib
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app import metrics
+from app.settings import ProjectError, ManifestError, BatchError
+from db.db import get_admin_data, parse_project_name
+from .deploy_adm import create_project_files_two, sync_project_files
+from .render_adm import default_variables
+
+_ITEM_FIELDS = ("name", "technology", "dir")
+
+# Templates of the running batch: technology -> project tree (None if unknown).
+# Set in the parent before the pool starts and in every worker by _init_worker.
+_templates = {}
+
+
+def _item(entry, number, manifest_path):
+    """Return a normalized item from a manifest entry."""
+    if not isinstance(entry, dict):
+        raise ManifestError(manifest_path, f"item {number} is not an object")
+    name = entry.get("name")
+    if not name or not isinstance(name, str):
+        raise ManifestError(manifest_path, f"item {number} has no name")
+    variables = entry.get("variables") or {}
+    if not isinstance(variables, dict):
+        raise ManifestError(manifest_path, f"item {number}: variables is not an object")
+    return {
+        "name": name,
+        "technology": entry.get("technology") or parse_project_name(name)[0],
+        "dir": entry.get("dir") or ".",
+        "variables": variables,
+    }
+
+
+def read_batch_manifest(manifest_path):
+    """
+    Read the items of a JSON or CSV manifest.
+
+    Args:
+        manifest_path (str): Path of the manifest; files ending in .csv are CSV.
+
+    Returns:
+        list: Items with "name", "technology", "dir" and "variables" keys.
+
+    Raises:
+        ManifestError: If the file cannot be read or an item is invalid.
+    """
+    try:
+        with open(manifest_path, "r", encoding="utf-8", newline="") as file:
+            if manifest_path.lower().endswith(".csv"):
+                entries = []
+                for row in csv.DictReader(file):
+                    entry = {key: row.get(key) for key in _ITEM_FIELDS}
+                    entry["variables"] = {
+                        key: value
+                        for key, value in row.items()
+                        if key and key not in _ITEM_FIELDS and value
+                    }
+                    entries.append(entry)
+            else:
+                entries = json.load(file)
+    except (OSError, ValueError, csv.Error) as exc:
+        raise ManifestError(manifest_path, str(exc)) from exc
+    if isinstance(entries, dict):
+        entries = entries.get("items")
+    if not isinstance(entries, list):
+        raise ManifestError(manifest_path, "expected a list of items")
+    return [
+        _item(entry, number, manifest_path)
+        for number, entry in enumerate(entries, start=1)
+    ]
+
+
+def _init_worker(templates):
+    """Install the parsed templates in a pool worker."""
+    global _templates
+    _templates = templates
+
+
+def _init_pool_worker(templates):
+    """
+    Initialize a pool worker: install the templates and drop the metrics a
+    forked worker inherits, which the parent already holds.
+    """
+    _init_worker(templates)
+    metrics.REGISTRY.reset()
+
+
+def _describe(error):
+    """Return the message of an unexpected error, prefixed with its type."""
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+def _materialize(item, options):
+    """
+    Create or sync one project; runs in a pool worker.
+
+    Returns:
+        tuple: (ok, file count, seconds, error message or None).
+    """
+    start = time.perf_counter()
+    tree = _templates.get(item["technology"])
+    if tree is None:
+        technology = item["technology"]
+        return False, 0, 0.0, f"Admin data not found for technology '{technology}'."
+    variables = dict(default_variables(item["name"]), **options["variables"])
+    variables.update(item["variables"])
+    try:
+        os.makedirs(item["dir"], exist_ok=True)
+        # The per-project messages would interleave across workers; the batch
+        # reports every item itself
+        with contextlib.redirect_stdout(io.StringIO()):
+            if options["sync"]:
+                summary = sync_project_files(
+                    item["dir"],
+                    item["name"],
+                    tree,
+                    workers=options["workers"],
+                    delete_extras=options["delete_extras"],
+                    variables=variables,
+                )
+                files = summary["created"] + summary["updated"] + summary["skipped"]
+            else:
+                files = create_project_files_two(
+                    item["dir"],
+                    item["name"],
+                    tree,
+                    workers=options["workers"],
+                    variables=variables,
+                )
+    except ProjectError as e:
+        return False, 0, time.perf_counter() - start, e.message
+    except OSError as e:
+        return False, 0, time.perf_counter() - start, str(e)
+    except Exception as e:  # pylint: disable=broad-except
+        # Any other failure (e.g. a render error) is this item's, not the batch's
+        return False, 0, time.perf_counter() - start, _describe(e)
+    return True, files, time.perf_counter() - start, None
+
+
+def _materialize_in_worker(item, options):
+    """
+    Run _materialize in a pool worker and hand its metrics to the parent.
+
+    Returns:
+        tuple: (outcome of _materialize, metrics recorded by the item).
+    """
+    outcome = _materialize(item, options)
+    return outcome, metrics.REGISTRY.drain()
+
+
+def run_batch(
+    items,
+    base_dir,
+    processes=None,
+    workers=1,
+    sync=False,
+    delete_extras=False,
+    variables=None,
+):
+    """
+    Materialize manifest items on a process pool and report every outcome.
+
+    Args:
+        items (list): Items returned by read_batch_manifest.
+        base_dir (str): Directory the item directories are relative to.
+        processes (int): Pool size; defaults to the CPU count. 1 runs in-process.
+        workers (int): Writer threads per project.
+        sync (bool): Sync existing projects instead of creating them.
+        delete_extras (bool): With sync, remove files not in the template.
+        variables (dict): Placeholder values for every item; item variables win.
+
+    Returns:
+        dict: Counts of "ok" and "failed" items, "files", "seconds".
+
+    Raises:
+        BatchError: If one or more items failed.
+    """
+    start = time.perf_counter()
+    templates = {}
+    for technology in dict.fromkeys(item["technology"] for item in items):
+        project = get_admin_data(technology)
+        templates[technology] = project.get("project_tree", []) if project else None
+    items = [
+        dict(item, dir=os.path.normpath(os.path.join(base_dir, item["dir"])))
+        for item in items
+    ]
+    options = {
+        "workers": workers,
+        "sync": sync,
+        "delete_extras": delete_extras,
+        "variables": variables or {},
+    }
+    processes = min(processes or os.cpu_count() or 1, max(len(items), 1))
+
+    summary = {"ok": 0, "failed": 0, "files": 0}
+
+    def report(item, outcome):
+        ok, files, seconds, error = outcome
+        target = os.path.join(item["dir"], item["name"])
+        if ok:
+            summary["ok"] += 1
+            summary["files"] += files
+            print(f"[ok] {item['name']} -> {target} ({files} files, {seconds:.2f} s)")
+        else:
+            summary["failed"] += 1
+            print(f"[failed] {item['name']} -> {target}: {error}")
+
+    if processes <= 1:
+        _init_worker(templates)
+        for item in items:
+            report(item, _materialize(item, options))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_pool_worker,
+            initargs=(templates,),
+        ) as executor:
+            futures = {
+                executor.submit(_materialize_in_worker, item, options): item
+                for item in items
+            }
+            for future in as_completed(futures):
+                try:
+                    outcome, worker_metrics = future.result()
+                except Exception as e:  # pylint: disable=broad-except
+                    # E.g. BrokenProcessPool: the item failed, the rest is reported
+                    report(futures[future], (False, 0, 0.0, _describe(e)))
+                    continue
+                metrics.REGISTRY.merge(worker_metrics)
+                report(futures[future], outcome)
+
+    seconds = time.perf_counter() - start
+    summary["seconds"] = seconds
+    rate = 1 / seconds if seconds > 0 else 0.0
+    print(
+        f"Batch finished in {seconds:.2f} s with {processes} process(es): "
+        f"{summary['ok']} ok, {summary['failed']} failed, {summary['files']} files "
+        f"({summary['ok'] * rate:.1f} projects/s, "
+        f"{summary['files'] * rate:.0f} files/s)."
+    )
+    if summary["failed"]:
+        raise BatchError(summary["failed"], len(items))
+    return summary
@@ -5,13 +5,35 @@ Functions:
 - create_project_files: Creates project files and directories based on administrative data.
 - create_nested_files: Recursively creates nested files and directories.
 - create_project_files_two: Creates project files based on a tree structure.
+- plan_project_files: Plans the directories and files of a project tree.
+- materialize_files: Writes planned files, optionally from a thread pool.
+- sync_project_files: Updates an existing project, writing only files that differ.
+
+Both create_project_files_two and sync_project_files render {{variable}}
+placeholders in file names and contents when given variables (see render_adm),
+and are timed as profiling spans with plan, mkdir and write phases (see
+app.profiling). The directories created, files written and bytes written by
+both, and their latency, are recorded in the metrics registry (see
+app.metrics).
 
 Imports:
 - os: For interacting with the operating system, including file and directory operations.
+- shutil: For removing extra folders in sync mode.
+- concurrent.futures: For writing file contents from a bounded thread pool.
 """
 
 
+import hashlib
+import operator
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app import metrics
+from app.profiling import span, timed
+from app.settings import MaterializeError
+from db.tree import blob_store_of
+from .render_adm import TemplateRenderer
 
 
 def create_project_files(project_dir, project_name, admin_data):
@@ -39,8 +61,9 @@ def create_project_files(project_dir, project_name, admin_data):
     tech_path = os.path.join(project_path, tech)
     os.makedirs(tech_path, exist_ok=True)
 
-    # Add .gitignore file if specified in project_tree
-    project_tree = admin_data.get("project_tree", [])
+    # Add .gitignore file if specified in project_tree.
+    # Build a new list: admin_data may be shared with the catalog cache.
+    project_tree = list(admin_data.get("project_tree", []))
     project_tree.append(
         {
             "name": ".gitignore",
@@ -99,45 +122,382 @@ def create_nested_files(parent_path, file_info):
     return None
 
 
-def create_project_files_two(project_dir, project_name, project_tree):
+_EMPTY_GITIGNORE = {"name": ".gitignore", "is_folder": False, "content": ""}
+
+
+def plan_project_files(project_dir, project_name, project_tree, renderer=None):
     """
-    Create project files based on project tree structure.
+    Plan the directories and files create_project_files_two produces.
+
+    The plan reproduces the layout of the sequential implementation exactly:
+    children of a top-level folder are placed under a "default_tech"
+    subdirectory together with an empty .gitignore, and nested folders
+    without children become empty files. When two nodes map to the same
+    path, the later one wins, as it would when writing sequentially.
 
     Args:
         project_dir (str): The directory where the project will be created.
         project_name (str): The name of the project.
-        project_tree (list): The structure of the project 
-        containing information about files and directories.
+        project_tree (list): The structure of the project.
+        renderer (TemplateRenderer): Renders the placeholders of names and
+        file bodies; the tree is planned verbatim if None.
+
+    Returns:
+        tuple: (directories, files), where directories is a list of paths in
+        topological order (parents first) and files is a dict mapping each
+        file path to its tree node.
     """
-    # Create the main project directory
     project_path = os.path.join(project_dir, project_name)
-    os.makedirs(project_path, exist_ok=True)
+    directories = [project_path]
+    files = {}
+    if renderer is None:
+        name_of, render = operator.itemgetter("name"), None
+    else:
+        name_of, render = lambda node: renderer.name(node["name"]), renderer.node
+
+    def plan_file(file_path, file_info):
+        files[file_path] = file_info if render is None else render(file_info)
+
+    def plan_nested(parent_path, file_info):
+        if file_info.get("children"):
+            dir_path = os.path.join(parent_path, name_of(file_info))
+            directories.append(dir_path)
+            for child_info in file_info["children"]:
+                plan_nested(dir_path, child_info)
+        else:
+            plan_file(os.path.join(parent_path, name_of(file_info)), file_info)
 
-    # Iterate through project_tree to create files and directories
     for item in project_tree:
-        item_name = item["name"]
-        item_path = os.path.join(project_path, item_name)
+        item_path = os.path.join(project_path, name_of(item))
         if item.get("is_folder"):
-            # If item is a folder, create a directory and handle its children recursively
-            os.makedirs(item_path, exist_ok=True)
+            directories.append(item_path)
             children = item.get("children", [])
             if children:
-                # Create a dictionary to pass as admin_data
-                admin_data = {
-                    "technology": "default_tech",  # Or some other default value
-                    "project_tree": children,
-                }
-                create_project_files(project_path, item_name, admin_data)
+                tech_path = os.path.join(item_path, "default_tech")
+                directories.append(tech_path)
+                for file_info in children + [_EMPTY_GITIGNORE]:
+                    plan_nested(tech_path, file_info)
         else:
-            # Create individual file
-            content = item.get("content", "")  # Ensure content is not None
-            if content is None:
-                content = ""  # Default empty string if content is None
-            with open(item_path, "w", encoding="utf-8") as file:
-                file.write(content)
+            plan_file(item_path, item)
+
+    return list(dict.fromkeys(directories)), files
+
+
+def _renderer(variables, blob_store):
+    """Return the TemplateRenderer of a set of variables, or None without any."""
+    if variables is None:
+        return None
+    return TemplateRenderer(variables, blob_store)
+
+
+def _make_directories(directories):
+    """
+    Create the planned directories, parents first.
+
+    Returns:
+        int: The number of directories that did not exist yet.
+    """
+    created = 0
+    for dir_path in directories:
+        try:
+            os.mkdir(dir_path)
+        except FileExistsError:
+            if not os.path.isdir(dir_path):
+                raise
+            continue
+        except FileNotFoundError:
+            # A parent outside the plan is missing, e.g. the project directory
+            os.makedirs(dir_path)
+        created += 1
+    metrics.inc("directories_created", created)
+    return created
+
+
+def _body_size(file_info):
+    """Return the size in bytes of the body a file node writes."""
+    if "data" in file_info:
+        return memoryview(file_info["data"]).nbytes
+    if "blob" in file_info:
+        return file_info.get("size") or 0
+    content = file_info.get("content") or ""
+    # isascii() is O(1); only non-ASCII text needs encoding to be measured
+    return len(content) if content.isascii() else len(content.encode("utf-8"))
+
+
+def _write_file(file_path, file_info, blob_store=None):
+    """
+    Write the content of a file node to file_path.
+
+    File nodes carry their body as inline "content" text, as a "blob"
+    reference into the blob store (copied in-kernel, see db.fastcopy), or as
+    bytes-like "data" supplied at runtime (e.g. a view into an mmap-ed archive).
+    A blob is read from the store the node carries, if any, else from
+    blob_store, else from the catalog store.
+    """
+    if "data" in file_info:
+        with open(file_path, "wb") as file:
+            file.write(file_info["data"])
+        return
+    if "blob" in file_info:
+        blob_store_of(file_info, blob_store).copy_to(file_info["blob"], file_path)
+        return
+    content = file_info.get("content", "")
+    if content is None:
+        content = ""
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+
+def _run_file_jobs(job, files, workers, blob_store):
+    """
+    Run job(file_path, file_info, blob_store) for every planned file.
+
+    Args:
+        job (callable): The per-file operation.
+        files (dict): Mapping of file path to tree node.
+        workers (int): Number of threads; 1 runs sequentially.
+        blob_store (BlobStore): Store holding the bodies of blob file nodes.
+
+    Returns:
+        tuple: (results, failures), where results maps each successful file
+        path to the job's return value and failures lists (file_path, error).
+
+    Raises:
+        Exception: Any error other than OSError raised by a job, whatever the
+        number of workers; only OSError is recorded as a per-file failure.
+    """
+    results = {}
+    failures = []
+    if workers <= 1 or len(files) <= 1:
+        for file_path, file_info in files.items():
+            try:
+                results[file_path] = job(file_path, file_info, blob_store)
+            except OSError as e:
+                failures.append((file_path, e))
+        return results, failures
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(job, file_path, file_info, blob_store): file_path
+            for file_path, file_info in files.items()
+        }
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is None:
+                results[futures[future]] = future.result()
+            elif isinstance(error, OSError):
+                failures.append((futures[future], error))
+            else:
+                # Same policy as the sequential path: not a per-file failure
+                for pending in futures:
+                    pending.cancel()
+                raise error
+    return results, failures
+
+
+def materialize_files(files, workers=1, blob_store=None):
+    """
+    Write planned files, optionally from a bounded thread pool.
+
+    Args:
+        files (dict): Mapping of file path to tree node, as returned by plan_project_files.
+        workers (int): Number of writer threads; 1 writes sequentially.
+        blob_store (BlobStore): Store holding the bodies of blob file nodes.
+
+    Returns:
+        list: (file_path, error) pairs for the files that could not be written.
+    """
+    results, failures = _run_file_jobs(_write_file, files, workers, blob_store)
+    metrics.inc("files_written", len(results))
+    metrics.inc("bytes_written", sum(_body_size(files[path]) for path in results))
+    return failures
+
+
+def _expected_size_and_digest(file_info):
+    """
+    Return the body size of a file node and a callable computing its SHA-256.
+
+    The digest is only computed when sizes match, so it is returned lazily.
+    """
+    if "blob" in file_info:
+        return file_info["size"], lambda: file_info["blob"]
+    if "data" in file_info:
+        data = file_info["data"]
+        return len(data), lambda: hashlib.sha256(data).hexdigest()
+    body = (file_info.get("content") or "").encode("utf-8")
+    return len(body), lambda: hashlib.sha256(body).hexdigest()
+
+
+def _file_digest(file_path):
+    """Return the SHA-256 of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _sync_file(file_path, file_info, blob_store=None):
+    """
+    Write a file node only if the target differs, comparing size then hash.
+
+    Returns:
+        str: "created", "updated" or "skipped".
+    """
+    try:
+        current_size = os.stat(file_path).st_size
+    except FileNotFoundError:
+        _write_file(file_path, file_info, blob_store)
+        return "created"
+    size, digest = _expected_size_and_digest(file_info)
+    if current_size == size and _file_digest(file_path) == digest():
+        return "skipped"
+    _write_file(file_path, file_info, blob_store)
+    return "updated"
+
+
+def _delete_extras(project_path, directories, files):
+    """
+    Remove files and folders under project_path that are not in the plan.
+
+    Returns:
+        int: Number of files and folders removed.
+    """
+    keep_dirs = set(directories)
+    deleted = 0
+    for root, dirs, names in os.walk(project_path):
+        for name in names:
+            path = os.path.join(root, name)
+            if path not in files:
+                os.remove(path)
+                deleted += 1
+        for name in list(dirs):
+            path = os.path.join(root, name)
+            if path not in keep_dirs:
+                if os.path.islink(path):
+                    os.remove(path)
+                else:
+                    shutil.rmtree(path)
+                dirs.remove(name)
+                deleted += 1
+    return deleted
+
+
+@timed()
+@metrics.observed("sync_project_files")
+def sync_project_files(
+    project_dir,
+    project_name,
+    project_tree,
+    workers=1,
+    blob_store=None,
+    delete_extras=False,
+    variables=None,
+):
+    """
+    Bring an existing project in line with its template, writing only what differs.
+
+    Files are compared by size and then by SHA-256, and unchanged files are not
+    opened for writing, so their mtimes are preserved. The resulting tree is the
+    same as the one create_project_files_two produces.
+
+    Args:
+        project_dir (str): The directory containing the project.
+        project_name (str): The name of the project.
+        project_tree (list): The structure of the project.
+        workers (int): Number of threads used to compare and write files.
+        blob_store (BlobStore): Store holding the bodies of blob file nodes.
+        delete_extras (bool): Remove files and folders that are not in the template.
+        variables (dict): Values of the template placeholders, as for
+        create_project_files_two.
+
+    Returns:
+        dict: Counts of "created", "updated", "skipped" and "deleted" entries.
+
+    Raises:
+        MaterializeError: If one or more files could not be written.
+    """
+    with span("plan"):
+        directories, files = plan_project_files(
+            project_dir, project_name, project_tree, _renderer(variables, blob_store)
+        )
+    with span("mkdir"):
+        _make_directories(directories)
+
+    with span("write"):
+        results, failures = _run_file_jobs(_sync_file, files, workers, blob_store)
+    if failures:
+        for file_path, error in failures:
+            print(f"Error writing '{file_path}': {error}")
+        raise MaterializeError(project_name, len(failures))
+
+    summary = {"created": 0, "updated": 0, "skipped": 0, "deleted": 0}
+    written = 0
+    for file_path, outcome in results.items():
+        summary[outcome] += 1
+        if outcome != "skipped":
+            written += _body_size(files[file_path])
+    metrics.inc("files_written", summary["created"] + summary["updated"])
+    metrics.inc("files_unchanged", summary["skipped"])
+    metrics.inc("bytes_written", written)
+    if delete_extras:
+        with span("delete_extras"):
+            summary["deleted"] = _delete_extras(directories[0], directories, files)
+
+    print(
+        f"Project '{project_name}' synced in directory '{project_dir}': "
+        f"{summary['created']} created, {summary['updated']} updated, "
+        f"{summary['skipped']} skipped, {summary['deleted']} deleted."
+    )
+    return summary
+
+
+@timed()
+@metrics.observed("create_project_files_two")
+def create_project_files_two(
+    project_dir, project_name, project_tree, workers=1, blob_store=None, variables=None
+):
+    """
+    Create project files based on project tree structure.
+
+    The directory skeleton is created first, parents before children, and the
+    files are then written by up to `workers` threads. With variables, the
+    {{name}} placeholders of file names and bodies are rendered while planning;
+    files without placeholders are written exactly as before.
+
+    Args:
+        project_dir (str): The directory where the project will be created.
+        project_name (str): The name of the project.
+        project_tree (list): The structure of the project
+        containing information about files and directories.
+        workers (int): Number of threads used to write file contents.
+        blob_store (BlobStore): Store holding the bodies of blob file nodes;
+        defaults to the catalog blob store.
+        variables (dict): Values of the template placeholders; None writes the
+        template verbatim.
+
+    Returns:
+        int: The number of files written.
+
+    Raises:
+        MaterializeError: If one or more files could not be written.
+    """
+    with span("plan"):
+        directories, files = plan_project_files(
+            project_dir, project_name, project_tree, _renderer(variables, blob_store)
+        )
+    with span("mkdir"):
+        _make_directories(directories)
+
+    with span("write"):
+        failures = materialize_files(files, workers, blob_store)
+    if failures:
+        for file_path, error in failures:
+            print(f"Error writing '{file_path}': {error}")
+        raise MaterializeError(project_name, len(failures))
 
     # Print success message
     print(
         f"Project '{project_name}' created successfully in directory '{project_dir}'!"
     )
-    return
+    return len(files)
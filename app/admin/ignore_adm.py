@@ -0,0 +1,308 @@
+"""
+This module decides which paths the serializer leaves out of a template.
+
+Rules follow the gitignore format and matching rules:
+- blank lines and lines starting with "#" are skipped; trailing spaces are
+  dropped unless escaped with a backslash;
+- "!" negates a pattern, re-including what an earlier pattern excluded;
+- a trailing "/" only matches directories;
+- a pattern with a "/" at the start or in the middle is matched against the
+  path relative to the directory of its file, any other pattern against the
+  name alone, at any depth;
+- "*", "?" and "[...]" never match "/"; "**/" at the start, "/**" at the end
+  and "/**/" in the middle match any number of directories.
+
+Rules are read, from lowest to highest priority, from DEFAULT_IGNORE_PATTERNS,
+the .git/info/exclude file of the serialized directory, and the .gitignore
+and then .lazyignore file of every directory from the root down; the last
+matching rule wins. As in git, an ignored directory is pruned without being
+listed, so nothing below it can be re-included. Ignore files above the
+serialized directory are not read.
+
+Classes:
+- IgnoreRule: One compiled pattern.
+- IgnoreMatcher: The rules in effect in one directory of a scan.
+
+Functions:
+- compile_rule: Compiles one line of an ignore file.
+- read_ignore_file: Compiles the rules of an ignore file.
+
+Imports:
+- re: For compiling glob patterns.
+"""
+
+import os
+import re
+
+# Always left out, unless re-included with "!" by an ignore file
+DEFAULT_IGNORE_PATTERNS = (
+    ".git",
+    ".hg",
+    ".svn",
+    "__pycache__/",
+    "*.py[cod]",
+    ".venv/",
+    "venv/",
+    "node_modules/",
+    ".mypy_cache/",
+    ".pytest_cache/",
+    ".ruff_cache/",
+    ".tox/",
+    ".nox/",
+)
+
+# Ignore files read in every directory, in order of increasing priority
+IGNORE_FILES = (".gitignore", ".lazyignore")
+
+# A directory holding this file is a Python virtual environment, whatever its
+# name; it is pruned like the directories of DEFAULT_IGNORE_PATTERNS
+VENV_MARKER = "pyvenv.cfg"
+
+_GLOB_CHARS = frozenset("*?[\\")
+
+# Regex of the POSIX character classes allowed in brackets, e.g. [[:digit:]]
+_CHARACTER_CLASSES = {
+    "alnum": "a-zA-Z0-9",
+    "alpha": "a-zA-Z",
+    "blank": " \\t",
+    "digit": "0-9",
+    "lower": "a-z",
+    "space": "\\s",
+    "upper": "A-Z",
+    "xdigit": "0-9A-Fa-f",
+}
+
+
+class IgnoreRule:
+    """
+    One compiled ignore pattern.
+
+    Attributes:
+        pattern (str): The pattern as written, for messages.
+        negated (bool): True for "!" patterns, which re-include paths.
+        dir_only (bool): True if the pattern only matches directories.
+        anchored (bool): True if the pattern is matched against the path
+        relative to its ignore file rather than against the name.
+        match (callable): Returns a true value for a matching name or path.
+    """
+
+    __slots__ = ("pattern", "negated", "dir_only", "anchored", "match")
+
+    def __init__(self, pattern, negated, dir_only, anchored, match):
+        self.pattern = pattern
+        self.negated = negated
+        self.dir_only = dir_only
+        self.anchored = anchored
+        self.match = match
+
+
+def _translate_bracket(segment, start):
+    """
+    Translate the bracket expression starting at segment[start] ("[").
+
+    Returns:
+        tuple: (regex, index after the expression), or (None, start) if the
+        bracket is not closed and stands for itself.
+    """
+    index = start + 1
+    negated = index < len(segment) and segment[index] in "!^"
+    if negated:
+        index += 1
+    parts = []
+    first = True
+    while index < len(segment) and (first or segment[index] != "]"):
+        first = False
+        if segment.startswith("[:", index):
+            end = segment.find(":]", index + 2)
+            if end != -1 and segment[index + 2 : end] in _CHARACTER_CLASSES:
+                parts.append(_CHARACTER_CLASSES[segment[index + 2 : end]])
+                index = end + 2
+                continue
+        char = segment[index]
+        if char == "\\" and index + 1 < len(segment):
+            index += 1
+            char = segment[index]
+        parts.append(char if char == "-" else re.escape(char))
+        index += 1
+    if index >= len(segment):
+        return None, start
+    return ("[^/" if negated else "[") + "".join(parts) + "]", index + 1
+
+
+def _translate_segment(segment):
+    """Translate one path segment of a glob pattern into a regex."""
+    out = []
+    index = 0
+    while index < len(segment):
+        char = segment[index]
+        if char == "\\" and index + 1 < len(segment):
+            out.append(re.escape(segment[index + 1]))
+            index += 2
+            continue
+        if char == "*":
+            # Runs of "*" inside a segment are a single "*"
+            while index + 1 < len(segment) and segment[index + 1] == "*":
+                index += 1
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            regex, end = _translate_bracket(segment, index)
+            if regex is not None:
+                out.append(regex)
+                index = end
+                continue
+            out.append(re.escape(char))
+        else:
+            out.append(re.escape(char))
+        index += 1
+    return "".join(out)
+
+
+def _translate(pattern):
+    """Translate a glob pattern, without its leading "/", into a regex."""
+    segments = pattern.split("/")
+    last = len(segments) - 1
+    out = []
+    for position, segment in enumerate(segments):
+        if segment == "**":
+            # "**/x" and "a/**/x" also match no directory at all, "a/**"
+            # everything inside a
+            out.append(".*" if position == last else "(?:.*/)?")
+            continue
+        out.append(_translate_segment(segment))
+        if position != last:
+            out.append("/")
+    return "".join(out)
+
+
+def _strip_trailing_spaces(line):
+    """Drop the trailing spaces of a line that are not escaped."""
+    end = len(line)
+    while end and line[end - 1] == " ":
+        backslashes = len(line[: end - 1]) - len(line[: end - 1].rstrip("\\"))
+        if backslashes % 2:
+            break
+        end -= 1
+    return line[:end]
+
+
+def compile_rule(line):
+    """
+    Compile one line of an ignore file.
+
+    Args:
+        line (str): The line, with or without its line break.
+
+    Returns:
+        IgnoreRule: The rule, or None for blank lines and comments.
+    """
+    pattern = _strip_trailing_spaces(line.rstrip("\r\n"))
+    if not pattern or pattern.startswith("#"):
+        return None
+    negated = pattern.startswith("!")
+    if negated:
+        pattern = pattern[1:]
+    elif pattern.startswith(("\\!", "\\#")):
+        pattern = pattern[1:]
+    dir_only = pattern.endswith("/")
+    body = pattern.rstrip("/") if dir_only else pattern
+    anchored = "/" in body
+    body = body.lstrip("/")
+    if not body:
+        return None
+    if _GLOB_CHARS.isdisjoint(body):
+        match = body.__eq__
+    else:
+        match = re.compile(_translate(body), re.DOTALL).fullmatch
+    return IgnoreRule(line.strip(), negated, dir_only, anchored, match)
+
+
+def _compile_lines(lines):
+    """Return the rules of the given lines, skipping blanks and comments."""
+    return tuple(rule for rule in map(compile_rule, lines) if rule is not None)
+
+
+def read_ignore_file(file_path):
+    """
+    Compile the rules of an ignore file.
+
+    Args:
+        file_path (str): Path of a .gitignore-format file.
+
+    Returns:
+        tuple: The IgnoreRule of every pattern line, empty if the file
+        cannot be read.
+    """
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+            return _compile_lines(file)
+    except OSError:
+        return ()
+
+
+class IgnoreMatcher:
+    """
+    The ignore rules in effect in one directory of a scan.
+
+    A matcher holds layers of rules, each with the relative path of the
+    directory its patterns are relative to, in order of increasing priority.
+    """
+
+    __slots__ = ("_layers",)
+
+    def __init__(self, layers=None):
+        """
+        Initializes the matcher.
+
+        Args:
+            layers (tuple): (relative directory prefix, rules) pairs; defaults
+            to DEFAULT_IGNORE_PATTERNS only.
+        """
+        if layers is None:
+            layers = (("", _compile_lines(DEFAULT_IGNORE_PATTERNS)),)
+        self._layers = layers
+
+    def enter(self, path, prefix, names):
+        """
+        Return the matcher of a directory, adding the rules of its ignore files.
+
+        Args:
+            path (str): The directory.
+            prefix (str): Its path relative to the scan root, ending with "/"
+            unless empty.
+            names (set): The names of its entries, so directories without
+            ignore files cost no extra system call.
+
+        Returns:
+            IgnoreMatcher: self if the directory has no ignore file.
+        """
+        layers = self._layers
+        if not prefix and ".git" in names:
+            rules = read_ignore_file(os.path.join(path, ".git", "info", "exclude"))
+            if rules:
+                layers += ((prefix, rules),)
+        for file_name in IGNORE_FILES:
+            if file_name in names:
+                rules = read_ignore_file(os.path.join(path, file_name))
+                if rules:
+                    layers += ((prefix, rules),)
+        return self if layers is self._layers else IgnoreMatcher(layers)
+
+    def ignored(self, rel_path, name, is_dir):
+        """
+        Return True if a path is ignored.
+
+        Args:
+            rel_path (str): The path relative to the scan root.
+            name (str): Its last component.
+            is_dir (bool): True for a directory.
+        """
+        for base, rules in reversed(self._layers):
+            relative = rel_path[len(base) :]
+            for rule in reversed(rules):
+                if rule.dir_only and not is_dir:
+                    continue
+                if rule.match(relative if rule.anchored else name):
+                    return not rule.negated
+        return False
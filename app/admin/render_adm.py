@@ -0,0 +1,219 @@
+"""
+This module renders {{variable}} placeholders in project templates.
+
+Placeholders may appear in file contents and in file and folder names, e.g.
+a folder "{{package_name}}" or a line "PORT = {{ port }}". A text is compiled
+once into a RenderPlan (its literal pieces and the variable names between
+them); plans of inline texts are cached by their string hash. Rendering a
+plan is a single join, and texts without "{{" are never compiled. Blob bodies
+are scanned for "{{" in fixed-size chunks and only that verdict is cached by
+digest, so a blob is never held in memory unless it is rendered, and blobs
+over INLINE_FILE_LIMIT are never read at all. Placeholders naming a variable that was not set are
+kept verbatim, so templates using {{ }} for their own syntax (Jinja, Vue...)
+pass through unchanged.
+
+Classes:
+- RenderPlan: Compiled form of a template text.
+- TemplateRenderer: Renders file names and file nodes with a set of variables.
+
+Functions:
+- compile_template: Returns the cached render plan of a text.
+- default_variables: Returns the variables every deserialized project gets.
+
+Imports:
+- re: For finding placeholders.
+- functools: For the plan and verdict caches.
+- INLINE_FILE_LIMIT: The largest blob body that is rendered.
+- blob_store_of: For finding the store of a blob body.
+"""
+
+import functools
+import re
+
+from app.settings import INLINE_FILE_LIMIT
+from db.tree import blob_store_of
+
+# Number of entries kept per cache (plans of inline texts, blob verdicts). It
+# must exceed the templated files of one project: deploying a project larger
+# than an LRU cache misses on every file.
+PLAN_CACHE_SIZE = 1 << 16
+
+# Bytes read at a time when scanning a blob body for placeholders
+SCAN_CHUNK_SIZE = 1 << 16
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_]\w*)\s*\}\}")
+
+
+class RenderPlan:
+    """
+    Literal pieces of a text and the placeholders between them.
+
+    Attributes:
+        literals (tuple): The text around the placeholders; one more than names.
+        names (tuple): Variable name of each placeholder.
+        raws (tuple): Source text of each placeholder, kept for unset variables.
+    """
+
+    __slots__ = ("literals", "names", "raws")
+
+    def __init__(self, literals, names, raws):
+        self.literals = literals
+        self.names = names
+        self.raws = raws
+
+    def render(self, variables):
+        """
+        Return the text with its placeholders replaced.
+
+        Args:
+            variables (dict): Variable name to string value.
+        """
+        parts = [None] * (2 * len(self.names) + 1)
+        parts[0::2] = self.literals
+        parts[1::2] = [
+            variables.get(name, raw) for name, raw in zip(self.names, self.raws)
+        ]
+        return "".join(parts)
+
+
+@functools.lru_cache(maxsize=PLAN_CACHE_SIZE)
+def compile_template(text):
+    """
+    Return the render plan of a text, or None if it has no placeholders.
+
+    Plans are cached by the text itself, i.e. by its hash and contents; a
+    string kept in the catalog cache is only hashed once.
+
+    Args:
+        text (str): A file body or file name.
+    """
+    return _compile(text)
+
+
+def _compile(text):
+    """compile_template without the cache."""
+    literals, names, raws = [], [], []
+    position = 0
+    for match in _PLACEHOLDER.finditer(text):
+        literals.append(text[position : match.start()])
+        names.append(match.group(1))
+        raws.append(match.group(0))
+        position = match.end()
+    if not names:
+        return None
+    literals.append(text[position:])
+    return RenderPlan(tuple(literals), tuple(names), tuple(raws))
+
+
+@functools.lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _blob_has_placeholders(store, digest):
+    """
+    Return True if a blob body contains "{{", reading it in fixed-size chunks.
+
+    Blobs are immutable and named by their digest, so each one is scanned at
+    most once while its verdict stays in the cache.
+    """
+    tail = b""
+    with open(store.path(digest), "rb") as file:
+        for chunk in iter(lambda: file.read(SCAN_CHUNK_SIZE), b""):
+            # A "{{" may straddle two chunks
+            if b"{{" in chunk or tail + chunk[:1] == b"{{":
+                return True
+            tail = chunk[-1:]
+    return False
+
+
+def _compile_blob(store, digest):
+    """
+    Return the render plan of a blob body, or None if it has none.
+
+    The body is only read when the scan found "{{"; its plan is not cached,
+    since it holds the whole body.
+    """
+    if not _blob_has_placeholders(store, digest):
+        return None
+    try:
+        return _compile(store.get(digest).decode("utf-8"))
+    except UnicodeDecodeError:
+        return None
+
+
+def default_variables(project_name):
+    """
+    Return the variables every deserialized project gets.
+
+    Args:
+        project_name (str): The name of the project, e.g. "django_blog".
+
+    Returns:
+        dict: project_name, package_name (a lower-case identifier made of the
+        project name), technology and specifier (see parse_project_name).
+    """
+    technology, _, specifier = project_name.partition("_")
+    package_name = re.sub(r"\W+", "_", project_name).strip("_").lower()
+    return {
+        "project_name": project_name,
+        "package_name": package_name or "project",
+        "technology": technology,
+        "specifier": specifier,
+    }
+
+
+class TemplateRenderer:
+    """
+    Renders the names and file nodes of a project tree with one set of variables.
+    """
+
+    def __init__(self, variables, blob_store=None, max_blob_size=INLINE_FILE_LIMIT):
+        """
+        Initializes the renderer.
+
+        Args:
+            variables (dict): Variable name to value; values are turned into strings.
+            blob_store (BlobStore): Store holding the bodies of blob file nodes;
+            defaults to the catalog blob store.
+            max_blob_size (int): Blob bodies larger than this are copied as
+            they are, without being read; None renders blobs of any size.
+        """
+        self.variables = {name: str(value) for name, value in variables.items()}
+        self.blob_store = blob_store
+        self.max_blob_size = max_blob_size
+
+    def name(self, text):
+        """Return a file or folder name with its placeholders replaced."""
+        if "{{" not in text:
+            return text
+        plan = compile_template(text)
+        return text if plan is None else plan.render(self.variables)
+
+    def node(self, file_info):
+        """
+        Return a file node with its body rendered.
+
+        The node itself is returned when its body has no placeholders, so
+        blob bodies keep being copied without passing through Python. A
+        rendered blob body becomes inline content. Binary blobs, blobs over
+        max_blob_size and runtime "data" bodies are never rendered.
+        """
+        if "blob" in file_info:
+            if file_info.get("binary"):
+                return file_info
+            size = file_info.get("size")
+            if self.max_blob_size is not None and (
+                size is None or size > self.max_blob_size
+            ):
+                return file_info
+            store = blob_store_of(file_info, self.blob_store)
+            plan = _compile_blob(store, file_info["blob"])
+        else:
+            content = file_info.get("content")
+            if not isinstance(content, str) or "{{" not in content:
+                return file_info
+            plan = compile_template(content)
+        if plan is None:
+            return file_info
+        return {
+            "name": file_info["name"],
+            "is_folder": False,
+            "content": plan.render(self.variables),
+        }
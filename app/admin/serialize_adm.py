@@ -0,0 +1,412 @@
+"""
+This module provides functions to serialize a directory into a project tree.
+
+Classes:
+- SizeLimits: Size thresholds deciding how file bodies are stored.
+
+Functions:
+- scan_tree: Builds the project tree of a directory in a single os.scandir traversal.
+- update_tree: Re-serializes a directory, re-reading only files whose stat changed.
+- build_project_structure: Wraps the project tree of a directory into catalog format.
+
+Imports:
+- os: For scanning directories and reading files.
+- hashlib: For the content hashes recorded in manifests.
+- IgnoreMatcher: For leaving ignored paths out (see ignore_adm).
+- FileNode, DirNode: The nodes of the serialized tree (see db.tree).
+"""
+
+import codecs
+import hashlib
+import os
+import time
+from collections import namedtuple
+
+from app.profiling import timed
+from app.settings import (
+    CancelledError,
+    INLINE_FILE_LIMIT,
+    INLINE_TEMPLATE_LIMIT,
+    MAX_FILE_SIZE,
+)
+from db.blobs import get_blob_store
+from db.tree import DirNode, FileNode, node_from_json
+from .ignore_adm import IgnoreMatcher, VENV_MARKER
+
+SizeLimits = namedtuple(
+    "SizeLimits",
+    "inline_file inline_template max_file",
+    defaults=(INLINE_FILE_LIMIT, INLINE_TEMPLATE_LIMIT, MAX_FILE_SIZE),
+)
+SizeLimits.__doc__ = """
+Size thresholds of a serialization, in bytes; None disables a threshold.
+
+Text files larger than inline_file, or arriving once the template holds
+inline_template bytes of inline text, are streamed to the blob store in
+fixed-size chunks and referenced by digest, so the memory a scan needs does
+not grow with the size of the files. Files larger than max_file are skipped.
+"""
+
+
+def _over(size, limit):
+    """Return True if size exceeds limit (None means no limit)."""
+    return limit is not None and size > limit
+
+
+@timed()
+def scan_tree(
+    directory,
+    blob_store=None,
+    manifest=None,
+    progress=None,
+    cancel=None,
+    ignore=True,
+    limits=None,
+    skipped=None,
+):
+    """
+    Build the project tree of a directory in a single traversal.
+
+    Every directory is listed exactly once with os.scandir, and the file type
+    of each entry comes from the DirEntry itself, so no extra stat call is made
+    per file. Symlinked directories are not followed, and a directory whose
+    device and inode were already visited (e.g. a bind mount loop) is skipped. Ignored
+    directories (VCS metadata, virtual environments, node_modules, .gitignore
+    and .lazyignore matches, see ignore_adm) are never listed.
+
+    Args:
+        directory (str): The root directory to serialize.
+        blob_store (BlobStore): When given, file bodies are stored in it and
+        file nodes hold "blob" and "size" instead of "content". Binary files
+        are stored as blobs marked "binary" in any case (in the catalog blob
+        store when blob_store is None).
+        manifest (Manifest): When given, it is refilled with the stat and hash
+        of every serialized file.
+        progress (callable): Called as progress(files, bytes_read) after every
+        file with the running totals of files scanned and bytes read.
+        cancel (threading.Event): When set, the scan stops at the next
+        directory entry by raising CancelledError.
+        ignore (bool): Leave ignored paths out; False serializes everything.
+        limits (SizeLimits): Size thresholds; defaults to the settings.
+        skipped (list): When given, receives (relative path, size) of every
+        file left out for being larger than limits.max_file.
+
+    Returns:
+        list: The FileNode and DirNode objects of the directory; they read like
+        the dict nodes of the catalog and are written as such (see db.tree).
+    """
+    return _Scanner(
+        blob_store,
+        manifest,
+        progress=progress,
+        cancel=cancel,
+        ignore=ignore,
+        limits=limits,
+        skipped=skipped,
+    ).scan(directory)
+
+
+@timed()
+def update_tree(
+    directory,
+    project_tree,
+    manifest,
+    blob_store=None,
+    progress=None,
+    cancel=None,
+    ignore=True,
+    limits=None,
+    skipped=None,
+):
+    """
+    Re-serialize a directory, re-reading only the files that changed.
+
+    Files whose mtime and size match the manifest keep their node from
+    project_tree; every other file is read again. The manifest is updated
+    in place and should be saved by the caller.
+
+    Args:
+        directory (str): The root directory to serialize.
+        project_tree (list): The tree produced by the previous serialization.
+        manifest (Manifest): The manifest of the previous serialization.
+        blob_store (BlobStore): Optional store receiving the file bodies.
+        progress (callable): Progress callback, see scan_tree.
+        cancel (threading.Event): Cancellation flag, see scan_tree.
+        ignore (bool): Leave ignored paths out, see scan_tree.
+        limits (SizeLimits): Size thresholds, see scan_tree.
+        skipped (list): Receives the skipped files, see scan_tree.
+
+    Returns:
+        tuple: (new project tree, number of files read).
+    """
+    scanner = _Scanner(
+        blob_store,
+        manifest,
+        _index_tree(project_tree),
+        progress,
+        cancel,
+        ignore,
+        limits,
+        skipped,
+    )
+    tree = scanner.scan(directory)
+    return tree, scanner.read_count
+
+
+def _index_tree(tree, prefix=""):
+    """Map the relative path of every file node of a tree to the node."""
+    index = {}
+    for node in tree:
+        rel_path = prefix + node["name"]
+        if node.get("is_folder"):
+            index.update(_index_tree(node.get("children", []), rel_path + "/"))
+        else:
+            index[rel_path] = node
+    return index
+
+
+class _Scanner:
+    """State of one serialization pass over a directory."""
+
+    def __init__(
+        self,
+        blob_store=None,
+        manifest=None,
+        previous=None,
+        progress=None,
+        cancel=None,
+        ignore=True,
+        limits=None,
+        skipped=None,
+    ):
+        """
+        Args:
+            blob_store (BlobStore): Store for file bodies, or None to inline them.
+            manifest (Manifest): Manifest to check and refill, or None.
+            previous (dict): Relative path -> file node of the previous tree.
+            progress (callable): Called as progress(files, bytes_read), or None.
+            cancel (threading.Event): Stops the scan when set, or None.
+            ignore (bool): Leave the paths matched by ignore rules out.
+            limits (SizeLimits): Size thresholds, or None for the settings.
+            skipped (list): Receives (relative path, size) of skipped files, or None.
+        """
+        self.blob_store = blob_store
+        self.manifest = manifest
+        self.previous = previous or {}
+        self.records = {}
+        self.visited = set()
+        self.read_count = 0
+        self.progress = progress
+        self.cancel = cancel
+        self.file_count = 0
+        self.bytes_read = 0
+        self.ignore = ignore
+        self.limits = limits or SizeLimits()
+        self.skipped = skipped
+        self.inline_bytes = 0
+
+    def scan(self, directory):
+        """Serialize directory and, if a manifest is tracked, refill it."""
+        started = time.time_ns()
+        root_stat = os.stat(directory)
+        self.visited.add((root_stat.st_dev, root_stat.st_ino))
+        matcher = IgnoreMatcher() if self.ignore else None
+        tree = self._scan_dir(directory, "", matcher)
+        if self.manifest is not None:
+            self.manifest.files = self.records
+            self.manifest.scanned_at = started
+        return tree
+
+    def _scan_dir(self, path, prefix, matcher):
+        """
+        Serialize one directory and recurse into its subdirectories.
+
+        Args:
+            path (str): The directory to list.
+            prefix (str): Relative path of the directory, ending with "/" unless empty.
+            matcher (IgnoreMatcher): Ignore rules of the parent directory, or
+            None to keep every path.
+
+        Returns:
+            list: The children of the directory, folders first, each group by
+            name, or None if the directory turns out to be a virtual environment.
+        """
+        dirs = []
+        files = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if self.cancel is not None and self.cancel.is_set():
+                    raise CancelledError("Serialization")
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry)
+                elif entry.is_file():
+                    files.append(entry)
+
+        if matcher is not None:
+            names = {entry.name for entry in dirs}
+            names.update(entry.name for entry in files)
+            if prefix and VENV_MARKER in names:
+                return None
+            matcher = matcher.enter(path, prefix, names)
+            dirs = [
+                entry
+                for entry in dirs
+                if not matcher.ignored(prefix + entry.name, entry.name, True)
+            ]
+            files = [
+                entry
+                for entry in files
+                if not matcher.ignored(prefix + entry.name, entry.name, False)
+            ]
+
+        tree = []
+        for entry in sorted(dirs, key=lambda e: e.name):
+            # One stat per directory: readdir gives neither the device nor,
+            # for a mount point, the inode of the mounted directory
+            dir_stat = entry.stat(follow_symlinks=False)
+            key = (dir_stat.st_dev, dir_stat.st_ino)
+            if key in self.visited:
+                continue
+            self.visited.add(key)
+            children = self._scan_dir(entry.path, prefix + entry.name + "/", matcher)
+            if children is None:
+                continue
+            tree.append(DirNode(entry.name, children))
+        for entry in sorted(files, key=lambda e: e.name):
+            if self.cancel is not None and self.cancel.is_set():
+                raise CancelledError("Serialization")
+            node = self._file_node(entry, prefix + entry.name)
+            if node is None:
+                continue
+            tree.append(node)
+            self.file_count += 1
+            if self.progress is not None:
+                self.progress(self.file_count, self.bytes_read)
+        return tree
+
+    def _file_node(self, entry, rel_path):
+        """
+        Return the node of a file, reusing the previous one if it is unchanged.
+
+        Returns None for a file over the size limit, after recording it in
+        self.skipped.
+        """
+        stat = entry.stat()
+        if _over(stat.st_size, self.limits.max_file):
+            if self.skipped is not None:
+                self.skipped.append((rel_path, stat.st_size))
+            return None
+        out_of_line = (
+            self.blob_store is not None
+            or _over(stat.st_size, self.limits.inline_file)
+            or _over(self.inline_bytes + stat.st_size, self.limits.inline_template)
+        )
+        if self.manifest is not None and self.manifest.is_unchanged(rel_path, stat):
+            node = self.previous.get(rel_path)
+            if node is not None and (
+                node.get("binary") or ("blob" in node) == out_of_line
+            ):
+                self.records[rel_path] = self.manifest.files[rel_path]
+                if "content" in node:
+                    self.inline_bytes += stat.st_size
+                return node_from_json(node, self.blob_store)
+
+        self.read_count += 1
+        binary = _looks_binary(entry.path)
+        if not binary and not out_of_line:
+            content = _read_text(entry.path)
+            if content is not None:
+                data = content.encode("utf-8")
+                self.bytes_read += len(data)
+                self.inline_bytes += len(data)
+                if self.manifest is not None:
+                    digest = hashlib.sha256(data).hexdigest()
+                    self.records[rel_path] = [stat.st_mtime_ns, stat.st_size, digest]
+                return FileNode(entry.name, content)
+            binary = True
+
+        # Binary files always go to the blob store, text files when requested or
+        # when they are too large to keep inline; put_file streams the body.
+        digest, size = (self.blob_store or get_blob_store()).put_file(entry.path)
+        self.bytes_read += size
+        node = FileNode(
+            entry.name, blob=digest, size=size, binary=binary, store=self.blob_store
+        )
+        if self.manifest is not None:
+            self.records[rel_path] = [stat.st_mtime_ns, stat.st_size, digest]
+        return node
+
+
+_SNIFF_SIZE = 8192
+
+
+def _looks_binary(file_path):
+    """Return True if the start of a file contains NUL bytes or invalid UTF-8."""
+    with open(file_path, "rb") as file:
+        head = file.read(_SNIFF_SIZE)
+    if b"\0" in head:
+        return True
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return True
+    return False
+
+
+def _read_text(file_path):
+    """
+    Read a UTF-8 text file the way open(..., "r") does, newlines included.
+
+    Returns:
+        str: The content, or None if the file turns out not to be UTF-8 text.
+    """
+    try:
+        with open(file_path, "r", encoding="utf-8") as file:
+            return file.read()
+    except UnicodeDecodeError:
+        return None
+
+
+def build_project_structure(
+    directory,
+    technology="your_technology_here",
+    blob_store=None,
+    progress=None,
+    cancel=None,
+    ignore=True,
+    limits=None,
+    skipped=None,
+):
+    """
+    Build the catalog representation of a project directory.
+
+    Args:
+        directory (str): The root directory to serialize.
+        technology (str): The technology name to register the project under.
+        blob_store (BlobStore): Optional store receiving the file bodies.
+        progress (callable): Progress callback, see scan_tree.
+        cancel (threading.Event): Cancellation flag, see scan_tree.
+        ignore (bool): Leave ignored paths out, see scan_tree.
+        limits (SizeLimits): Size thresholds, see scan_tree.
+        skipped (list): Receives the skipped files, see scan_tree.
+
+    Returns:
+        dict: A dictionary containing project details and the project tree.
+    """
+    return {
+        "projects": [
+            {
+                "id": 1,
+                "technology": technology,
+                "project_tree": scan_tree(
+                    directory,
+                    blob_store,
+                    progress=progress,
+                    cancel=cancel,
+                    ignore=ignore,
+                    limits=limits,
+                    skipped=skipped,
+                ),
+            }
+        ]
+    }
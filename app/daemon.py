@@ -0,0 +1,338 @@
+"""
+This module runs LazyProject as a resident daemon.
+
+`python main.py --serve` loads the catalog once and answers the console
+commands of client.forward over a Unix domain socket, so a command no longer
+pays for the imports and the catalog parse of a fresh process: the parsed
+templates, the blob store and the render plans stay in memory between
+requests. A watcher thread polls the catalog files and reloads the catalog
+as soon as they change, whether the change was made through the daemon or by
+another process.
+
+Requests run one at a time, in the order they arrive; a command's output is
+streamed back to its client while it runs. The metrics registry of the
+daemon (see app.metrics) is answered on the socket (main.py --metrics) and,
+when serve is given a port, over HTTP at /metrics (Prometheus text format)
+and /metrics.json, for a Prometheus server to scrape.
+
+Classes:
+- CatalogWatcher: Thread reloading the catalog when its files change.
+
+Functions:
+- serve: Listens on the daemon socket until interrupted.
+
+Imports:
+- socketserver: For the Unix socket server.
+- http.server: For the optional HTTP metrics endpoint.
+- client: For the socket path and the message framing.
+- run_command: For running the forwarded commands.
+"""
+
+import contextlib
+import http.server
+import io
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+
+from client import SOCKET_PATH, read_messages, send_message
+from db.journal import journal_path
+from db.storage import JsonBackend, get_backend
+from app import settings
+from app.settings import ProjectError, DaemonError, Root
+from .manage import run_command
+from .metrics import format_metrics
+
+# Seconds between two checks of the catalog files
+WATCH_INTERVAL = 1.0
+
+# Commands whose third argument is a path rather than a template name
+PATH_COMMANDS = {Root.UNPACK.value, Root.BATCH.value}
+
+# Options whose value is a path
+PATH_OPTIONS = ("--metrics-file=",)
+
+
+def _stamp(path):
+    """Return (mtime_ns, size, inode) of a file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class CatalogWatcher(threading.Thread):
+    """
+    Thread that reloads the catalog when one of its files changes.
+
+    The JSON catalog is watched with its journal and the SQLite catalog with
+    its write-ahead log, so journaled writes are picked up too. Only the JSON
+    catalog is held in memory and read again; the SQLite backend queries the
+    database on every call, so a change there only drops the cached
+    technologies.
+    """
+
+    def __init__(self, backend, interval=WATCH_INTERVAL):
+        """
+        Initializes the watcher.
+
+        Args:
+            backend (CatalogBackend): The catalog to keep loaded.
+            interval (float): Seconds between two checks of the files.
+        """
+        super().__init__(name="catalog-watcher", daemon=True)
+        self.backend = backend
+        self.interval = interval
+        self.paths = (
+            backend.file_path,
+            journal_path(backend.file_path),
+            backend.file_path + "-wal",
+        )
+        self.stamps = self._stamps()
+        self._stopped = threading.Event()
+
+    def _stamps(self):
+        return tuple(_stamp(path) for path in self.paths)
+
+    def reload(self):
+        """Reload a JSON catalog and drop the technologies cached by the settings."""
+        start = time.perf_counter()
+        settings._technologies = None
+        if isinstance(self.backend, JsonBackend):
+            data = self.backend.load() or {}
+            loaded = f"{len(data.get('projects', []))} templates"
+        else:
+            loaded = f"{len(self.backend.technologies())} technologies"
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Catalog loaded: {loaded} in {elapsed_ms:.1f} ms", file=sys.stderr)
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            stamps = self._stamps()
+            if stamps != self.stamps:
+                self.stamps = stamps
+                try:
+                    self.reload()
+                except (ProjectError, OSError, ValueError) as e:
+                    # A catalog caught mid-write; the next change reloads it
+                    print(f"Catalog reload failed: {e}", file=sys.stderr)
+
+    def stop(self):
+        """Stop watching."""
+        self._stopped.set()
+
+
+class _SocketWriter(io.TextIOBase):
+    """Text stream sending what is written to a client, line by line."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.connected = True
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        # Projects are written by several threads, which may print errors
+        with self.lock:
+            self.buffer.append(text)
+            if "\n" in text:
+                self._send()
+        return len(text)
+
+    def flush(self):
+        with self.lock:
+            self._send()
+
+    def _send(self):
+        text = "".join(self.buffer)
+        self.buffer.clear()
+        if text and self.connected:
+            try:
+                send_message(self.sock, {"out": text})
+            except OSError:
+                # The client went away; the command still runs to the end
+                self.connected = False
+
+
+def _resolve_paths(argv, cwd):
+    """Return argv with its path arguments and options made absolute against cwd."""
+    resolved, positionals = [], []
+    for arg in argv:
+        prefix = next((p for p in PATH_OPTIONS if arg.startswith(p)), None)
+        if prefix is not None:
+            arg = prefix + os.path.join(cwd, os.path.expanduser(arg[len(prefix) :]))
+        elif not arg.startswith("--"):
+            if len(positionals) == 1 or (
+                len(positionals) == 2 and positionals[0] in PATH_COMMANDS
+            ):
+                arg = os.path.join(cwd, os.path.expanduser(arg))
+            positionals.append(arg)
+        resolved.append(arg)
+    return resolved
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """Runs the command of one client connection."""
+
+    def handle(self):
+        try:
+            request = next(read_messages(self.request))
+            if "metrics" in request:
+                self.send_metrics(request["metrics"])
+                return
+            argv = _resolve_paths(request["argv"], request["cwd"])
+        except (StopIteration, ValueError, KeyError, TypeError):
+            return
+
+        start = time.perf_counter()
+        writer = _SocketWriter(self.request)
+        status = 0
+        with contextlib.redirect_stdout(writer):
+            try:
+                run_command(argv)
+            except ProjectError as e:
+                print(f"Error: {e.message}")
+                status = 1
+            except Exception as e:  # pylint: disable=broad-except
+                # Keep serving; the client gets the error, the log the traceback
+                traceback.print_exc()
+                print(f"Error: {e}")
+                status = 1
+        writer.flush()
+        if writer.connected:
+            with contextlib.suppress(OSError):
+                send_message(self.request, {"status": status})
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        command = " ".join(arg for arg in request["argv"] if not arg.startswith("--"))
+        print(f"{command}: status {status} in {elapsed_ms:.1f} ms", file=sys.stderr)
+
+    def send_metrics(self, fmt):
+        """Answer a metrics request with the registry in the given format."""
+        try:
+            message, status = {"out": format_metrics(fmt)}, 0
+        except ValueError as e:
+            message, status = {"out": f"Error: {e}\n"}, 1
+        with contextlib.suppress(OSError):
+            send_message(self.request, message)
+            send_message(self.request, {"status": status})
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the metrics registry at /metrics and /metrics.json."""
+
+    FORMATS = {
+        "/metrics": ("prometheus", "text/plain; version=0.0.4; charset=utf-8"),
+        "/metrics.json": ("json", "application/json"),
+    }
+
+    def do_GET(self):
+        fmt, content_type = self.FORMATS.get(self.path.split("?")[0], (None, None))
+        if fmt is None:
+            self.send_error(404)
+            return
+        body = format_metrics(fmt).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        # Scrapes are periodic; logging each one would drown the request log
+        pass
+
+
+def _start_metrics_server(port, host="127.0.0.1"):
+    """Serve the metrics over HTTP from a background thread."""
+    try:
+        server = http.server.ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        raise DaemonError(f"{host}:{port}", e.strerror or str(e)) from e
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, name="metrics-http", daemon=True
+    )
+    thread.start()
+    print(f"Metrics on 'http://{host}:{port}/metrics'", file=sys.stderr)
+    return server
+
+
+def _terminate(_signum, _frame):
+    """Stop serving on SIGTERM like on Ctrl+C."""
+    raise KeyboardInterrupt
+
+
+def serve(socket_path=SOCKET_PATH, interval=WATCH_INTERVAL, metrics_port=None):
+    """
+    Serve console commands on a Unix domain socket until interrupted.
+
+    Args:
+        socket_path (str): Path of the socket to listen on.
+        interval (float): Seconds between two checks of the catalog files.
+        metrics_port (int): When given, the metrics are also served over
+        HTTP on this port of the loopback interface.
+
+    Raises:
+        DaemonError: If another daemon listens on the socket.
+    """
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(socket_path)
+        else:
+            raise DaemonError(socket_path, "a daemon is already running")
+        finally:
+            probe.close()
+
+    watcher = CatalogWatcher(get_backend(), interval)
+    watcher.reload()
+
+    # Forwarded commands write files as the daemon's user: only let that
+    # user connect
+    previous_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(socket_path, _RequestHandler)
+    except OSError as e:
+        raise DaemonError(socket_path, e.strerror or str(e)) from e
+    finally:
+        os.umask(previous_umask)
+
+    metrics_server = None
+    if metrics_port is not None:
+        try:
+            metrics_server = _start_metrics_server(metrics_port)
+        except DaemonError:
+            server.server_close()
+            with contextlib.suppress(OSError):
+                os.unlink(socket_path)
+            raise
+
+    signal.signal(signal.SIGTERM, _terminate)
+    watcher.start()
+    print(f"Serving on '{socket_path}' (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+            metrics_server.server_close()
+        server.server_close()
+        with contextlib.suppress(OSError):
+            os.unlink(socket_path)
+    print("Daemon stopped", file=sys.stderr)
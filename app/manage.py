@@ -7,21 +7,46 @@ retrieves administrative data, and creates project files based on that data.
 Imports:
 - validate_arguments, parse_project_name, get_admin_data: Functions for handling command-line arguments and retrieving admin data.
 - create_project_files_two: Function for creating project files based on administrative data.
+- pack_template, unpack_template: Functions for moving templates as ASAR archives.
+- scan_tree, update_tree: Functions for serializing a directory into a template.
+- default_variables: Function returning the placeholder values every project gets.
+- read_batch_manifest, run_batch: Functions for creating many projects from a manifest.
+- span, timed: Profiling spans around each command (see profiling).
+- REGISTRY, observed, write_metrics: Command latency metrics and their export
+  (see metrics).
 - ProjectError, AdminDataError: Custom exceptions for handling specific errors.
 
 Usage:
 - Run the script directly to execute the main function.
 """
 
+import os
 import sys
 
 # Importing functions from custom modules
-from db.db import validate_arguments, parse_project_name, get_admin_data
-from .admin.deploy_adm import create_project_files_two, create_project_files
+from db.db import (
+    validate_arguments,
+    split_arguments,
+    parse_project_name,
+    get_admin_data,
+)
+from .admin.deploy_adm import (
+    create_project_files_two,
+    create_project_files,
+    sync_project_files,
+)
+from .admin.archive_adm import pack_template, unpack_template
+from .admin.serialize_adm import scan_tree, update_tree, SizeLimits
+from .admin.render_adm import default_variables
+from .admin.batch_adm import read_batch_manifest, run_batch
+from .profiling import span, timed
+from .metrics import REGISTRY, observed, write_metrics
+from db.blobs import get_blob_store
+from db.storage import get_backend
+from db.manifest import Manifest, load_manifest, save_manifest
 
 # Importing constants and custom exceptions from settings module
 from app.settings import (
-    AVAILABLE_TEMPLATES,
     AVAILABLE_COMMANDS,
     TemplateCommands,
     Root,
@@ -31,27 +56,283 @@ from app.settings import (
     DirectoryError,
     TemplateError,
     AdminDataError,
+    OptionError,
+    ArchiveError,
+    DEFAULT_WORKERS,
 )
 
 
-def main():
+def get_workers(options):
+    """Return the writer thread count from the --workers option."""
+    value = options.get("workers", DEFAULT_WORKERS)
+    try:
+        workers = int(value)
+    except (TypeError, ValueError) as exc:
+        raise OptionError("workers", value) from exc
+    if workers < 1:
+        raise OptionError("workers", value)
+    return workers
+
+
+_SIZE_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+
+
+def get_size(options, option, default):
     """
-    Main function to execute the script.
+    Return a size in bytes from an option such as --max-file-size=100M.
+
+    The value is a number of bytes with an optional K, M or G suffix, or
+    "none" for no limit.
+    """
+    value = options.get(option)
+    if value is None:
+        return default
+    if isinstance(value, str) and value.lower() == "none":
+        return None
+    text = str(value).strip().lower().removesuffix("b")
+    unit = text[-1:] if text[-1:] in _SIZE_UNITS else ""
+    try:
+        size = int(float(text[: len(text) - len(unit)]) * _SIZE_UNITS[unit])
+    except ValueError as exc:
+        raise OptionError(option.replace("_", "-"), value) from exc
+    if size < 0:
+        raise OptionError(option.replace("_", "-"), value)
+    return size
+
+
+def get_size_limits(options):
+    """
+    Return the size thresholds of a serialization.
+
+    --inline-limit, --inline-template-limit and --max-file-size override the
+    defaults from the settings (see SizeLimits).
+    """
+    defaults = SizeLimits()
+    return SizeLimits(
+        get_size(options, "inline_limit", defaults.inline_file),
+        get_size(options, "inline_template_limit", defaults.inline_template),
+        get_size(options, "max_file_size", defaults.max_file),
+    )
+
+
+def report_skipped(skipped, limits):
+    """Print the files a serialization left out for their size."""
+    for rel_path, size in skipped:
+        print(
+            f"Skipped '{rel_path}' ({size} bytes): larger than the "
+            f"{limits.max_file} byte limit (--max-file-size)."
+        )
+
+
+def get_option_variables(options):
+    """Return the placeholder values set by --var-<name>=<value> options."""
+    variables = {}
+    for option, value in options.items():
+        if option.startswith("var_") and len(option) > 4:
+            if value is True:
+                raise OptionError(option.replace("_", "-"), "")
+            variables[option[4:]] = value
+    return variables
+
+
+def get_variables(project_name, options):
+    """
+    Return the values of the template placeholders for a project.
+
+    Every --var-<name>=<value> option sets {{<name>}} on top of the defaults
+    (project_name, package_name, technology, specifier).
+    """
+    variables = default_variables(project_name)
+    variables.update(get_option_variables(options))
+    return variables
+
+
+def get_template(project_name):
+    """Return the catalog project for the technology named by project_name."""
+    # Parse project name to extract technology and specifier
+    technology, _ = parse_project_name(project_name)
+
+    # Get administrative data for the specified technology
+    admin_data = get_admin_data(technology)
+    if not admin_data:
+        raise AdminDataError(technology)
+    return admin_data
+
+
+@timed()
+@observed("deserialize_command")
+def deserialize_command(project_dir, project_name, options):
+    """Create a project from the catalog template named by project_name."""
+    admin_data = get_template(project_name)
+
+    if options.get("sync"):
+        # Only write the files that differ from the template
+        sync_project_files(
+            project_dir,
+            project_name,
+            admin_data["project_tree"],
+            workers=get_workers(options),
+            delete_extras=bool(options.get("delete_extras")),
+            variables=get_variables(project_name, options),
+        )
+        return
+
+    # Create project files based on the retrieved administrative data
+    create_project_files_two(
+        project_dir,
+        project_name,
+        admin_data["project_tree"],
+        workers=get_workers(options),
+        variables=get_variables(project_name, options),
+    )
+
+
+@timed()
+@observed("pack_command")
+def pack_command(project_dir, project_name, options):
+    """Pack the catalog template named by project_name into an ASAR archive."""
+    admin_data = get_template(project_name)
+    archive_path = os.path.join(project_dir, f"{project_name}.asar")
+    count = pack_template(admin_data["project_tree"], archive_path)
+    print(f"Template '{project_name}' packed into '{archive_path}' ({count} files).")
+
+
+@timed()
+@observed("unpack_command")
+def unpack_command(project_dir, archive_path, options):
+    """Create a project from an ASAR archive, named after the archive file."""
+    if not os.path.isfile(archive_path):
+        raise ArchiveError(archive_path, "file not found")
+    project_name = os.path.splitext(os.path.basename(archive_path))[0]
+    unpack_template(archive_path, project_dir, project_name, get_workers(options))
+
+
+@timed()
+@observed("batch_command")
+def batch_command(base_dir, manifest_path, options):
+    """Create every project listed in a JSON or CSV manifest on a process pool."""
+    items = read_batch_manifest(manifest_path)
+    processes = options.get("processes")
+    if processes is not None:
+        try:
+            processes = int(processes)
+        except (TypeError, ValueError) as exc:
+            raise OptionError("processes", processes) from exc
+        if processes < 1:
+            raise OptionError("processes", processes)
+    # The pool already runs a project per core; writer threads are opt-in
+    workers = get_workers(options) if "workers" in options else 1
+    run_batch(
+        items,
+        base_dir,
+        processes=processes,
+        workers=workers,
+        sync=bool(options.get("sync")),
+        delete_extras=bool(options.get("delete_extras")),
+        variables=get_option_variables(options),
+    )
+
+
+@timed()
+@observed("serialize_command")
+def serialize_command(project_dir, project_name, options):
+    """Serialize project_dir into the template named project_name."""
+    blob_store = get_blob_store() if options.get("blobs") else None
+    manifest = Manifest(project_dir, project_name)
+    limits, skipped = get_size_limits(options), []
+    tree = scan_tree(
+        project_dir,
+        blob_store,
+        manifest,
+        ignore=not options.get("no_ignore"),
+        limits=limits,
+        skipped=skipped,
+    )
+    report_skipped(skipped, limits)
+    with span("catalog.upsert"):
+        get_backend().upsert({"technology": project_name, "project_tree": tree})
+    save_manifest(manifest)
+    print(f"Template '{project_name}' serialized from '{project_dir}'!")
+
+
+@timed()
+@observed("update_command")
+def update_command(project_dir, project_name, options):
+    """Re-serialize project_dir into an existing template, reading changed files only."""
+    admin_data = get_admin_data(project_name)
+    if not admin_data:
+        raise AdminDataError(project_name)
+    blob_store = get_blob_store() if options.get("blobs") else None
+    manifest = load_manifest(project_dir, project_name)
+    limits, skipped = get_size_limits(options), []
+    tree, read_count = update_tree(
+        project_dir,
+        admin_data["project_tree"],
+        manifest,
+        blob_store,
+        ignore=not options.get("no_ignore"),
+        limits=limits,
+        skipped=skipped,
+    )
+    report_skipped(skipped, limits)
+    with span("catalog.upsert"):
+        get_backend().upsert({"technology": project_name, "project_tree": tree})
+    save_manifest(manifest)
+    print(
+        f"Template '{project_name}' updated from '{project_dir}' "
+        f"({read_count} file(s) re-read)."
+    )
+
+
+COMMAND_HANDLERS = {
+    Root.SERIALIZE.value: serialize_command,
+    Root.UPDATE.value: update_command,
+    Root.PACK.value: pack_command,
+    Root.UNPACK.value: unpack_command,
+    Root.BATCH.value: batch_command,
+}
+
+
+def run_command(argv):
+    """
+    Validate and run one console command.
+
+    With --metrics-file=<path>, the metrics recorded while the command ran
+    are written to path when it ends (JSON for a .json file, the Prometheus
+    text format otherwise, see metrics.write_metrics). Only this command's
+    metrics are written, also in a daemon, whose registry keeps counting
+    across commands.
+
+    Args:
+        argv (list): The command-line arguments, without the program name.
+
+    Raises:
+        ProjectError: If the arguments are invalid or the command fails.
     """
+    _, options = split_arguments(argv)
+    metrics_file = options.get("metrics_file")
+    start_state = REGISTRY.state() if isinstance(metrics_file, str) else None
     try:
         # Validate command-line arguments
-        _, project_dir, project_name = validate_arguments()
+        command, project_dir, project_name = validate_arguments(argv)
 
-        # Parse project name to extract technology and specifier
-        technology, _ = parse_project_name(project_name)
+        handler = COMMAND_HANDLERS.get(command, deserialize_command)
+        handler(project_dir, project_name, options)
+    finally:
+        if start_state is not None:
+            # Written even when the command failed, e.g. after a partial batch
+            try:
+                write_metrics(metrics_file, registry=REGISTRY.since(start_state))
+            except OSError as e:
+                print(f"Error: metrics not written to '{metrics_file}': {e}")
 
-        # Get administrative data for the specified technology
-        admin_data = get_admin_data(technology)
-        if not admin_data:
-            raise AdminDataError(technology)
 
-        # Create project files based on the retrieved administrative data
-        create_project_files_two(project_dir, project_name, admin_data["project_tree"])
+def main():
+    """
+    Main function to execute the script.
+    """
+    try:
+        run_command(sys.argv[1:])
 
     except ProjectError as e:
         # Handle custom project-related errors
@@ -0,0 +1,389 @@
+"""
+This module keeps the operational metrics of LazyProject.
+
+Unlike the profiling spans (see profiling), metrics are always collected, so
+a long-running daemon or a batch run can be watched for regressions and tail
+latency. The registry holds:
+- counters, such as files_written, directories_created, bytes_written,
+  catalog_reloads and catalog_cache_hits;
+- latency histograms, such as operation_seconds{operation="get_admin_data"},
+  fed by the observed decorator.
+
+The registry is exported in the Prometheus text format (every metric
+prefixed with lazy_project_, counters suffixed with _total) or as a JSON
+snapshot, written to a file by write_metrics (console option
+--metrics-file), scraped from the daemon (main.py --metrics, or HTTP with
+--serve --metrics-port), or merged back from batch pool workers.
+
+Classes:
+- MetricsRegistry: Thread-safe counters and histograms.
+
+Functions:
+- inc: Adds to a counter of the shared registry.
+- observe: Records a value in a histogram of the shared registry.
+- observed: Decorator recording the latency of every call of a function.
+- format_metrics: Formats the shared registry as Prometheus text or JSON.
+- write_metrics: Atomically writes the shared registry to a file.
+
+Constants:
+- REGISTRY: The registry of this process.
+- LATENCY_BUCKETS: Upper bounds, in seconds, of the latency histograms.
+
+Imports:
+- bisect: For finding the bucket of a value.
+- threading: For the registry lock.
+"""
+
+import bisect
+import contextlib
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Prefix of the exported metric names
+NAMESPACE = "lazy_project"
+
+# Upper bounds of the latency buckets in seconds; scaffolding a template
+# takes from a fraction of a millisecond (a cached lookup) to seconds
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Help texts of the metrics fed by the app, by metric name
+METRIC_HELP = {
+    "files_written": "Project files written by deserialize, sync and unpack.",
+    "files_unchanged": "Project files left alone by sync because they matched.",
+    "directories_created": "Project directories created.",
+    "bytes_written": "Bytes of project file bodies written.",
+    "catalog_reloads": "Times the catalog was parsed or its journal replayed.",
+    "catalog_cache_hits": "Catalog accesses answered from memory.",
+    "catalog_slice_reads": "Single projects parsed through the sidecar index.",
+    "template_lookups": "Template lookups by technology, by result.",
+    "operation_seconds": "Latency of operations in seconds.",
+}
+
+
+def _labels_key(labels):
+    """Return the hashable, ordered form of a labels dict."""
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _escape(value):
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    """Format label pairs as {name="value",...} in the Prometheus text format."""
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_number(value):
+    """Format a sample value or bucket bound (floats keep their decimal point)."""
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms.
+
+    A metric is identified by its name and labels (a dict of strings); both
+    are created on first use.
+
+    Attributes:
+        buckets (tuple): Upper bounds of the histogram buckets.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """
+        Initializes an empty registry.
+
+        Args:
+            buckets (tuple): Increasing upper bounds of the histogram buckets.
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, value=1, labels=None):
+        """Add value to the counter name."""
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=None):
+        """Record value in the histogram name."""
+        key = (name, _labels_key(labels))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                    0,
+                ]
+            histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def state(self):
+        """
+        Return a copy of the raw values, which merge() accepts.
+
+        Returns:
+            tuple: (counters, histograms) dicts keyed by (name, labels).
+        """
+        with self._lock:
+            return (
+                dict(self._counters),
+                {
+                    key: [list(counts), total, count]
+                    for key, (counts, total, count) in self._histograms.items()
+                },
+            )
+
+    def drain(self):
+        """Return the raw values, as state() does, and reset the registry."""
+        with self._lock:
+            state = (self._counters, self._histograms)
+            self._counters, self._histograms = {}, {}
+        return state
+
+    def merge(self, state):
+        """
+        Add the values of another registry, e.g. of a pool worker.
+
+        Args:
+            state (tuple): Values returned by state() or drain() of a registry
+            with the same buckets.
+        """
+        counters, histograms = state
+        with self._lock:
+            for key, value in counters.items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, (counts, total, count) in histograms.items():
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    self._histograms[key] = [list(counts), total, count]
+                    continue
+                histogram[0] = [a + b for a, b in zip(histogram[0], counts)]
+                histogram[1] += total
+                histogram[2] += count
+
+    def reset(self):
+        """Drop every value."""
+        self.drain()
+
+    def since(self, state):
+        """
+        Return a new registry holding what was recorded after state was taken.
+
+        Args:
+            state (tuple): Values returned by state() of this registry earlier.
+
+        Returns:
+            MetricsRegistry: The differences; metrics that did not change are
+            left out.
+        """
+        old_counters, old_histograms = state
+        counters, histograms = self.state()
+        registry = MetricsRegistry(self.buckets)
+        for key, value in counters.items():
+            delta = value - old_counters.get(key, 0)
+            if delta:
+                registry._counters[key] = delta
+        for key, (counts, total, count) in histograms.items():
+            old = old_histograms.get(key)
+            if old is None:
+                registry._histograms[key] = [counts, total, count]
+            elif count != old[2]:
+                registry._histograms[key] = [
+                    [a - b for a, b in zip(counts, old[0])],
+                    total - old[1],
+                    count - old[2],
+                ]
+        return registry
+
+    def snapshot(self):
+        """
+        Return the values as a JSON-serializable dict.
+
+        Returns:
+            dict: {"counters": {name: [{"labels", "value"}]}, "histograms":
+            {name: [{"labels", "buckets": {bound: cumulative count}, "sum",
+            "count"}]}}; bounds are strings, the last one "+Inf".
+        """
+        counters, histograms = self.state()
+        bounds = [_format_number(bound) for bound in self.buckets] + ["+Inf"]
+        result = {"counters": {}, "histograms": {}}
+        for (name, labels), value in sorted(counters.items()):
+            result["counters"].setdefault(name, []).append(
+                {"labels": dict(labels), "value": value}
+            )
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            cumulative, buckets = 0, {}
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                buckets[bound] = cumulative
+            result["histograms"].setdefault(name, []).append(
+                {
+                    "labels": dict(labels),
+                    "buckets": buckets,
+                    "sum": total,
+                    "count": count,
+                }
+            )
+        return result
+
+    def to_prometheus(self):
+        """
+        Return the values in the Prometheus text exposition format.
+
+        Returns:
+            str: One HELP and TYPE line per metric, followed by its samples.
+        """
+        counters, histograms = self.state()
+        bounds = [_format_number(bound) for bound in self.buckets] + ["+Inf"]
+        lines = []
+
+        def header(name, full_name, kind):
+            if name in METRIC_HELP:
+                lines.append(f"# HELP {full_name} {METRIC_HELP[name]}")
+            lines.append(f"# TYPE {full_name} {kind}")
+
+        previous = None
+        for (name, labels), value in sorted(counters.items()):
+            full_name = f"{NAMESPACE}_{name}_total"
+            if name != previous:
+                header(name, full_name, "counter")
+                previous = name
+            lines.append(f"{full_name}{_format_labels(labels)} {_format_number(value)}")
+
+        previous = None
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            full_name = f"{NAMESPACE}_{name}"
+            if name != previous:
+                header(name, full_name, "histogram")
+                previous = name
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(labels, (("le", bound),))
+                lines.append(f"{full_name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{full_name}_sum{_format_labels(labels)} {total!r}")
+            lines.append(f"{full_name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+REGISTRY = MetricsRegistry()
+
+
+def inc(name, value=1, labels=None):
+    """Add value to the counter name of the shared registry."""
+    REGISTRY.inc(name, value, labels)
+
+
+def observe(name, value, labels=None):
+    """Record value in the histogram name of the shared registry."""
+    REGISTRY.observe(name, value, labels)
+
+
+def observed(operation):
+    """
+    Decorator recording the latency of every call of a function.
+
+    Calls are recorded in operation_seconds{operation=...}, whether they
+    return or raise.
+
+    Args:
+        operation (str): The operation label.
+    """
+    labels = {"operation": operation}
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                REGISTRY.observe(
+                    "operation_seconds", time.perf_counter() - start, labels
+                )
+
+        return wrapper
+
+    return decorator
+
+
+def format_metrics(fmt="prometheus", registry=None):
+    """
+    Format a registry for export.
+
+    Args:
+        fmt (str): "prometheus" for the text exposition format, "json" for
+        the snapshot.
+        registry (MetricsRegistry): The registry; the shared one if None.
+
+    Returns:
+        str: The formatted metrics.
+
+    Raises:
+        ValueError: For an unknown format.
+    """
+    registry = registry or REGISTRY
+    if fmt == "json":
+        return json.dumps(registry.snapshot(), indent=4) + "\n"
+    if fmt == "prometheus":
+        return registry.to_prometheus()
+    raise ValueError(f"unknown metrics format '{fmt}'")
+
+
+def write_metrics(file_path, fmt=None, registry=None):
+    """
+    Atomically write a registry to a file.
+
+    The file is replaced in one step, so the node_exporter textfile collector
+    or any other reader never sees a partial file.
+
+    Args:
+        file_path (str): Destination file.
+        fmt (str): "prometheus" or "json"; by default "json" for a .json file
+        and "prometheus" for any other.
+        registry (MetricsRegistry): The registry; the shared one if None.
+    """
+    if fmt is None:
+        fmt = "json" if file_path.endswith(".json") else "prometheus"
+    text = format_metrics(fmt, registry)
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix=".metrics-", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+        raise
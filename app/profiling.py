@@ -0,0 +1,281 @@
+"""
+This module times the phases of console and GUI operations.
+
+A span is a named, nestable timer: functions are wrapped with the timed
+decorator and blocks with the span context manager. Nothing is recorded
+until enable() is called (main.py --profile); while disabled, a timed
+function costs one extra call and a global lookup, and span returns a shared
+no-op context manager.
+
+Spans nest per thread, so the report is a tree: every phase shows its calls,
+its total time and its self time (the part not spent in nested spans), e.g.
+get_admin_data > catalog.parse, or create_project_files_two > plan, mkdir and
+write. enable() can also run cProfile and tracemalloc for the same run; their
+output is written to files by finish().
+
+Classes:
+- Profile: Timings collected by the spans of one run.
+
+Functions:
+- timed: Decorator timing every call of a function as a span.
+- span: Context manager timing a block as a span.
+- record: Adds a duration measured elsewhere as a top-level span.
+- enable: Starts collecting spans, optionally under cProfile and tracemalloc.
+- finish: Stops collecting, prints the breakdown and writes the dumps.
+
+Imports:
+- time: For the monotonic span clock.
+- threading: For the per-thread span stacks.
+"""
+
+import contextlib
+import functools
+import sys
+import threading
+import time
+
+# Lines of the tracemalloc dump (allocation sites, largest first)
+TRACEMALLOC_TOP = 50
+
+_NULL_SPAN = contextlib.nullcontext()
+
+# The Profile being collected, or None while profiling is disabled
+_profile = None
+
+
+class Profile:
+    """
+    Timings collected by the spans of one run.
+
+    Attributes:
+        started (int): perf_counter_ns() when the profile was created.
+        phases (dict): Span path (tuple of names) -> [calls, total_ns, self_ns].
+        profiler (cProfile.Profile): The profiler started by enable(), or None.
+        cprofile_path (str): Where finish() writes the cProfile stats, or None.
+        tracemalloc_path (str): Where finish() writes the tracemalloc
+        statistics, or None.
+    """
+
+    def __init__(self, started=None):
+        """
+        Initializes an empty profile.
+
+        Args:
+            started (int): perf_counter_ns() of the start of the run; now if None.
+        """
+        self.started = time.perf_counter_ns() if started is None else started
+        self.phases = {}
+        self.profiler = None
+        self.cprofile_path = None
+        self.tracemalloc_path = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def span(self, name):
+        """Return a context manager timing a block as the span name."""
+        return _Span(self, name)
+
+    def add(self, path, elapsed, self_time):
+        """Add one call of the span at path."""
+        with self._lock:
+            phase = self.phases.get(path)
+            if phase is None:
+                self.phases[path] = [1, elapsed, self_time]
+            else:
+                phase[0] += 1
+                phase[1] += elapsed
+                phase[2] += self_time
+
+    def stack(self):
+        """Return the stack of open spans of the calling thread."""
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def report(self):
+        """
+        Format the per-phase breakdown.
+
+        Phases are listed as a tree, children under their parent in order of
+        decreasing total time. Percentages are of the wall time since the
+        profile was created.
+
+        Returns:
+            str: The breakdown, one line per phase.
+        """
+        wall = time.perf_counter_ns() - self.started
+        with self._lock:
+            phases = dict(self.phases)
+        children = {}
+        for path in phases:
+            children.setdefault(path[:-1], []).append(path)
+
+        lines = [
+            f"{'phase':<44} {'calls':>7} {'total ms':>10} {'self ms':>10} {'%':>6}"
+        ]
+
+        def emit(parent):
+            for path in sorted(children.get(parent, ()), key=lambda p: -phases[p][1]):
+                calls, total, self_time = phases[path]
+                label = "  " * (len(path) - 1) + path[-1]
+                lines.append(
+                    f"{label:<44} {calls:>7} {total / 1e6:>10.2f} "
+                    f"{self_time / 1e6:>10.2f} {100 * total / max(wall, 1):>6.1f}"
+                )
+                emit(path)
+
+        emit(())
+        measured = sum(phases[path][1] for path in children.get((), ()))
+        lines.append(
+            f"{'(outside spans)':<44} {'':>7} {max(wall - measured, 0) / 1e6:>10.2f}"
+        )
+        lines.append(f"{'wall':<44} {'':>7} {wall / 1e6:>10.2f}")
+        return "\n".join(lines)
+
+
+class _Span:
+    """Context manager of one span call."""
+
+    __slots__ = ("profile", "name", "path", "start", "child_time")
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profile.stack()
+        self.path = (stack[-1].path if stack else ()) + (self.name,)
+        self.child_time = 0
+        stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter_ns() - self.start
+        stack = self.profile.stack()
+        stack.pop()
+        if stack:
+            stack[-1].child_time += elapsed
+        self.profile.add(self.path, elapsed, elapsed - self.child_time)
+        return False
+
+
+def span(name):
+    """
+    Return a context manager timing a block as the span name.
+
+    Args:
+        name (str): The phase name, e.g. "mkdir".
+
+    Returns:
+        A context manager; a shared no-op one while profiling is disabled.
+    """
+    profile = _profile
+    if profile is None:
+        return _NULL_SPAN
+    return _Span(profile, name)
+
+
+def timed(name=None):
+    """
+    Decorator timing every call of a function as a span.
+
+    Args:
+        name (str): The phase name; defaults to the function name.
+    """
+
+    def decorator(func):
+        phase = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = _profile
+            if profile is None:
+                return func(*args, **kwargs)
+            with _Span(profile, phase):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record(name, seconds):
+    """
+    Add a duration measured before profiling was enabled as a top-level span,
+    e.g. the imports the profiling module itself needs.
+
+    Args:
+        name (str): The phase name, e.g. "import".
+        seconds (float): The duration.
+    """
+    if _profile is not None:
+        elapsed = int(seconds * 1e9)
+        _profile.add((name,), elapsed, elapsed)
+
+
+def enable(cprofile_path=None, tracemalloc_path=None, started=None):
+    """
+    Start collecting spans.
+
+    Args:
+        cprofile_path (str): When given, the run is also profiled with
+        cProfile and the stats are written there by finish(), in the
+        pstats format (python -m pstats, snakeviz).
+        tracemalloc_path (str): When given, allocations are traced and the
+        peak and top allocation sites are written there by finish().
+        started (int): perf_counter_ns() of the start of the run, when it
+        started before profiling could be enabled (see record).
+
+    Returns:
+        Profile: The profile being collected.
+    """
+    global _profile
+    profile = Profile(started)
+    if tracemalloc_path:
+        import tracemalloc
+
+        tracemalloc.start()
+        profile.tracemalloc_path = tracemalloc_path
+    if cprofile_path:
+        import cProfile
+
+        profile.profiler = cProfile.Profile()
+        profile.cprofile_path = cprofile_path
+        profile.profiler.enable()
+    _profile = profile
+    return profile
+
+
+def finish(stream=None):
+    """
+    Stop collecting, print the per-phase breakdown and write the dumps.
+
+    Args:
+        stream: Where the breakdown is printed; sys.stderr by default, so it
+        does not mix with the output of the command.
+
+    Returns:
+        Profile: The collected profile, or None if profiling was not enabled.
+    """
+    global _profile
+    profile, _profile = _profile, None
+    if profile is None:
+        return None
+    if profile.profiler is not None:
+        profile.profiler.disable()
+        profile.profiler.dump_stats(profile.cprofile_path)
+    if profile.tracemalloc_path:
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        with open(profile.tracemalloc_path, "w", encoding="utf-8") as file:
+            file.write(f"current {current} bytes, peak {peak} bytes\n")
+            for stat in snapshot.statistics("lineno")[:TRACEMALLOC_TOP]:
+                file.write(f"{stat}\n")
+    print(profile.report(), file=stream or sys.stderr)
+    return profile
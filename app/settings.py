@@ -1,8 +1,12 @@
 """
 This module handles project-related exceptions and commands.
+
+The catalog-backed settings (technologies, AVAILABLE_TEMPLATES) are loaded on
+first access rather than at import time, so importing the console entry point
+does not read admins.json.
 """
 
-import json
+import os
 from enum import Enum, unique
 
 
@@ -16,10 +20,20 @@ class UsageError(ProjectError):
     """Exception raised for usage errors."""
 
     def __init__(self):
+        arguments = "\n".join(
+            f"  {command}: <{directory}> <{third}>"
+            for command, (directory, third) in COMMAND_ARGUMENTS.items()
+        )
+        options = "\n".join(
+            f"  {option:<30} {description}" for option, description in CONSOLE_OPTIONS
+        )
         self.message = (
-            "Usage: python main.py <command> <project_directory> <project_name>\n"
+            "Usage: python main.py <command> <project_directory> <project_name> "
+            "[options]\n"
+            f"Commands whose arguments differ:\n{arguments}\n"
+            f"Options:\n{options}\n"
             f"Available commands: {', '.join(AVAILABLE_COMMANDS)}\n"
-            f"Available templates: {', '.join(AVAILABLE_TEMPLATES)}"
+            f"Available templates: {', '.join(available_templates())}"
         )
         super().__init__(self.message)
 
@@ -49,7 +63,7 @@ class TemplateError(ProjectError):
     def __init__(self, template):
         self.message = (
             f"Invalid template '{template}'.\n"
-            f"Available templates: {', '.join(AVAILABLE_TEMPLATES)}"
+            f"Available templates: {', '.join(available_templates())}"
         )
         super().__init__(self.message)
 
@@ -62,23 +76,110 @@ class AdminDataError(ProjectError):
         super().__init__(self.message)
 
 
+class OptionError(ProjectError):
+    """Exception raised for invalid command-line option values."""
+
+    def __init__(self, option, value):
+        self.message = f"Invalid value '{value}' for option '--{option}'."
+        super().__init__(self.message)
+
+
+class MaterializeError(ProjectError):
+    """Exception raised when some files of a project could not be written."""
+
+    def __init__(self, project_name, failed_count):
+        self.message = (
+            f"{failed_count} file(s) of project '{project_name}' could not be written."
+        )
+        super().__init__(self.message)
+
+
+class StorageError(ProjectError):
+    """Exception raised when the catalog storage backend cannot be used."""
+
+    def __init__(self, backend, reason):
+        self.message = f"Invalid storage backend '{backend}': {reason}"
+        super().__init__(self.message)
+
+
+class CancelledError(ProjectError):
+    """Exception raised when a long-running operation is cancelled by the user."""
+
+    def __init__(self, operation):
+        self.message = f"{operation} was cancelled."
+        super().__init__(self.message)
+
+
+class ArchiveError(ProjectError):
+    """Exception raised when a template archive cannot be read."""
+
+    def __init__(self, archive_path, reason):
+        self.message = f"Invalid template archive '{archive_path}': {reason}"
+        super().__init__(self.message)
+
+
+class ManifestError(ProjectError):
+    """Exception raised when a batch manifest cannot be read."""
+
+    def __init__(self, manifest_path, reason):
+        self.message = f"Invalid batch manifest '{manifest_path}': {reason}"
+        super().__init__(self.message)
+
+
+class BatchError(ProjectError):
+    """Exception raised when some projects of a batch could not be created."""
+
+    def __init__(self, failed_count, total_count):
+        self.message = f"{failed_count} of {total_count} batch project(s) failed."
+        super().__init__(self.message)
+
+
+class DaemonError(ProjectError):
+    """Exception raised when the daemon cannot listen on its socket or port."""
+
+    def __init__(self, socket_path, reason):
+        self.message = f"Cannot serve on '{socket_path}': {reason}"
+        super().__init__(self.message)
+
+
 ADMINS_FILE_PATH = "db/admin/admins.json"
+BLOBS_DIR = "db/admin/blobs"
+MANIFESTS_DIR = "db/admin/manifests"
+SQLITE_FILE_PATH = "db/admin/admins.sqlite3"
+# Catalog storage backend: "json" (ADMINS_FILE_PATH) or "sqlite" (SQLITE_FILE_PATH)
+STORAGE_BACKEND = os.environ.get("LAZY_PROJECT_STORAGE", "json")
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+# Size policy of serialized files, in bytes (see serialize_adm.SizeLimits):
+# text files up to INLINE_FILE_LIMIT are kept inline in the catalog while the
+# template's inline bytes stay under INLINE_TEMPLATE_LIMIT, larger ones are
+# streamed to the blob store, and files over MAX_FILE_SIZE are skipped
+INLINE_FILE_LIMIT = 1 << 20
+INLINE_TEMPLATE_LIMIT = 64 << 20
+MAX_FILE_SIZE = 256 << 20
 
 
 def load_technologies(file_path):
-    """Load technologies from a JSON file."""
+    """
+    Load technologies from a catalog file, plain or compressed.
+
+    The file is parsed with db.compression.load_catalog_bytes, which also
+    reads catalogs written with a stream or body codec.
+    """
+    # Imported here: db imports this module while app is being initialized
+    from db.compression import load_catalog_bytes
+
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
+        with open(file_path, "rb") as file:
+            data = load_catalog_bytes(file.read())
             return data.get("technologies", [])
     except FileNotFoundError as exc:
         raise AdminDataError("File not found") from exc
-    except json.JSONDecodeError as exc:
+    except ValueError as exc:
+        # Invalid JSON, invalid UTF-8 or an unknown codec
         raise AdminDataError("Invalid JSON format") from exc
 
 
-# Load technologies from the JSON file
-technologies = load_technologies(ADMINS_FILE_PATH)
+_technologies = None
 
 
 @unique
@@ -98,9 +199,21 @@ class TemplateCommands(Enum):
             cls.__members__.update(new_enum.__members__)
 
 
-# Dynamically add technologies from the JSON file
-for tech in technologies:
-    TemplateCommands.add_technology(tech)
+def get_technologies():
+    """Load technologies from the JSON file on first use and register them as templates."""
+    global _technologies
+    if _technologies is None:
+        _technologies = load_technologies(ADMINS_FILE_PATH)
+        # Dynamically add technologies from the JSON file
+        for tech in _technologies:
+            TemplateCommands.add_technology(tech)
+    return _technologies
+
+
+def available_templates():
+    """Return the values of all template commands."""
+    get_technologies()
+    return [tech.value for tech in TemplateCommands]
 
 
 class Root(Enum):
@@ -110,12 +223,47 @@ class Root(Enum):
     UPDATE = "update_template"
     DELETE = "delete_template"
     DESERIALIZE = "deserialize_template"
+    PACK = "pack_template"
+    UNPACK = "unpack_template"
+    BATCH = "batch_template"
 
 
-AVAILABLE_TEMPLATES = [tech.value for tech in TemplateCommands]
 AVAILABLE_COMMANDS = [cmd.value for cmd in Root]
 
+# Positional arguments of the commands that do not take a project name
+COMMAND_ARGUMENTS = {
+    Root.UNPACK.value: ("project_directory", "archive.asar"),
+    Root.BATCH.value: ("base_directory", "manifest.json|manifest.csv"),
+}
+
+# Options of the console commands, listed by UsageError; an option a command
+# reads from split_arguments belongs here
+CONSOLE_OPTIONS = (
+    ("--workers=N", "Writer threads (deserialize, unpack, batch)."),
+    ("--sync", "Update an existing project, writing changed files only."),
+    ("--delete-extras", "With --sync, remove files that are not in the template."),
+    ("--var-<name>=<value>", "Value of the {{name}} placeholder (deserialize, batch)."),
+    ("--processes=N", "Pool size of batch_template; defaults to the CPU count."),
+    ("--blobs", "Store file bodies in the blob store (serialize, update)."),
+    ("--no-ignore", "Also serialize VCS, venv, node_modules and ignored paths."),
+    ("--inline-limit=SIZE", "Largest text file kept inline (K, M, G suffixes)."),
+    ("--inline-template-limit=SIZE", "Inline text per template before blobs."),
+    ("--max-file-size=SIZE", "Larger files are skipped; 'none' for no limit."),
+    ("--metrics-file=PATH", "Write this command's metrics when it ends (.json: JSON)."),
+    ("--no-daemon", "Run in this process even if a daemon is serving."),
+)
+
+
+def __getattr__(name):
+    """Resolve the catalog-backed settings lazily on first access."""
+    if name == "technologies":
+        return get_technologies()
+    if name == "AVAILABLE_TEMPLATES":
+        return available_templates()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
     """Main entry point for testing purposes."""
-    print("Available Templates:", AVAILABLE_TEMPLATES)
+    print("Available Templates:", available_templates())
     print("Available Commands:", AVAILABLE_COMMANDS)
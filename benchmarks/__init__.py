@@ -0,0 +1,16 @@
+"""
+Benchmarks for the lazy_project serializer, deserializer and catalog.
+
+Run the scripts from the repository root, e.g.:
+    python -m benchmarks.run --files 10000 -o before.json
+    python -m benchmarks.compare before.json after.json
+    python -m benchmarks.bench_serialize --files 10000 100000
+
+Modules:
+- synthetic: Deterministic generator of template trees and catalogs.
+- run: JSON-reporting suite for serialize, deserialize and catalog lookup.
+- compare: Side-by-side comparison of two suite reports.
+- bench_serialize: scandir serializer against the legacy os.walk serializer.
+- bench_import: Cold-start import report of the --console path.
+- bench_compression: Catalog size against load time per codec and level.
+"""
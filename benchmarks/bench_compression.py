@@ -0,0 +1,113 @@
+"""
+Benchmark of catalog size against load time for each compression mode.
+
+Every mode writes the same catalog with write_catalog and reports:
+- size: bytes on disk and the ratio to the plain catalog;
+- write: seconds spent in write_catalog;
+- load: seconds for a cold full parse (TemplateCatalog.data);
+- lookup: seconds for a cold single-technology get, which uses the sidecar
+  index for plain and body-compressed catalogs and a full parse for streams.
+
+The catalog is synthetic (benchmarks.synthetic) unless --source points at a
+real template directory, which is then serialized once per technology.
+Synthetic bodies are random text and compress worse than real source code.
+
+Usage:
+    python -m benchmarks.bench_compression --files 2000 --technologies 10
+    python -m benchmarks.bench_compression --source path/to/template
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import app  # noqa: F401  (app must be imported before db, see db.db)
+from app.admin.serialize_adm import scan_tree
+from benchmarks.synthetic import TreeSpec, build_catalog
+from db.catalog import TemplateCatalog, write_catalog
+
+MODES = (
+    ("plain", {}),
+    ("body zlib-1", {"body_codec": "zlib", "level": 1}),
+    ("body zlib-6", {"body_codec": "zlib", "level": 6}),
+    ("body zlib-9", {"body_codec": "zlib", "level": 9}),
+    ("body lzma-0", {"body_codec": "lzma", "level": 0}),
+    ("body lzma-6", {"body_codec": "lzma", "level": 6}),
+    ("stream zlib-1", {"stream_codec": "zlib", "level": 1}),
+    ("stream zlib-6", {"stream_codec": "zlib", "level": 6}),
+    ("stream zlib-9", {"stream_codec": "zlib", "level": 9}),
+    ("stream lzma-0", {"stream_codec": "lzma", "level": 0}),
+    ("stream lzma-6", {"stream_codec": "lzma", "level": 6}),
+    ("stream lzma-9", {"stream_codec": "lzma", "level": 9}),
+)
+
+
+def source_catalog(directory, technologies):
+    """Build a catalog holding the tree of a real directory once per technology."""
+    tree = scan_tree(directory)
+    return {
+        "projects": [
+            {"id": number + 1, "technology": f"tech{number}", "project_tree": tree}
+            for number in range(technologies)
+        ]
+    }
+
+
+def median_seconds(func, repeats):
+    """Return the median wall time of func over repeats runs."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    """Write the catalog in every mode and print one line per mode."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--mean-size", type=int, default=2048)
+    parser.add_argument("--technologies", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--source", help="Serialize this directory instead.")
+    args = parser.parse_args()
+
+    if args.source:
+        data = source_catalog(args.source, args.technologies)
+    else:
+        spec = TreeSpec(files=args.files, mean_size=args.mean_size)
+        data = build_catalog(spec, args.technologies)
+    technology = f"tech{args.technologies // 2}"
+
+    workdir = tempfile.mkdtemp(prefix="lazy_bench_")
+    path = os.path.join(workdir, "admins.json")
+    plain_size = None
+    try:
+        print(
+            f"{'mode':<14} {'bytes':>12} {'ratio':>6} "
+            f"{'write s':>9} {'load s':>9} {'lookup s':>9}"
+        )
+        for name, options in MODES:
+            start = time.perf_counter()
+            write_catalog(path, data, **options)
+            write_s = time.perf_counter() - start
+            size = os.path.getsize(path)
+            plain_size = plain_size or size
+            load_s = median_seconds(lambda: TemplateCatalog(path).data(), args.repeats)
+            lookup_s = median_seconds(
+                lambda: TemplateCatalog(path).get(technology), args.repeats
+            )
+            print(
+                f"{name:<14} {size:>12,} {size / plain_size:>6.3f} "
+                f"{write_s:>9.4f} {load_s:>9.4f} {lookup_s:>9.4f}"
+            )
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
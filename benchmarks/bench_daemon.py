@@ -0,0 +1,113 @@
+"""
+Latency benchmark of the resident daemon (app.daemon).
+
+Starts `python main.py --serve` on a temporary socket and scaffolds the same
+template again and again in three ways, reporting the median milliseconds:
+- local: `main.py --console ... --no-daemon` in a fresh interpreter, the
+  path without a daemon (imports and catalog parse on every run);
+- forwarded: `main.py --console ...` in a fresh interpreter, forwarded to
+  the daemon (interpreter start plus one round trip);
+- request: client.forward called in this process, i.e. the latency of the
+  request itself as the daemon serves it.
+
+Usage:
+    python -m benchmarks.bench_daemon --runs 20 --template fastapi
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from client import forward
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_for_socket(socket_path, process, timeout=30):
+    """Wait until the daemon listens on socket_path."""
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            raise SystemExit(f"daemon did not start:\n{process.stderr.read()}")
+        time.sleep(0.05)
+
+
+def run_process(argv, env):
+    """Return the seconds of one console run in a fresh interpreter."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "main.py", "--console", *argv],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        raise SystemExit(f"console run failed:\n{result.stdout}{result.stderr}")
+    return seconds
+
+
+def run_request(argv, socket_path):
+    """Return the seconds of one request forwarded from this process."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        status = forward(argv, socket_path)
+        seconds = time.perf_counter() - start
+    if status != 0:
+        raise SystemExit(f"request failed with status {status}")
+    return seconds
+
+
+def main():
+    """Print the scaffolding latency with and without the daemon."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--template", default="fastapi")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="lazy_daemon_")
+    socket_path = os.path.join(work_dir, "daemon.sock")
+    env = dict(os.environ, LAZY_PROJECT_SOCKET=socket_path)
+    argv = ["deserialize_template", work_dir, f"{args.template}_bench"]
+    daemon = subprocess.Popen(
+        [sys.executable, "main.py", "--serve"],
+        cwd=REPO_ROOT,
+        env=env,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        wait_for_socket(socket_path, daemon)
+        modes = (
+            ("local", lambda: run_process(argv + ["--no-daemon"], env)),
+            ("forwarded", lambda: run_process(argv, env)),
+            ("request", lambda: run_request(argv, socket_path)),
+        )
+        samples = {name: [] for name, _run in modes}
+        for _ in range(args.runs):
+            for name, run in modes:
+                samples[name].append(run())
+    finally:
+        daemon.terminate()
+        daemon.wait()
+        shutil.rmtree(work_dir)
+
+    print(f"{'mode':<10} {'median ms':>10} {'min ms':>8}")
+    for name, seconds in samples.items():
+        print(
+            f"{name:<10} {statistics.median(seconds) * 1000:>10.1f} "
+            f"{min(seconds) * 1000:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
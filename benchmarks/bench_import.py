@@ -0,0 +1,92 @@
+"""
+Cold-start benchmark of the headless console path.
+
+Runs `python -X importtime main.py --console deserialize_template <tmp> <name>`
+in fresh interpreters, then reports the wall time of each run, the total
+import time and the slowest imports by cumulative time. The run fails if
+any PyQt5 module is imported. --no-daemon keeps a running daemon (see
+app.daemon) out of the measurement.
+
+Usage:
+    python -m benchmarks.bench_import --runs 10 --template flask
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output.
+
+    Returns:
+        list: (cumulative microseconds, module name, nesting level) per imported module.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, raw_name = line.split("|")
+        level = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        imports.append((int(cumulative), raw_name.strip(), level))
+    return imports
+
+
+def run_once(template):
+    """Scaffold one project in a fresh interpreter and return (seconds, imports)."""
+    target = tempfile.mkdtemp(prefix="lazy_import_")
+    try:
+        command = [
+            sys.executable, "-X", "importtime", "main.py", "--console",
+            "deserialize_template", target, template, "--no-daemon",
+        ]
+        start = time.perf_counter()
+        result = subprocess.run(
+            command, cwd=REPO_ROOT, capture_output=True, text=True, check=False
+        )
+        seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(target)
+    if result.returncode != 0:
+        raise SystemExit(f"console run failed:\n{result.stdout}{result.stderr}")
+    return seconds, parse_importtime(result.stderr)
+
+
+def main():
+    """Run the console path several times and print the cold-start report."""
+    parser = argparse.ArgumentParser(description="Cold-start benchmark of --console.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--template", default="flask")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    timings = []
+    imports = []
+    for _ in range(args.runs):
+        seconds, imports = run_once(args.template)
+        timings.append(seconds)
+
+    qt_modules = [name for _, name, _ in imports if name.startswith("PyQt5")]
+    top_level = [us for us, _, level in imports if level == 0]
+    print(f"runs: {args.runs}")
+    print(f"wall time: median {statistics.median(timings) * 1000:.1f} ms, "
+          f"min {min(timings) * 1000:.1f} ms")
+    print(f"modules imported: {len(imports)}, "
+          f"total import time {sum(top_level) / 1000:.1f} ms")
+    print("slowest imports (cumulative):")
+    for us, name, _ in sorted(imports, reverse=True)[: args.top]:
+        print(f"  {us / 1000:8.2f} ms  {name}")
+    if qt_modules:
+        raise SystemExit(f"PyQt5 imported on the console path: {qt_modules}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Peak memory benchmark of serializing a directory with a large text file.
+
+A temporary directory holds one large text file (--megabytes) next to a set
+of small ones. Each mode runs scan_tree in a fresh interpreter, whose peak
+RSS growth over its RSS before the scan is reported:
+- inline: no size limits, the large file is read into the tree as a string
+  (the behaviour before SizeLimits);
+- limits: the default SizeLimits, the large file is streamed to the blob
+  store and only its digest is kept;
+- skip: --max-file-size below the large file, which is left out.
+
+The children run in the temporary directory, so the blob store they write
+to (db/admin/blobs, relative to the working directory) is removed with it.
+
+Usage:
+    python -m benchmarks.bench_large_files --megabytes 512
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LINE = "lorem ipsum dolor sit amet, consectetur adipiscing elit\n"
+
+
+def child(source, mode):
+    """Serialize source and print its peak RSS growth in MiB as JSON."""
+    import resource
+    import time
+
+    import app  # noqa: F401  (app must be imported before db, see db.db)
+    from app.admin.serialize_adm import SizeLimits, scan_tree
+
+    limits = {
+        "inline": SizeLimits(None, None, None),
+        "limits": SizeLimits(),
+        "skip": SizeLimits(max_file=1 << 20),
+    }[mode]
+    with open("/proc/self/status", encoding="ascii") as status:
+        before = next(
+            int(line.split()[1]) for line in status if line.startswith("VmRSS:")
+        )
+    skipped = []
+    start = time.perf_counter()
+    scan_tree(source, limits=limits, skipped=skipped)
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    stats = {
+        "peak_mib": (peak - before) / 1024,
+        "seconds": seconds,
+        "skipped": len(skipped),
+    }
+    print(json.dumps(stats))
+
+
+def write_source(root, megabytes, small_files):
+    """Write the large text file and the small ones."""
+    os.makedirs(os.path.join(root, "src"))
+    for number in range(small_files):
+        path = os.path.join(root, "src", f"m{number}.py")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(LINE * 20)
+    chunk = LINE * ((1 << 20) // len(LINE))
+    with open(os.path.join(root, "data.log"), "w", encoding="utf-8") as file:
+        for _ in range(megabytes):
+            file.write(chunk)
+
+
+def main():
+    """Print the peak memory of serializing with and without size limits."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--megabytes", type=int, default=256)
+    parser.add_argument("--small-files", type=int, default=200)
+    parser.add_argument("--work-dir", help="Directory for the temporary files.")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="lazy_large_", dir=args.work_dir)
+    source = os.path.join(work_dir, "source")
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    try:
+        write_source(source, args.megabytes, args.small_files)
+        print(f"{'mode':<8} {'peak MiB':>9} {'seconds':>8} {'skipped':>8}")
+        for mode in ("inline", "limits", "skip"):
+            command = [sys.executable, "-m", "benchmarks.bench_large_files"]
+            result = subprocess.run(
+                command + ["--child", source, mode],
+                cwd=work_dir,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            stats = json.loads(result.stdout)
+            print(
+                f"{mode:<8} {stats['peak_mib']:>9.1f} {stats['seconds']:>8.2f} "
+                f"{stats['skipped']:>8}"
+            )
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
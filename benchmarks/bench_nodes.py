@@ -0,0 +1,122 @@
+"""
+Memory and speed benchmark of the __slots__ project tree nodes (db.tree).
+
+A synthetic directory (see benchmarks.synthetic) is serialized with
+scan_tree, which builds FileNode and DirNode objects. The same tree is then
+converted to the dict representation of the catalog (to_json) and back
+(from_json), and for each representation the memory it holds is measured
+with tracemalloc, excluding the file bodies, which both share.
+
+The tree is also written as a catalog and loaded twice: parsed into dicts
+(load_catalog_bytes), and through TemplateCatalog, which caches its trees as
+nodes. Both figures include the file bodies.
+
+Usage:
+    python -m benchmarks.bench_nodes --files 20000
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import app  # noqa: F401  (app must be imported before db, see db.db)
+from app.admin.serialize_adm import scan_tree
+from db.catalog import TemplateCatalog, write_catalog
+from db.compression import load_catalog_bytes
+from db.tree import from_json, to_json
+from benchmarks.synthetic import TreeSpec, write_tree
+
+
+def count_nodes(tree):
+    """Return the number of nodes of a tree."""
+    total = 0
+    for node in tree:
+        total += 1
+        if node.get("is_folder"):
+            total += count_nodes(node["children"])
+    return total
+
+
+def traced(func):
+    """Return (result, bytes still allocated by func when it returns)."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def median_seconds(func, repeats):
+    """Return the median wall time of func over repeats runs."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    """Print the memory per node and the conversion times of both representations."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="lazy_nodes_")
+    try:
+        write_tree(
+            TreeSpec(files=args.files, depth=4, size_dist="fixed", mean_size=32),
+            root,
+        )
+        scan_seconds = median_seconds(lambda: scan_tree(root), args.repeats)
+        nodes = scan_tree(root)
+        catalog_path = f"{root}.json"
+        write_catalog(
+            catalog_path, {"projects": [{"technology": "bench", "project_tree": nodes}]}
+        )
+    finally:
+        shutil.rmtree(root)
+
+    try:
+        with open(catalog_path, "rb") as file:
+            raw = file.read()
+        _, raw_dict_bytes = traced(lambda: load_catalog_bytes(raw))
+        _, cache_bytes = traced(lambda: TemplateCatalog(catalog_path).data())
+        dict_load = median_seconds(lambda: load_catalog_bytes(raw), args.repeats)
+        cache_load = median_seconds(
+            lambda: TemplateCatalog(catalog_path).data(), args.repeats
+        )
+    finally:
+        os.remove(catalog_path)
+
+    total = count_nodes(nodes)
+    # The bodies are the same strings in every representation, so only the
+    # containers built around them are measured
+    dicts, dict_bytes = traced(lambda: to_json(nodes))
+    _, node_bytes = traced(lambda: from_json(dicts))
+    to_seconds = median_seconds(lambda: to_json(nodes), args.repeats)
+    from_seconds = median_seconds(lambda: from_json(dicts), args.repeats)
+
+    print(f"{total} nodes, scan_tree {scan_seconds:.3f}s")
+    print(f"{'representation':<17} {'bytes/node':>10} {'total MiB':>10}")
+    for name, size in (("dict", dict_bytes), ("FileNode/DirNode", node_bytes)):
+        print(f"{name:<17} {size / total:>10.0f} {size / (1 << 20):>10.1f}")
+    print(f"to_json   {to_seconds * 1000:8.1f} ms")
+    print(f"from_json {from_seconds * 1000:8.1f} ms")
+    print(f"{'catalog load':<17} {'total MiB':>10} {'ms':>8}")
+    for name, size, seconds in (
+        ("dicts", raw_dict_bytes, dict_load),
+        ("TemplateCatalog", cache_bytes, cache_load),
+    ):
+        print(f"{name:<17} {size / (1 << 20):>10.1f} {seconds * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Overhead benchmark of the profiling spans (app.profiling).
+
+Reports the nanoseconds per call of a trivial function called directly,
+wrapped with timed while profiling is disabled, and with profiling enabled,
+and of a span block in both states. The disabled figures are what every
+instrumented call pays in normal runs.
+
+Usage:
+    python -m benchmarks.bench_profiling --calls 1000000
+"""
+
+import argparse
+import io
+import time
+
+import app  # noqa: F401  (app must be imported before db, see db.db)
+from app import profiling
+
+
+def noop():
+    """The function being timed."""
+    return None
+
+
+timed_noop = profiling.timed("noop")(noop)
+
+
+def span_block():
+    """A block timed as a span."""
+    with profiling.span("noop"):
+        pass
+
+
+def per_call_ns(func, calls):
+    """Return the mean nanoseconds per call of func."""
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter_ns() - start) / calls
+
+
+def main():
+    """Print the cost per call of the spans, disabled and enabled."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=1000000)
+    args = parser.parse_args()
+
+    rows = [
+        ("direct call", per_call_ns(noop, args.calls)),
+        ("timed, disabled", per_call_ns(timed_noop, args.calls)),
+        ("span, disabled", per_call_ns(span_block, args.calls)),
+    ]
+    profiling.enable()
+    rows.append(("timed, enabled", per_call_ns(timed_noop, args.calls)))
+    rows.append(("span, enabled", per_call_ns(span_block, args.calls)))
+    profiling.finish(io.StringIO())
+
+    print(f"{'mode':<16} {'ns/call':>8}")
+    for name, nanoseconds in rows:
+        print(f"{name:<16} {nanoseconds:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
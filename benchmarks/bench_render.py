@@ -0,0 +1,116 @@
+"""
+Benchmark of placeholder rendering during deserialization.
+
+Writes the same synthetic project tree with create_project_files_two in three
+modes and reports the median seconds of planning (where rendering happens,
+see plan_project_files) and of the whole call:
+- verbatim: variables=None, the template is written as stored;
+- render cold: with variables, the render plan caches cleared first;
+- render warm: with variables and the plans compiled by a previous run.
+
+A share of the files (--templated) carries placeholders in its content and
+every folder name one placeholder, so the run covers both paths: texts that
+are compiled and rendered, and texts skipped by the "{{" check. The modes
+take turns in every repeat, so disk writeback slowing later writes down
+affects them alike; --target-dir on a tmpfs gives steadier write times.
+
+Usage:
+    python -m benchmarks.bench_render --files 5000 --templated 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import shutil
+import statistics
+import tempfile
+import time
+
+import app  # noqa: F401  (app must be imported before db, see db.db)
+from app.admin.deploy_adm import create_project_files_two, plan_project_files
+from app.admin.render_adm import (
+    TemplateRenderer,
+    _blob_has_placeholders,
+    compile_template,
+    default_variables,
+)
+from benchmarks.synthetic import TreeSpec, build_project_tree
+
+PLACEHOLDERS = (
+    "\nNAME = '{{project_name}}'\nPORT = {{ port }}\nPKG = {{package_name}}\n"
+)
+
+
+def templated_tree(tree, share):
+    """Add placeholders to a share of the files and to every folder name."""
+    files = 0
+    for node in tree:
+        if node.get("is_folder"):
+            node["name"] = "{{package_name}}_" + node["name"]
+            templated_tree(node["children"], share)
+        else:
+            files += 1
+            if share and files % max(1, round(1 / share)) == 0:
+                node["content"] = PLACEHOLDERS + node["content"] + PLACEHOLDERS
+    return tree
+
+
+def clear_caches(clear):
+    """Drop the compiled render plans and blob verdicts if clear is set."""
+    if clear:
+        compile_template.cache_clear()
+        _blob_has_placeholders.cache_clear()
+
+
+def run(tree, variables, target_dir, clear):
+    """Return (plan seconds, total seconds) of writing tree to a fresh directory."""
+    target = tempfile.mkdtemp(prefix="lazy_bench_", dir=target_dir)
+    renderer = None if variables is None else TemplateRenderer(variables)
+    try:
+        clear_caches(clear)
+        start = time.perf_counter()
+        plan_project_files(target, "bench_app", tree, renderer)
+        plan_s = time.perf_counter() - start
+        clear_caches(clear)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            create_project_files_two(target, "bench_app", tree, variables=variables)
+            total_s = time.perf_counter() - start
+    finally:
+        shutil.rmtree(target)
+    return plan_s, total_s
+
+
+def main():
+    """Print the write times with and without rendering."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--mean-size", type=int, default=2048)
+    parser.add_argument("--templated", type=float, default=0.2)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--target-dir", help="Directory to write the projects in.")
+    args = parser.parse_args()
+
+    spec = TreeSpec(files=args.files, mean_size=args.mean_size)
+    tree = templated_tree(build_project_tree(spec), args.templated)
+    variables = dict(default_variables("bench_app"), port="8080")
+
+    modes = (
+        ("verbatim", None, False),
+        ("render cold", variables, True),
+        ("render warm", variables, False),
+    )
+    samples = {name: [] for name, _variables, _clear in modes}
+    for _ in range(args.repeats):
+        for name, mode_variables, clear in modes:
+            samples[name].append(run(tree, mode_variables, args.target_dir, clear))
+
+    print(f"{'mode':<14} {'plan s':>9} {'total s':>9}")
+    for name, results in samples.items():
+        plan_s = statistics.median(plan for plan, _total in results)
+        total_s = statistics.median(total for _plan, total in results)
+        print(f"{name:<14} {plan_s:>9.4f} {total_s:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
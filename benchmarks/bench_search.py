@@ -0,0 +1,161 @@
+"""
+Benchmark of the catalog search index (db.search_index).
+
+A synthetic catalog of source-like text (words drawn from a Zipf-distributed
+vocabulary of identifiers) is written with write_catalog and indexed through
+the JSON backend. The benchmark reports:
+- build: seconds of the first full sync and the growth of the RSS;
+- query: median milliseconds of a set of queries, from a rare word to a
+  one-letter-at-a-time typed prefix, and their hit counts;
+- resync: seconds for a sync after one technology was changed (only the
+  changed file is tokenized again) and after nothing changed.
+
+Random character bodies (benchmarks.synthetic) are not used: every word in
+them is unique, which no real template looks like.
+
+Usage:
+    python -m benchmarks.bench_search --megabytes 100 --technologies 20
+"""
+
+import argparse
+import copy
+import itertools
+import os
+import random
+import shutil
+import statistics
+import string
+import tempfile
+import time
+
+import app  # noqa: F401  (app must be imported before db, see db.db)
+from db.catalog import write_catalog
+from db.search_index import SearchIndex
+from db.storage import JsonBackend
+
+PUNCTUATION = ("(", ")", ".", ", ", " = ", ": ", "_")
+
+
+def _vocabulary(rng, size):
+    """Return size distinct identifier-like words."""
+    words = set()
+    while len(words) < size:
+        length = rng.randint(3, 10)
+        words.add("".join(rng.choices(string.ascii_lowercase, k=length)))
+    return sorted(words)
+
+
+def _text(rng, words, cum_weights, size):
+    """Return about size characters of lines of words and punctuation."""
+    parts, total = [], 0
+    while total < size:
+        line = "".join(
+            word + rng.choice(PUNCTUATION)
+            for word in rng.choices(
+                words, cum_weights=cum_weights, k=rng.randint(3, 10)
+            )
+        )
+        parts.append(line)
+        total += len(line) + 1
+    return "\n".join(parts)
+
+
+def word_catalog(megabytes, technologies, mean_size, vocabulary, seed=0):
+    """Build catalog data of about megabytes of word text over technologies."""
+    rng = random.Random(seed)
+    words = _vocabulary(rng, vocabulary)
+    cum_weights = list(
+        itertools.accumulate(1.0 / rank for rank in range(1, len(words) + 1))
+    )
+    files = max(1, megabytes * 1024 * 1024 // mean_size // technologies)
+    projects = []
+    for number in range(technologies):
+        folders = [
+            {"name": f"pkg_{i}", "is_folder": True, "children": []} for i in range(16)
+        ]
+        for index in range(files):
+            folders[index % len(folders)]["children"].append(
+                {
+                    "name": f"{rng.choice(words)}_{index}.py",
+                    "is_folder": False,
+                    "content": _text(rng, words, cum_weights, mean_size),
+                }
+            )
+        projects.append(
+            {"id": number + 1, "technology": f"tech{number}", "project_tree": folders}
+        )
+    return {"projects": projects}, words
+
+
+def _rss_kb():
+    """Return the resident set size of this process in KiB (Linux only)."""
+    with open("/proc/self/status", encoding="ascii") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def median_ms(func, repeats):
+    """Return the median wall time of func in milliseconds and its last result."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    """Build, query and resync the index and print the timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--megabytes", type=int, default=100)
+    parser.add_argument("--technologies", type=int, default=20)
+    parser.add_argument("--mean-size", type=int, default=4096)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    data, words = word_catalog(
+        args.megabytes, args.technologies, args.mean_size, args.vocabulary
+    )
+    workdir = tempfile.mkdtemp(prefix="lazy_bench_")
+    path = os.path.join(workdir, "admins.json")
+    try:
+        write_catalog(path, data)
+        backend = JsonBackend(path)
+        backend.load()
+        print(f"catalog: {os.path.getsize(path):,} bytes")
+
+        index = SearchIndex(backend)
+        rss_kb = _rss_kb()
+        start = time.perf_counter()
+        index.sync()
+        build_s = time.perf_counter() - start
+        rss_kb = _rss_kb() - rss_kb
+        print(f"build: {build_s:.2f} s, {len(index):,} files, +{rss_kb >> 10} MiB RSS")
+
+        common, rare = words[0], words[-1]
+        queries = [rare, common, f"{common} ", f"{common} {words[1]}"]
+        queries += [f"pkg {rare}", "tech1 pkg"]
+        queries += [rare[:length] for length in range(1, len(rare) + 1)]
+        print(f"{'query':<24} {'hits':>9} {'ms':>9}")
+        for query in queries:
+            ms, hits = median_ms(lambda: index.search(query), args.repeats)
+            print(f"{query!r:<24} {len(hits):>9,} {ms:>9.2f}")
+
+        project = copy.deepcopy(backend.get("tech0"))
+        project["project_tree"][0]["children"][0]["content"] += f"\n{rare}_changed"
+        backend.upsert(project)
+        start = time.perf_counter()
+        index.sync()
+        print(f"resync after one change: {time.perf_counter() - start:.3f} s")
+        start = time.perf_counter()
+        index.sync()
+        print(f"resync without changes: {time.perf_counter() - start:.3f} s")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark of the scandir-based directory serializer against the legacy
+os.walk/build_tree implementation.
+
+The legacy serializer raises NotADirectoryError as soon as a nested folder
+contains a file, so a "legacy-fix" variant is measured as well: the same
+os.walk + per-directory rebuild algorithm, with nested listings split into
+folders and files so it runs to completion.
+
+Synthetic trees (benchmarks.synthetic) are generated in a temporary
+directory with the requested number of small files, spread over nested folders.
+
+Usage:
+    python -m benchmarks.bench_serialize --files 10000 100000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import app  # noqa: F401  (app must be imported before db, see db.db)
+from app.admin.serialize_adm import build_project_structure
+from benchmarks.synthetic import TreeSpec, write_tree
+
+
+def legacy_build_project_structure(directory):
+    """The os.walk + build_tree serializer this benchmark compares against."""
+    project = {"projects": []}
+    project_id = 1
+    for root, dirs, files in os.walk(directory):
+        root_path = os.path.relpath(root, directory)
+        project_data = {
+            "id": project_id,
+            "technology": "your_technology_here",
+            "project_tree": legacy_build_tree(root, root_path, dirs, files),
+        }
+        project["projects"].append(project_data)
+        project_id += 1
+    return project
+
+
+def legacy_build_tree(root, root_path, dirs, files):
+    """The recursive build_tree helper used by the legacy serializer."""
+    tree = []
+    for directory in dirs:
+        dir_path = os.path.join(root_path, directory)
+        children = legacy_build_tree(
+            os.path.join(root, directory),
+            dir_path,
+            os.listdir(os.path.join(root, directory)),
+            [],
+        )
+        tree.append({"name": directory, "is_folder": True, "children": children})
+    for file in files:
+        with open(os.path.join(root, file), "r", encoding="utf-8") as f:
+            content = f.read()
+        tree.append({"name": file, "is_folder": False, "content": content})
+    return tree
+
+
+def patched_build_project_structure(directory):
+    """The legacy algorithm with nested listings split into folders and files."""
+    project = {"projects": []}
+    for project_id, (root, dirs, files) in enumerate(os.walk(directory), start=1):
+        project["projects"].append(
+            {
+                "id": project_id,
+                "technology": "your_technology_here",
+                "project_tree": patched_build_tree(root, dirs, files),
+            }
+        )
+    return project
+
+
+def patched_build_tree(root, dirs, files):
+    """legacy_build_tree, re-listing every subdirectory but without the crash."""
+    tree = []
+    for directory in dirs:
+        path = os.path.join(root, directory)
+        names = os.listdir(path)
+        sub_dirs = [n for n in names if os.path.isdir(os.path.join(path, n))]
+        sub_files = [n for n in names if n not in sub_dirs]
+        children = patched_build_tree(path, sub_dirs, sub_files)
+        tree.append({"name": directory, "is_folder": True, "children": children})
+    for file in files:
+        with open(os.path.join(root, file), "r", encoding="utf-8") as f:
+            content = f.read()
+        tree.append({"name": file, "is_folder": False, "content": content})
+    return tree
+
+
+def timed(func, directory):
+    """Run func(directory) and return (seconds, error message or None)."""
+    start = time.perf_counter()
+    try:
+        func(directory)
+    except OSError as e:
+        return time.perf_counter() - start, f"{type(e).__name__}: {e.strerror}"
+    return time.perf_counter() - start, None
+
+
+def main():
+    """Generate the synthetic trees and print one timing line per implementation."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    for file_count in args.files:
+        root = tempfile.mkdtemp(prefix="lazy_bench_")
+        try:
+            write_tree(
+                TreeSpec(files=file_count, depth=4, size_dist="fixed", mean_size=32),
+                root,
+            )
+            for name, func in (
+                ("legacy", legacy_build_project_structure),
+                ("legacy-fix", patched_build_project_structure),
+                ("scandir", build_project_structure),
+            ):
+                seconds, error = timed(func, root)
+                status = error or f"{file_count / seconds:,.0f} files/s"
+                print(f"{file_count:>8} files  {name:<10} {seconds:8.3f}s  {status}")
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
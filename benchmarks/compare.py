@@ -0,0 +1,58 @@
+"""
+Compare two JSON reports produced by benchmarks.run.
+
+Prints, per operation, the median latency and peak RSS of both runs and the
+relative change from the baseline.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json
+"""
+
+import argparse
+import json
+
+
+def _load(path):
+    """Load a benchmark report."""
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _change(before, after):
+    """Return the relative change as a signed percentage string."""
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main():
+    """Print the comparison table."""
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    baseline = _load(args.baseline)
+    candidate = _load(args.candidate)
+    print(
+        f"baseline {baseline['meta'].get('git_commit')} -> "
+        f"candidate {candidate['meta'].get('git_commit')}"
+    )
+    print(
+        f"{'operation':<12} {'median s':>22} {'change':>8} "
+        f"{'peak RSS KiB':>22} {'change':>8}"
+    )
+    for operation, before in baseline["results"].items():
+        after = candidate["results"].get(operation)
+        if after is None:
+            continue
+        t0, t1 = before["latency_s"]["median"], after["latency_s"]["median"]
+        r0, r1 = before["peak_rss_kb"], after["peak_rss_kb"]
+        print(
+            f"{operation:<12} {t0:>10.4f} -> {t1:<9.4f} {_change(t0, t1):>8} "
+            f"{r0:>10} -> {r1:<9} {_change(r0, r1):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Benchmark suite for the core operations: serialize, deserialize and catalog lookup.
+
+Each operation runs in a freshly spawned interpreter so its peak RSS is not
+mixed with the other operations or with data generation. Results are written
+as JSON so runs can be compared between commits with benchmarks.compare.
+
+Operations:
+- serialize: build_project_structure over a synthetic directory.
+- deserialize: create_project_files_two of a synthetic project tree.
+- lookup_cold: get() on a fresh TemplateCatalog (sidecar index path).
+- lookup_warm: get() on an already loaded TemplateCatalog.
+
+Usage:
+    python -m benchmarks.run --files 10000 --depth 3 --technologies 20 -o out.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import (
+    SIZE_DISTRIBUTIONS,
+    TreeSpec,
+    build_catalog,
+    build_project_tree,
+    write_tree,
+)
+
+OPERATIONS = ("serialize", "deserialize", "lookup_cold", "lookup_warm")
+
+
+def _peak_rss_kb():
+    """
+    Return the peak resident set size of this process in KiB.
+
+    On Linux this is VmHWM, which starts fresh in a spawned interpreter;
+    ru_maxrss would also carry the parent's peak across fork/exec.
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _reset_peak_rss():
+    """Reset VmHWM to the current RSS where the kernel allows it (Linux)."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def _prepare(operation, spec, options, workdir):
+    """
+    Build the callable of an operation inside the measuring process.
+
+    Returns:
+        callable: Runs the operation once.
+    """
+    import app  # noqa: F401  (app must be imported before db, see db.db)
+    from app.admin.deploy_adm import create_project_files_two
+    from app.admin.serialize_adm import build_project_structure
+    from db.catalog import TemplateCatalog
+
+    if operation == "serialize":
+        source = os.path.join(workdir, "source")
+        return lambda: build_project_structure(source)
+
+    if operation == "deserialize":
+        tree = build_project_tree(spec)
+        targets = iter(range(sys.maxsize))
+
+        def deserialize():
+            target = os.path.join(workdir, "out", str(next(targets)))
+            os.makedirs(target)
+            create_project_files_two(target, "project", tree, options["workers"])
+
+        return deserialize
+
+    catalog_path = os.path.join(workdir, "admins.json")
+    technology = f"tech{options['technologies'] // 2}"
+    if operation == "lookup_cold":
+        return lambda: TemplateCatalog(catalog_path).get(technology)
+
+    catalog = TemplateCatalog(catalog_path)
+    catalog.get(technology)
+    return lambda: catalog.get(technology)
+
+
+def _measure(operation, spec_dict, options, workdir, connection):
+    """Child process entry point: time the operation and report latencies and RSS."""
+    spec = TreeSpec(**spec_dict)
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = _prepare(operation, spec, options, workdir)
+        _reset_peak_rss()
+        rss_ready = _peak_rss_kb()
+        latencies = []
+        for _ in range(options["repeats"]):
+            start = time.perf_counter()
+            run()
+            latencies.append(time.perf_counter() - start)
+    connection.send(
+        {
+            "latencies": latencies,
+            "rss_ready_kb": rss_ready,
+            "peak_rss_kb": _peak_rss_kb(),
+        }
+    )
+    connection.close()
+
+
+def _summarize(sample, files, size):
+    """Turn raw child measurements into the reported metrics."""
+    latencies = sorted(sample["latencies"])
+    median = statistics.median(latencies)
+    return {
+        "files": files,
+        "bytes": size,
+        "repeats": len(latencies),
+        "latency_s": {
+            "min": latencies[0],
+            "median": median,
+            "p95": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+            "max": latencies[-1],
+        },
+        "files_per_s": files / median if median else None,
+        "mb_per_s": size / median / 1e6 if median else None,
+        "peak_rss_kb": sample["peak_rss_kb"],
+        "rss_growth_kb": sample["peak_rss_kb"] - sample["rss_ready_kb"],
+    }
+
+
+def _git_commit():
+    """Return the current git commit of the repository, if available."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_suite(spec, operations, technologies=10, repeats=5, workers=1):
+    """
+    Run the selected operations on synthetic data.
+
+    Args:
+        spec (TreeSpec): Shape of each synthetic project.
+        operations (list): Names from OPERATIONS.
+        technologies (int): Number of technologies in the synthetic catalog.
+        repeats (int): Timed runs per operation.
+        workers (int): Writer threads used by deserialize.
+
+    Returns:
+        dict: The JSON report.
+    """
+    import app  # noqa: F401  (app must be imported before db, see db.db)
+    from db.catalog import write_catalog
+
+    options = {"technologies": technologies, "repeats": repeats, "workers": workers}
+    context = multiprocessing.get_context("spawn")
+    workdir = tempfile.mkdtemp(prefix="lazy_bench_")
+    results = {}
+    try:
+        size = write_tree(spec, os.path.join(workdir, "source"))
+        if any(op.startswith("lookup") for op in operations):
+            write_catalog(
+                os.path.join(workdir, "admins.json"), build_catalog(spec, technologies)
+            )
+        for operation in operations:
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_measure,
+                args=(operation, spec.as_dict(), options, workdir, sender),
+            )
+            process.start()
+            sender.close()
+            sample = receiver.recv()
+            process.join()
+            files = 1 if operation.startswith("lookup") else spec.files
+            results[operation] = _summarize(
+                sample, files, 0 if operation.startswith("lookup") else size
+            )
+    finally:
+        shutil.rmtree(workdir)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "spec": spec.as_dict(),
+            **options,
+        },
+        "results": results,
+    }
+
+
+def main():
+    """Parse arguments, run the suite and emit the JSON report."""
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--size-dist", choices=SIZE_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--mean-size", type=int, default=2048)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--technologies", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--ops", nargs="+", choices=OPERATIONS, default=list(OPERATIONS)
+    )
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file.")
+    args = parser.parse_args()
+
+    spec = TreeSpec(
+        files=args.files,
+        depth=args.depth,
+        fanout=args.fanout,
+        size_dist=args.size_dist,
+        mean_size=args.mean_size,
+        seed=args.seed,
+    )
+    report = run_suite(spec, args.ops, args.technologies, args.repeats, args.workers)
+    text = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Synthetic template generator for the benchmarks.
+
+Produces deterministic project trees (in memory or on disk) and catalogs
+with a configurable number of files, nesting depth, file size distribution
+and number of technologies. The same seed always yields the same data.
+"""
+
+import math
+import os
+import random
+import string
+
+SIZE_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+
+class TreeSpec:
+    """
+    Shape of a synthetic project tree.
+
+    Attributes:
+        files (int): Total number of files.
+        depth (int): Number of folder levels below the root.
+        fanout (int): Subfolders per folder.
+        size_dist (str): One of SIZE_DISTRIBUTIONS.
+        mean_size (int): Mean file size in bytes.
+        seed (int): Seed of the random generator.
+    """
+
+    def __init__(
+        self,
+        files=1000,
+        depth=3,
+        fanout=4,
+        size_dist="lognormal",
+        mean_size=2048,
+        seed=0,
+    ):
+        if size_dist not in SIZE_DISTRIBUTIONS:
+            raise ValueError(f"unknown size distribution '{size_dist}'")
+        self.files = files
+        self.depth = depth
+        self.fanout = fanout
+        self.size_dist = size_dist
+        self.mean_size = mean_size
+        self.seed = seed
+
+    def as_dict(self):
+        """Return the spec as a JSON-serializable dict."""
+        return dict(vars(self))
+
+
+def _sizes(spec, rng):
+    """Yield spec.files file sizes drawn from the spec's distribution."""
+    for _ in range(spec.files):
+        if spec.size_dist == "fixed":
+            yield spec.mean_size
+        elif spec.size_dist == "uniform":
+            yield rng.randint(0, 2 * spec.mean_size)
+        else:
+            # sigma=1 lognormal with the requested mean: mu = ln(mean) - 1/2
+            yield int(rng.lognormvariate(math.log(max(spec.mean_size, 1)) - 0.5, 1.0))
+
+
+def _folders(spec):
+    """Return relative folder paths of the tree, breadth-first, root ("") first."""
+    folders = [""]
+    level = [""]
+    for _ in range(spec.depth):
+        level = [
+            os.path.join(parent, f"pkg_{i}")
+            for parent in level
+            for i in range(spec.fanout)
+        ]
+        folders.extend(level)
+    return folders
+
+
+def _text(rng, size):
+    """Return ASCII text of exactly size bytes, line-broken like source code."""
+    alphabet = string.ascii_letters + string.digits + "    "
+    chars = rng.choices(alphabet, k=size)
+    for position in range(79, size, 80):
+        chars[position] = "\n"
+    return "".join(chars)
+
+
+def iter_files(spec):
+    """
+    Yield (relative path, content) for every file of the tree.
+
+    Files are spread round-robin over all folders of the tree.
+    """
+    rng = random.Random(spec.seed)
+    folders = _folders(spec)
+    for number, size in enumerate(_sizes(spec, rng)):
+        folder = folders[number % len(folders)]
+        yield os.path.join(folder, f"module_{number}.py"), _text(rng, size)
+
+
+def write_tree(spec, root):
+    """
+    Create the synthetic tree on disk under root.
+
+    Returns:
+        int: Total bytes written.
+    """
+    total = 0
+    for folder in _folders(spec):
+        os.makedirs(os.path.join(root, folder), exist_ok=True)
+    for rel_path, content in iter_files(spec):
+        with open(os.path.join(root, rel_path), "w", encoding="utf-8") as file:
+            file.write(content)
+        total += len(content)
+    return total
+
+
+def build_project_tree(spec):
+    """
+    Build the synthetic tree in the catalog's project_tree format.
+
+    Returns:
+        list: The project tree.
+    """
+    root = []
+    folders = {"": root}
+    for folder in _folders(spec)[1:]:
+        parent, name = os.path.split(folder)
+        children = []
+        folders[parent].append({"name": name, "is_folder": True, "children": children})
+        folders[folder] = children
+    for rel_path, content in iter_files(spec):
+        folder, name = os.path.split(rel_path)
+        folders[folder].append({"name": name, "is_folder": False, "content": content})
+    return root
+
+
+def build_catalog(spec, technologies):
+    """
+    Build catalog data with one synthetic project per technology.
+
+    Each technology uses a different seed so their contents differ.
+
+    Returns:
+        dict: Catalog data with a "projects" list.
+    """
+    projects = []
+    for number in range(technologies):
+        tech_spec = TreeSpec(**dict(spec.as_dict(), seed=spec.seed + number))
+        projects.append(
+            {
+                "id": number + 1,
+                "technology": f"tech{number}",
+                "project_tree": build_project_tree(tech_spec),
+            }
+        )
+    return {"projects": projects}
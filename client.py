@@ -0,0 +1,102 @@
+"""
+client.py
+
+This module is the client of the LazyProject daemon (see app.daemon).
+
+It only imports the standard library: forwarding a console command to a
+running daemon costs an interpreter start and one round trip, instead of
+importing the app and parsing the catalog again.
+
+Requests and replies are JSON objects, one per line, over a Unix domain
+socket. A request is {"argv": [...], "cwd": "..."}, or {"metrics": format}
+to read the metrics registry of the daemon (see app.metrics); the daemon
+answers with any number of {"out": "..."} messages (the command's output,
+as it is printed) followed by one {"status": N} message.
+
+Functions:
+- send_message, read_messages: Frame messages on the socket.
+- forward: Runs a console command on the daemon, if one is running.
+- fetch_metrics: Prints the metrics of the daemon.
+"""
+
+import json
+import os
+import socket
+import sys
+
+# Socket of the daemon, relative to the working directory like the catalog
+# paths in app.settings, so a client only reaches the daemon of its own catalog
+SOCKET_PATH = os.environ.get("LAZY_PROJECT_SOCKET", "db/admin/lazy_project.sock")
+
+
+def send_message(sock, message):
+    """Send one message as a line of JSON."""
+    sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def read_messages(sock):
+    """Yield the messages received on a socket until it is closed."""
+    with sock.makefile("rb") as stream:
+        for line in stream:
+            yield json.loads(line)
+
+
+def forward(argv, socket_path=SOCKET_PATH):
+    """
+    Run a console command on the daemon and print its output.
+
+    Args:
+        argv (list): The command-line arguments, without the program name.
+        socket_path (str): Socket of the daemon.
+
+    Returns:
+        int: The exit status of the command, or None if no daemon is
+        running (or --no-daemon was given) and the command must run locally.
+    """
+    if "--no-daemon" in argv:
+        return None
+    return _request({"argv": argv, "cwd": os.getcwd()}, socket_path)
+
+
+def fetch_metrics(fmt="prometheus", socket_path=SOCKET_PATH):
+    """
+    Print the metrics registry of the daemon.
+
+    Args:
+        fmt (str): "prometheus" for the text exposition format, "json" for
+        the snapshot.
+        socket_path (str): Socket of the daemon.
+
+    Returns:
+        int: The exit status, or None if no daemon is running.
+    """
+    return _request({"metrics": fmt}, socket_path)
+
+
+def _request(request, socket_path):
+    """
+    Send a request to the daemon and print the output it streams back.
+
+    Returns:
+        int: The status the daemon answered, or None if no daemon is running.
+    """
+    if not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            # A socket file left behind by a daemon that is gone
+            return None
+        send_message(sock, request)
+        for message in read_messages(sock):
+            if "out" in message:
+                sys.stdout.write(message["out"])
+            elif "status" in message:
+                sys.stdout.flush()
+                return message["status"]
+    finally:
+        sock.close()
+    print("Error: the daemon closed the connection.")
+    return 1
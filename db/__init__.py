@@ -13,15 +13,39 @@ Functions:
 - parse_project_name: Extracts and formats the project name from a given input.
 - create_project_files: Generates necessary files for a new project.
 - create_and_run_project: Initializes and executes the project setup.
-- get_admin_data: Fetches administrative data required for project configuration.
+- get_admin_data: Fetches administrative data from the configured storage backend.
 - add_code_file: Adds a new code file to the project.
 - edit_code_file: Modifies an existing code file in the project.
-- read_from_json: Reads data from a JSON file.
+- read_from_json: Reads catalog data from a JSON file or SQLite database.
 - remove_code_file: Deletes a code file from the project.
 - validate_arguments: Checks the validity of command-line arguments.
+- split_arguments: Separates positional arguments from --name[=value] options.
+- get_catalog: Returns the cached, indexed template catalog.
+- write_catalog: Atomically writes the catalog and its sidecar byte-offset index.
+- upsert_technology: Adds or replaces the project of one technology in the catalog.
+- delete_technology: Removes every project of one technology from the catalog.
+- replace_node: Replaces one node of a technology's tree, journaling only that node.
+- update_catalog: Journals only the technologies that differ from new catalog data.
+- compact_catalog: Folds the catalog journal into a new snapshot.
+- open_backend: Returns the JSON or SQLite storage backend of a catalog file.
+- get_backend: Returns the storage backend selected by STORAGE_BACKEND.
+- copy_file: Copies a file by reflink, copy_file_range or sendfile where available.
+- load_manifest, save_manifest: Read and write stat/hash manifests of source directories.
+- get_blob_store: Returns the shared blob store for template file bodies.
+- pack_catalog, unpack_catalog: Compress or restore the file bodies of a catalog.
+- load_catalog_bytes: Parses a plain, body-compressed or stream-compressed catalog.
+
+Classes:
+- TemplateCatalog: In-memory catalog that reloads only when admins.json changes.
+- BlobStore: Content-addressed store of template file bodies keyed by SHA-256.
+- CatalogBackend: Interface of the catalog storage backends.
+- JsonBackend: Catalog storage in admins.json (the default).
+- SearchIndex: Inverted index over file names, paths and contents of the catalog.
+- FileNode, DirNode: Compact __slots__ nodes of serialized project trees.
 
 Constants:
 - AVAILABLE_COMMANDS: A list of commands available for project management.
+- CODECS: Compression codecs accepted by write_catalog and write_to_json.
 
 Usage:
 This module is typically used in the context of project setup and management scripts.
@@ -34,8 +58,26 @@ from .db import (
     get_admin_data,
     add_code_file,
     validate_arguments,
+    split_arguments,
     AVAILABLE_COMMANDS,
     edit_code_file,
     read_from_json,
     remove_code_file,
 )
+from .catalog import (
+    TemplateCatalog,
+    get_catalog,
+    write_catalog,
+    upsert_technology,
+    delete_technology,
+    replace_node,
+    update_catalog,
+    compact_catalog,
+)
+from .blobs import BlobStore, get_blob_store
+from .manifest import Manifest, load_manifest, save_manifest
+from .fastcopy import copy_file
+from .storage import CatalogBackend, JsonBackend, open_backend, get_backend
+from .compression import CODECS, pack_catalog, unpack_catalog, load_catalog_bytes
+from .search_index import SearchIndex, SearchHit
+from .tree import FileNode, DirNode
@@ -0,0 +1,237 @@
+"""
+This module provides a content-addressed store for template file contents.
+
+File bodies are stored once under their SHA-256 digest, and tree nodes
+reference them as {"name", "is_folder": False, "blob": <digest>, "size": <bytes>}
+instead of carrying an inline "content" string. Identical files across
+technologies and nested folders share a single blob. Binary files (images,
+fonts, wheels, databases) are always stored as blobs and their nodes carry
+"binary": True; they are never decoded into text.
+
+Classes:
+- BlobStore: Stores and retrieves blobs in a directory keyed by SHA-256.
+
+Functions:
+- get_blob_store: Returns the shared BlobStore for a directory.
+- externalize_tree: Moves inline file contents of a project tree into a store.
+- inline_tree: Replaces blob references of a project tree with inline contents.
+- node_bytes: Returns the body of a file node, inline or from a store.
+- externalize_catalog: Moves every file body of catalog data into a store.
+
+An existing catalog is converted with:
+    write_to_json(path, read_from_json(path), blob_store=get_blob_store())
+"""
+
+import hashlib
+import os
+import tempfile
+
+from app.settings import BLOBS_DIR
+from .fastcopy import copy_file, default_file_mode
+
+
+class BlobStore:
+    """
+    Directory of immutable blobs addressed by the SHA-256 of their bytes.
+
+    Blobs are laid out as <root>/<first two hex digits>/<remaining digits>.
+    """
+
+    def __init__(self, root):
+        """
+        Initializes the store rooted at the given directory.
+
+        Args:
+            root (str): Directory holding the blobs; created on first write.
+        """
+        self.root = root
+
+    def path(self, digest):
+        """Return the file path of a blob."""
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def has(self, digest):
+        """Return True if the blob is present in the store."""
+        return os.path.exists(self.path(digest))
+
+    def put(self, data):
+        """
+        Store bytes and return their digest.
+
+        The blob is written to a temporary file and renamed into place, so
+        readers never see a partial blob. Existing blobs are not rewritten.
+
+        Args:
+            data (bytes): The blob body.
+
+        Returns:
+            str: The hex SHA-256 digest of the data.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self.path(digest)
+        if os.path.exists(blob_path):
+            return digest
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(blob_path))
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.chmod(tmp_path, default_file_mode())
+            os.replace(tmp_path, blob_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest
+
+    def put_file(self, file_path):
+        """
+        Store the contents of a file and return (digest, size).
+
+        The file is first copied into the store with fastcopy.copy_file
+        (reflink or in-kernel copy where available) and then hashed in
+        fixed-size chunks, so large files are never held in memory.
+
+        Args:
+            file_path (str): The file to store.
+
+        Returns:
+            tuple: (hex SHA-256 digest, size in bytes).
+        """
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        os.close(fd)
+        try:
+            copy_file(file_path, tmp_path)
+            digest = hashlib.sha256()
+            size = 0
+            with open(tmp_path, "rb") as file:
+                for chunk in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(chunk)
+                    size += len(chunk)
+            digest = digest.hexdigest()
+            blob_path = self.path(digest)
+            if os.path.exists(blob_path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.chmod(tmp_path, default_file_mode())
+                os.replace(tmp_path, blob_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest, size
+
+    def copy_to(self, digest, file_path):
+        """Copy a blob to file_path without reading it into memory."""
+        copy_file(self.path(digest), file_path)
+
+    def get(self, digest):
+        """
+        Return the bytes of a blob.
+
+        Raises:
+            FileNotFoundError: If the blob is not in the store.
+        """
+        with open(self.path(digest), "rb") as file:
+            return file.read()
+
+
+_stores = {}
+
+
+def get_blob_store(root=BLOBS_DIR):
+    """Return the shared BlobStore for a directory."""
+    key = os.path.abspath(root)
+    store = _stores.get(key)
+    if store is None:
+        store = _stores[key] = BlobStore(key)
+    return store
+
+
+def externalize_tree(tree, store):
+    """
+    Return a copy of a project tree with file contents moved into a store.
+
+    Args:
+        tree (list): The project tree.
+        store (BlobStore): The store receiving file bodies.
+
+    Returns:
+        list: A new tree whose file nodes hold "blob" and "size" instead of "content".
+    """
+    result = []
+    for node in tree:
+        if node.get("is_folder"):
+            node = dict(node)
+            node["children"] = externalize_tree(node.get("children", []), store)
+        elif "content" in node:
+            data = (node["content"] or "").encode("utf-8")
+            node = {key: value for key, value in node.items() if key != "content"}
+            node["blob"] = store.put(data)
+            node["size"] = len(data)
+        result.append(node)
+    return result
+
+
+def inline_tree(tree, store):
+    """
+    Return a copy of a project tree with blob references replaced by contents.
+
+    Args:
+        tree (list): The project tree.
+        store (BlobStore): The store holding the referenced blobs.
+
+    Returns:
+        list: A new tree whose text file nodes carry an inline "content"
+        string; binary nodes keep their blob reference.
+    """
+    result = []
+    for node in tree:
+        if node.get("is_folder"):
+            node = dict(node)
+            node["children"] = inline_tree(node.get("children", []), store)
+        elif "blob" in node and not node.get("binary"):
+            content = store.get(node["blob"]).decode("utf-8")
+            node = {
+                key: value for key, value in node.items() if key not in ("blob", "size")
+            }
+            node["content"] = content
+        result.append(node)
+    return result
+
+
+def node_bytes(node, store=None):
+    """
+    Return the body of a file node as bytes.
+
+    Args:
+        node (dict): A file node with either "content" or "blob".
+        store (BlobStore): Store for blob nodes; defaults to the catalog store.
+    """
+    if "blob" in node:
+        return (store or get_blob_store()).get(node["blob"])
+    return (node.get("content") or "").encode("utf-8")
+
+
+def externalize_catalog(data, store):
+    """
+    Return a copy of catalog data with every file body moved into a store.
+
+    Args:
+        data (dict): Catalog data with a "projects" list.
+        store (BlobStore): The store receiving file bodies.
+
+    Returns:
+        dict: New catalog data whose project trees reference blobs.
+    """
+    data = dict(data)
+    data["projects"] = [
+        dict(
+            project,
+            project_tree=externalize_tree(project.get("project_tree", []), store),
+        )
+        for project in data.get("projects", [])
+    ]
+    return data
@@ -0,0 +1,683 @@
+"""
+This module provides an in-memory, indexed view of the template catalog.
+
+The catalog file (admins.json) is parsed once and kept in memory together with
+a technology -> project index. The file is only parsed again when its mtime,
+size or inode changes.
+
+Catalogs written with write_catalog also get a sidecar index (admins.json.idx)
+mapping each technology to the byte range of its project object. While the
+sidecar matches the catalog file, a single technology is read by parsing only
+that slice of an mmap of the file. Compressed catalogs (see db.compression)
+are decompressed transparently.
+
+Project trees are held as db.tree FileNode and DirNode objects rather than
+dicts, since the cache lives as long as the process (e.g. the daemon); the
+nodes read like the dicts they replace.
+
+Single-technology changes (upsert_technology, delete_technology,
+replace_node and the diffable part of update_catalog) are appended to the journal
+(admins.json.journal, see db.journal) instead of rewriting the file; readers
+replay it on top of the snapshot, resuming from the last byte they read.
+Once the journal outgrows the snapshot, a background thread compacts it into
+a new snapshot.
+
+Reloads, slice reads and cache hits are counted in the metrics registry
+(see app.metrics).
+
+Classes:
+- TemplateCatalog: Caches the parsed catalog and indexes projects by technology.
+
+Functions:
+- get_catalog: Returns the shared TemplateCatalog instance for a file path.
+- dump_catalog: Writes catalog data and returns the byte range of each project.
+- write_catalog: Atomically writes a catalog file together with its sidecar index.
+- upsert_technology: Adds or replaces the project of one technology.
+- delete_technology: Removes every project of one technology.
+- replace_node: Replaces one node of the tree of one technology.
+- update_catalog: Journals the difference to new catalog data, or rewrites it.
+- compact_catalog: Folds the journal into a new snapshot.
+- index_path: Returns the sidecar index path of a catalog file.
+"""
+
+import json
+import mmap
+import os
+import tempfile
+import threading
+
+from app import metrics
+from app.profiling import span
+from app.settings import ADMINS_FILE_PATH
+from .compression import (
+    CODECS,
+    compress,
+    detect_stream_codec,
+    load_catalog_bytes,
+    pack_catalog,
+    unpack_tree,
+)
+from .fastcopy import default_file_mode
+from .tree import from_json, json_default, node_from_json
+from .journal import (
+    append_entries,
+    apply_entries,
+    replace_tree_node,
+    journal_lock,
+    journal_path,
+    read_journal,
+)
+
+# A journal is compacted once it is larger than both this and the snapshot
+COMPACT_MIN_BYTES = 1 << 20
+
+# Leading top-level key of a body-compressed snapshot, naming its codec; it is
+# dropped on load, so catalog data never holds it
+BODY_CODEC_KEY = "body_codec"
+
+
+class TemplateCatalog:
+    """
+    Cached, indexed view of a template catalog file.
+
+    The parsed data is shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, file_path):
+        """
+        Initializes the catalog for the given file.
+
+        Args:
+            file_path (str): Path to the catalog JSON file.
+        """
+        self.file_path = file_path
+        self.journal_path = journal_path(file_path)
+        self._lock = threading.RLock()
+        self._stamp = None
+        self._snapshot = None
+        self._journal_stamp = None
+        self._journal_offset = 0
+        self._data = None
+        self._index = {}
+        self._slice_stamp = None
+        self._slices = {}
+
+    def _file_stamp(self):
+        """Return (mtime_ns, size, inode) of the catalog file, or None if it is missing."""
+        return _file_stamp(self.file_path)
+
+    def refresh(self):
+        """
+        Reload the catalog if the file or its journal changed since the last read.
+
+        The snapshot is only parsed again when it changed; a journal that only
+        grew is replayed from where the previous refresh stopped.
+
+        Returns:
+            bool: True if the catalog was (re)loaded, False if the cache was reused.
+        """
+        stamp = self._file_stamp()
+        journal_stamp = _file_stamp(self.journal_path)
+        with self._lock:
+            if (
+                self._data is not None
+                and stamp == self._stamp
+                and journal_stamp == self._journal_stamp
+            ):
+                metrics.inc("catalog_cache_hits")
+                return False
+            if stamp is None and journal_stamp is None:
+                self.invalidate()
+                return False
+            if self._snapshot is None or stamp != self._stamp:
+                self._snapshot = {"projects": []}
+                if stamp is not None:
+                    with span("catalog.parse"), open(self.file_path, "rb") as file:
+                        self._snapshot = _with_nodes(load_catalog_bytes(file.read()))
+                        self._snapshot.pop(BODY_CODEC_KEY, None)
+                self._stamp, self._journal_offset = stamp, 0
+            previous = self._journal_stamp
+            if self._journal_offset and (
+                journal_stamp is None
+                or previous is None
+                or journal_stamp[2] != previous[2]
+                or journal_stamp[1] < self._journal_offset
+            ):
+                self._journal_offset = 0
+
+            base = self._data if self._journal_offset else self._snapshot
+            with span("catalog.journal"):
+                entries, offset = _read_node_journal(
+                    self.journal_path, stamp, self._journal_offset
+                )
+                if entries is None:
+                    data = self._snapshot
+                else:
+                    data = apply_entries(base, entries) if entries else base
+            index = {}
+            for project in data.get("projects", []):
+                index.setdefault(project.get("technology"), project)
+            self._journal_stamp, self._journal_offset = journal_stamp, offset
+            self._data, self._index = data, index
+            metrics.inc("catalog_reloads")
+            return True
+
+    def invalidate(self):
+        """Drop the cached data so the next access parses the file again."""
+        with self._lock:
+            self._stamp, self._data, self._index = None, None, {}
+            self._snapshot, self._journal_stamp, self._journal_offset = None, None, 0
+            self._slice_stamp, self._slices = None, {}
+
+    def _read_journaled(self, technology, stamp):
+        """
+        Look a technology up in the journal of the snapshot with the given stamp.
+
+        Node entries are applied on top of the last upsert of the technology
+        or, without one, on top of its project in the snapshot.
+
+        Returns:
+            tuple: (found, project). found is False when the journal and the
+            sidecar index cannot answer and the caller must parse everything.
+        """
+        entries, _ = _read_node_journal(self.journal_path, stamp)
+        touching = [
+            entry for entry in entries or [] if _entry_technology(entry) == technology
+        ]
+        start = 0
+        for position in range(len(touching) - 1, -1, -1):
+            if touching[position].get("op") in ("upsert", "delete"):
+                start = position
+                break
+        else:
+            found, project = self._read_slice(technology, stamp)
+            if not found:
+                return False, None
+            touching.insert(0, {"op": "upsert", "project": project})
+        if touching[start].get("op") == "delete" or touching[start]["project"] is None:
+            return True, None
+        data = apply_entries({"projects": []}, touching[start:])
+        return True, data["projects"][0]
+
+    def _read_slice(self, technology, stamp):
+        """
+        Parse one project through the sidecar index without a full parse.
+
+        Args:
+            technology (str): The technology to read.
+            stamp (tuple): The current stamp of the catalog file.
+
+        Returns:
+            tuple: (found, project). found is False when the sidecar index is
+            missing or stale and the caller must fall back to a full parse.
+        """
+        if self._slice_stamp == stamp and technology in self._slices:
+            metrics.inc("catalog_cache_hits")
+            return True, self._slices[technology]
+        try:
+            with open(index_path(self.file_path), "r", encoding="utf-8") as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            return False, None
+        if tuple(index.get("stamp", ())) != stamp:
+            return False, None
+
+        byte_range = index.get("projects", {}).get(technology)
+        project = None
+        if byte_range is not None:
+            start, end = byte_range
+            with span("catalog.parse_slice"), open(self.file_path, "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    project = json.loads(view[start:end])
+            tree = unpack_tree(project.get("project_tree", []))
+            project = _project_with_nodes(project, tree)
+        if self._slice_stamp != stamp:
+            self._slice_stamp, self._slices = stamp, {}
+        self._slices[technology] = project
+        metrics.inc("catalog_slice_reads")
+        return True, project
+
+    def data(self):
+        """
+        Return the whole parsed catalog.
+
+        Returns:
+            dict: The catalog data, or None if the file does not exist.
+        """
+        self.refresh()
+        return self._data
+
+    def get(self, technology):
+        """
+        Return the project registered for a technology.
+
+        Args:
+            technology (str): The technology name.
+
+        Returns:
+            dict: The project data, or None if the technology is unknown.
+        """
+        stamp = self._file_stamp()
+        with self._lock:
+            if self._data is None and stamp is not None:
+                found, project = self._read_journaled(technology, stamp)
+                if found:
+                    return project
+        self.refresh()
+        return self._index.get(technology)
+
+    def technologies(self):
+        """
+        Return the technologies available in the catalog.
+
+        Returns:
+            list: Sorted technology names.
+        """
+        self.refresh()
+        return sorted(tech for tech in self._index if tech is not None)
+
+
+def _project_with_nodes(project, tree=None):
+    """Return a project whose tree is made of db.tree nodes."""
+    if not isinstance(project, dict):
+        return project
+    if tree is None:
+        tree = project.get("project_tree")
+    if not isinstance(tree, list):
+        return project
+    return dict(project, project_tree=from_json(tree))
+
+
+def _with_nodes(data):
+    """Return catalog data whose project trees are made of db.tree nodes."""
+    if not isinstance(data, dict) or not isinstance(data.get("projects"), list):
+        return data
+    return dict(data, projects=[_project_with_nodes(p) for p in data["projects"]])
+
+
+def _read_node_journal(file_path, stamp, offset=0):
+    """read_journal with the trees and nodes of the entries made of db.tree nodes."""
+    entries, offset = read_journal(file_path, stamp, offset)
+    for entry in entries or ():
+        if entry.get("op") == "upsert":
+            entry["project"] = _project_with_nodes(entry.get("project"))
+        elif entry.get("op") == "node":
+            entry["node"] = node_from_json(entry.get("node"))
+    return entries, offset
+
+
+def _entry_technology(entry):
+    """Return the technology a journal entry changes."""
+    if entry.get("op") == "upsert":
+        return entry["project"].get("technology")
+    return entry.get("technology")
+
+
+def _file_stamp(file_path):
+    """Return (mtime_ns, size, inode) of a file, or None if it is missing."""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def index_path(file_path):
+    """Return the path of the sidecar index of a catalog file."""
+    return file_path + ".idx"
+
+
+def _indent(text, width):
+    """Indent every line after the first of a JSON document by width spaces."""
+    return text.replace("\n", "\n" + " " * width)
+
+
+def _dumps(value, **kwargs):
+    """json.dumps for catalog data, whose trees may hold db.tree nodes."""
+    return json.dumps(value, ensure_ascii=False, default=json_default, **kwargs)
+
+
+def dump_catalog(file, data):
+    """
+    Write catalog data as indented JSON and record where each project lands.
+
+    The output is byte-for-byte what json.dump(data, file, ensure_ascii=False,
+    indent=4) produces.
+
+    Args:
+        file: Binary file object to write to.
+        data (dict): Catalog data with a "projects" list.
+
+    Returns:
+        dict: Technology -> [start, end) byte offsets of its project object.
+        When a technology appears twice, the first project is recorded.
+    """
+    offsets = {}
+    position = 0
+
+    def emit(text):
+        nonlocal position
+        chunk = text.encode("utf-8")
+        file.write(chunk)
+        position += len(chunk)
+
+    if not data:
+        emit(json.dumps(data))
+        return offsets
+
+    emit("{")
+    for key_number, (key, value) in enumerate(data.items()):
+        emit(",\n    " if key_number else "\n    ")
+        emit(json.dumps(key, ensure_ascii=False) + ": ")
+        if key != "projects" or not isinstance(value, list) or not value:
+            emit(_indent(_dumps(value, indent=4), 4))
+            continue
+        emit("[")
+        for project_number, project in enumerate(value):
+            emit(",\n        " if project_number else "\n        ")
+            start = position
+            emit(_indent(_dumps(project, indent=4), 8))
+            if isinstance(project, dict) and "technology" in project:
+                offsets.setdefault(project.get("technology"), [start, position])
+        emit("\n    ]")
+    emit("\n}")
+    return offsets
+
+
+def _atomic_write(file_path, write):
+    """
+    Call write(file) on a temporary binary file, then rename it over file_path.
+
+    The file keeps the mode of the file it replaces; a new file gets the mode
+    open() would give it.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    try:
+        mode = os.stat(file_path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = default_file_mode()
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            result = write(file)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return result
+
+
+def write_catalog(file_path, data, body_codec=None, stream_codec=None, level=None):
+    """
+    Atomically write a catalog file together with its sidecar index.
+
+    The index records the stamp of the written catalog, so any later change
+    to the file that does not go through write_catalog makes it stale.
+    A stream-compressed catalog has no index; reads of it parse the whole file.
+
+    Args:
+        file_path (str): Path to the catalog JSON file.
+        data (dict): Catalog data with a "projects" list.
+        body_codec (str): Compress every inline file body with "zlib" or "lzma".
+        stream_codec (str): Compress the whole file with "zlib" or "lzma".
+        level (int): Compression level passed to the codec.
+    """
+    with journal_lock(file_path):
+        _write_snapshot(file_path, data, body_codec, stream_codec, level)
+
+
+def _write_snapshot(file_path, data, body_codec=None, stream_codec=None, level=None):
+    """write_catalog without taking the writer lock; also drops the journal."""
+    if BODY_CODEC_KEY in data:
+        data = {key: value for key, value in data.items() if key != BODY_CODEC_KEY}
+    if body_codec is not None:
+        data = {BODY_CODEC_KEY: body_codec, **pack_catalog(data, body_codec, level)}
+    if stream_codec is not None:
+        raw = _dumps(data, separators=(",", ":"))
+        stream = compress(raw.encode("utf-8"), stream_codec, level)
+        _atomic_write(file_path, lambda file: file.write(stream))
+        if os.path.exists(index_path(file_path)):
+            os.remove(index_path(file_path))
+    else:
+        offsets = _atomic_write(file_path, lambda file: dump_catalog(file, data))
+        index = {"stamp": list(_file_stamp(file_path)), "projects": offsets}
+        _atomic_write(
+            index_path(file_path),
+            lambda file: file.write(json.dumps(index).encode("utf-8")),
+        )
+    # The journal header no longer matches the new snapshot, so a crash
+    # before this removal cannot replay it twice
+    if os.path.exists(journal_path(file_path)):
+        os.remove(journal_path(file_path))
+    get_catalog(file_path).invalidate()
+
+
+def _snapshot_codecs(file_path):
+    """
+    Return the write_catalog codec arguments the snapshot was written with.
+
+    A stream is recognised by its magic bytes, and per-body compression by the
+    BODY_CODEC_KEY that _write_snapshot writes first; nothing else of the
+    snapshot is read.
+    """
+    prefix = ('{\n    "%s": "' % BODY_CODEC_KEY).encode("ascii")
+    try:
+        with open(file_path, "rb") as file:
+            head = file.read(len(prefix) + 16)
+    except FileNotFoundError:
+        return {}
+    stream_codec = detect_stream_codec(head[:6])
+    if stream_codec is not None or not head:
+        return {"stream_codec": stream_codec}
+    if not head.startswith(prefix):
+        return {}
+    body_codec, quote, _ = head[len(prefix) :].partition(b'"')
+    if not quote or body_codec.decode("ascii", "replace") not in CODECS:
+        return {}
+    return {"body_codec": body_codec.decode("ascii")}
+
+
+def _journal(file_path, entries):
+    """Append entries to the journal of a catalog; callers hold journal_lock."""
+    size = append_entries(journal_path(file_path), _file_stamp(file_path), entries)
+    stamp = _file_stamp(file_path)
+    if size >= max(COMPACT_MIN_BYTES, stamp[1] if stamp else 0):
+        _schedule_compaction(file_path)
+
+
+def upsert_technology(file_path, project):
+    """
+    Add or replace the project of one technology in a catalog file.
+
+    A replaced project keeps its id; a new one gets the next free id. The
+    change is appended to the journal, so its cost does not depend on the
+    size of the catalog.
+
+    Args:
+        file_path (str): Path to the catalog JSON file.
+        project (dict): Project data with "technology" and "project_tree".
+    """
+    technology = project["technology"]
+    fields = {key: value for key, value in project.items() if key != "id"}
+    with journal_lock(file_path):
+        data = get_catalog(file_path).data() or {"projects": []}
+        projects = data.get("projects", [])
+        for existing in projects:
+            if existing.get("technology") == technology:
+                record = {"id": existing.get("id"), **fields}
+                break
+        else:
+            next_id = max((p.get("id") or 0 for p in projects), default=0) + 1
+            record = {"id": next_id, **fields}
+        _journal(file_path, [{"op": "upsert", "project": record}])
+
+
+def delete_technology(file_path, technology):
+    """
+    Remove every project of a technology from a catalog file.
+
+    Args:
+        file_path (str): Path to the catalog JSON file.
+        technology (str): The technology to remove.
+
+    Returns:
+        bool: False if the catalog had no project of that technology.
+    """
+    with journal_lock(file_path):
+        data = get_catalog(file_path).data() or {"projects": []}
+        if not any(p.get("technology") == technology for p in data["projects"]):
+            return False
+        _journal(file_path, [{"op": "delete", "technology": technology}])
+    return True
+
+
+def replace_node(file_path, technology, path, node):
+    """
+    Replace one node of the tree of a technology.
+
+    Only the node is appended to the journal, not the whole project.
+
+    Args:
+        file_path (str): Path to the catalog JSON file.
+        technology (str): The technology whose tree is changed.
+        path (list): Names from the root of the tree down to the node.
+        node (dict): The new node.
+
+    Returns:
+        bool: False if the technology has no node at path.
+    """
+    with journal_lock(file_path):
+        project = get_catalog(file_path).get(technology)
+        tree = project.get("project_tree", []) if project else []
+        if not path or replace_tree_node(tree, list(path), node) is None:
+            return False
+        entry = {"op": "node", "technology": technology, "path": list(path)}
+        _journal(file_path, [dict(entry, node=node)])
+    return True
+
+
+def _diff_entries(current, data):
+    """
+    Return the journal entries turning current into data, or None if the
+    difference is not expressible as technology upserts and deletes.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("projects"), list):
+        return None
+    if {k: v for k, v in current.items() if k != "projects"} != {
+        k: v for k, v in data.items() if k != "projects"
+    }:
+        return None
+    existing = {}
+    for project in current.get("projects", []):
+        existing.setdefault(project.get("technology"), project)
+    entries = []
+    technologies = set()
+    for project in data["projects"]:
+        technology = project.get("technology") if isinstance(project, dict) else None
+        if technology is None or technology in technologies:
+            return None
+        technologies.add(technology)
+        if existing.get(technology) != project:
+            entries.append({"op": "upsert", "project": project})
+    for technology in existing:
+        if technology not in technologies:
+            entries.append({"op": "delete", "technology": technology})
+    return entries
+
+
+def update_catalog(file_path, data, body_codec=None, stream_codec=None, level=None):
+    """
+    Replace the catalog with data, journaling only the technologies that changed.
+
+    When the change is more than upserts and deletes of technologies (other
+    top-level keys, reordered or duplicate projects) the catalog is rewritten
+    with write_catalog and the given codec settings instead.
+
+    Args:
+        file_path (str): Path to the catalog JSON file.
+        data (dict): The new catalog data.
+        body_codec, stream_codec, level: Passed to write_catalog on a rewrite.
+    """
+    with journal_lock(file_path):
+        current = get_catalog(file_path).data()
+        entries = None if current is None else _diff_entries(current, data)
+        if entries is not None and apply_entries(current, entries) == data:
+            if entries:
+                _journal(file_path, entries)
+            return
+        _write_snapshot(file_path, data, body_codec, stream_codec, level)
+
+
+def compact_catalog(file_path):
+    """
+    Fold the journal of a catalog into a new snapshot.
+
+    The snapshot keeps the codec settings it was written with.
+
+    Args:
+        file_path (str): Path to the catalog JSON file.
+
+    Returns:
+        bool: False if there was no journal to fold.
+    """
+    with journal_lock(file_path):
+        entries, _ = read_journal(journal_path(file_path), _file_stamp(file_path))
+        if entries is None:
+            return False
+        data = get_catalog(file_path).data()
+        _write_snapshot(file_path, data, **_snapshot_codecs(file_path))
+    return True
+
+
+_compacting = set()
+_compacting_lock = threading.Lock()
+
+
+def _compact_in_background(key):
+    """Thread target of _schedule_compaction."""
+    try:
+        compact_catalog(key)
+    finally:
+        with _compacting_lock:
+            _compacting.discard(key)
+
+
+def _schedule_compaction(file_path):
+    """
+    Start compacting a catalog in a background thread, unless one already is.
+
+    The thread is not a daemon, so a short-lived process finishes the
+    compaction before it exits.
+    """
+    key = os.path.abspath(file_path)
+    with _compacting_lock:
+        if key in _compacting:
+            return
+        _compacting.add(key)
+    threading.Thread(
+        target=_compact_in_background, args=(key,), name="catalog-compaction"
+    ).start()
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(file_path=ADMINS_FILE_PATH):
+    """
+    Return the shared catalog instance for a file path.
+
+    Args:
+        file_path (str): Path to the catalog JSON file.
+
+    Returns:
+        TemplateCatalog: The catalog bound to the given path.
+    """
+    key = os.path.abspath(file_path)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = TemplateCatalog(key)
+        return catalog
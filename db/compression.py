@@ -0,0 +1,166 @@
+"""
+This module provides optional compression for the template catalog.
+
+Two storage modes are supported, each with zlib or lzma:
+- per-body: every inline file body is compressed on its own and stored as
+  {"codec": <codec>, "packed": <base64>} instead of "content". The catalog stays
+  JSON, so the sidecar byte-offset index keeps working.
+- stream: the whole catalog file is one compressed stream. It is recognised
+  by its magic bytes, since a plain catalog always starts with "{".
+
+Readers decompress transparently: TemplateCatalog and read_from_json go through
+load_catalog_bytes and unpack_tree.
+
+Functions:
+- compress, decompress: Compress or decompress bytes with a named codec.
+- detect_stream_codec: Returns the codec of a compressed catalog stream, if any.
+- pack_tree, unpack_tree: Compress or restore the inline bodies of a project tree.
+- pack_catalog, unpack_catalog: Same as above for every project of a catalog.
+- load_catalog_bytes: Parses raw catalog bytes in any storage mode.
+"""
+
+import base64
+import json
+import lzma
+import zlib
+
+CODECS = ("zlib", "lzma")
+
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+
+
+def compress(data, codec, level=None):
+    """
+    Compress bytes.
+
+    Args:
+        data (bytes): The data to compress.
+        codec (str): "zlib" or "lzma".
+        level (int): zlib level or lzma preset (0-9); the codec default if None.
+
+    Returns:
+        bytes: The compressed data.
+    """
+    if codec == "zlib":
+        return zlib.compress(data, -1 if level is None else level)
+    if codec == "lzma":
+        return lzma.compress(data, preset=level)
+    raise ValueError(f"unknown codec '{codec}'")
+
+
+def decompress(data, codec):
+    """Decompress bytes produced by compress with the same codec."""
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "lzma":
+        return lzma.decompress(data)
+    raise ValueError(f"unknown codec '{codec}'")
+
+
+def detect_stream_codec(head):
+    """
+    Return the codec of a compressed catalog stream from its first bytes.
+
+    Returns:
+        str: "zlib", "lzma", or None for a plain JSON catalog.
+    """
+    if head.startswith(_XZ_MAGIC):
+        return "lzma"
+    if len(head) >= 2 and head[0] == 0x78 and (head[0] << 8 | head[1]) % 31 == 0:
+        return "zlib"
+    return None
+
+
+def pack_tree(tree, codec, level=None):
+    """
+    Return a copy of a project tree with inline bodies compressed.
+
+    The base64 of each compressed body replaces the "content" string, which
+    costs a third of the compressed size.
+    A body is only packed when that makes it smaller; blob and binary nodes
+    are left as they are.
+    """
+    result = []
+    for node in tree:
+        if node.get("is_folder"):
+            children = pack_tree(node.get("children", []), codec, level)
+            node = dict(node, children=children)
+        elif node.get("content"):
+            body = node["content"].encode("utf-8")
+            packed = base64.b64encode(compress(body, codec, level)).decode("ascii")
+            if len(packed) < len(body):
+                node = {key: value for key, value in node.items() if key != "content"}
+                node["codec"] = codec
+                node["packed"] = packed
+        result.append(node)
+    return result
+
+
+def unpack_tree(tree):
+    """
+    Return a project tree with packed bodies restored to inline "content".
+
+    The tree itself is returned when it contains nothing to unpack.
+    """
+    result = []
+    changed = False
+    for node in tree:
+        if node.get("is_folder"):
+            children = node.get("children", [])
+            unpacked = unpack_tree(children)
+            if unpacked is not children:
+                node = dict(node, children=unpacked)
+                changed = True
+        elif "packed" in node:
+            body = decompress(base64.b64decode(node["packed"]), node["codec"])
+            node = {
+                key: value
+                for key, value in node.items()
+                if key not in ("codec", "packed")
+            }
+            node["content"] = body.decode("utf-8")
+            changed = True
+        result.append(node)
+    return result if changed else tree
+
+
+def _map_projects(data, transform):
+    """Apply transform to every project tree of catalog data; copy only on change."""
+    if not isinstance(data, dict) or "projects" not in data:
+        return data
+    projects = []
+    changed = False
+    for project in data["projects"]:
+        tree = project.get("project_tree", [])
+        new_tree = transform(tree)
+        if new_tree is not tree:
+            project = dict(project, project_tree=new_tree)
+            changed = True
+        projects.append(project)
+    return dict(data, projects=projects) if changed else data
+
+
+def pack_catalog(data, codec, level=None):
+    """Return catalog data with the inline bodies of every project compressed."""
+    return _map_projects(data, lambda tree: pack_tree(tree, codec, level))
+
+
+def unpack_catalog(data):
+    """Return catalog data with every packed body restored to inline content."""
+    return _map_projects(data, unpack_tree)
+
+
+def load_catalog_bytes(raw):
+    """
+    Parse raw catalog bytes, whatever their storage mode.
+
+    Args:
+        raw (bytes): The catalog file contents.
+
+    Returns:
+        dict: Catalog data with every body inline.
+    """
+    codec = detect_stream_codec(raw[:6])
+    if codec is not None:
+        raw = decompress(raw, codec)
+    return unpack_catalog(json.loads(raw))
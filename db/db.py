@@ -4,15 +4,20 @@ command-line arguments.
 
 Functions:
 - parse_project_name: Extracts technology and specifier from the project name.
-- write_to_json: Writes data to a JSON file.
+- write_to_json: Writes catalog data through the backend of a file.
 - get_admin_data: Retrieves administrative data for a given technology.
-- read_from_json: Reads data from a JSON file.
+- read_from_json: Reads catalog data through the backend of a file.
 - create_project_files: Creates project files based on administrative data.
 - add_code_file: Adds a new code file to the specified project.
 - remove_code_file: Removes a code file from the specified project.
 - edit_code_file: Edits a code file in the specified project.
 - create_and_run_project: Creates and runs a project based on technology and name.
 - validate_arguments: Validates command-line arguments.
+- split_arguments: Separates positional arguments from --name[=value] options.
+
+parse_project_name, get_admin_data and validate_arguments are timed as
+profiling spans (see app.profiling); the latency and outcome of the
+get_admin_data lookups are recorded in the metrics registry (see app.metrics).
 
 Exceptions:
 - DirectoryError: Raised when a directory does not exist.
@@ -20,12 +25,21 @@ Exceptions:
 """
 
 import os
-import json
 import sys
 
-from app.settings import CommandError, DirectoryError, UsageError, AVAILABLE_COMMANDS
+from app.settings import (
+    CommandError,
+    DirectoryError,
+    UsageError,
+    AVAILABLE_COMMANDS,
+)
+from app import metrics
+from app.profiling import timed
+from .blobs import get_blob_store, externalize_catalog, inline_tree
+from .storage import get_backend, open_backend
 
 
+@timed()
 def parse_project_name(project_name):
     """Parse the project name to extract technology and specifier."""
     if "_" in project_name:
@@ -36,27 +50,56 @@ def parse_project_name(project_name):
     return technology, specifier
 
 
-def write_to_json(file_path, data):
-    """Write data to a JSON file."""
-    with open(file_path, "w", encoding="utf-8") as file:
-        json.dump(data, file, ensure_ascii=False, indent=4)
-
-
-def get_admin_data(technology):
-    """Get administrative data for a given technology."""
-    with open("db/admin/admins.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
-        projects = data.get("projects", [])
-        for project in projects:
-            if project["technology"] == technology:
-                return project
-        return None
+def write_to_json(
+    file_path, data, blob_store=None, body_codec=None, stream_codec=None, level=None
+):
+    """
+    Write catalog data through the storage backend of file_path.
+
+    A path ending in .sqlite3, .sqlite or .db is written as an SQLite
+    database, anything else as a JSON catalog (see db.storage.open_backend).
+    When a blob store is given, catalog file bodies are moved into it and
+    the written project trees only hold blob digests and sizes. body_codec
+    compresses each inline file body and stream_codec the whole JSON file
+    ("zlib" or "lzma", at the given level); read_from_json undoes both.
+    """
+    if blob_store is not None:
+        data = externalize_catalog(data, blob_store)
+    open_backend(file_path).save(data, body_codec, stream_codec, level)
+
+
+@timed()
+@metrics.observed("get_admin_data")
+def get_admin_data(technology, inline=False):
+    """
+    Get administrative data for a given technology.
+
+    The project is a point lookup in the configured storage backend and may
+    be shared with other callers, so it must not be modified in place. File nodes may
+    reference the blob store; with inline=True a copy is returned whose file
+    nodes all carry their content as a string.
+    """
+    project = get_backend().get(technology)
+    metrics.inc(
+        "template_lookups", labels={"result": "miss" if project is None else "hit"}
+    )
+    if project is None or not inline:
+        return project
+    return dict(
+        project,
+        project_tree=inline_tree(project.get("project_tree", []), get_blob_store()),
+    )
 
 
 def read_from_json(file_path):
-    """Read data from a JSON file."""
-    with open(file_path, "r", encoding="utf-8") as file:
-        data = json.load(file)
+    """
+    Read catalog data through the storage backend of file_path.
+
+    The data may be shared with the backend's cache and must not be modified.
+    """
+    data = open_backend(file_path).load()
+    if data is None:
+        raise FileNotFoundError(file_path)
     return data
 
 
@@ -132,12 +175,32 @@ def create_and_run_project(technology, project_dir, project_name):
 
 
 
-def validate_arguments():
-    """Validate the command-line arguments."""
-    if len(sys.argv) < 4:
+def split_arguments(argv):
+    """
+    Split command-line arguments into positionals and options.
+
+    Options have the form --name=value or --name (a flag set to True);
+    dashes in option names are turned into underscores.
+    """
+    positional = []
+    options = {}
+    for arg in argv:
+        if arg.startswith("--"):
+            name, sep, value = arg[2:].partition("=")
+            options[name.replace("-", "_")] = value if sep else True
+        else:
+            positional.append(arg)
+    return positional, options
+
+
+@timed()
+def validate_arguments(argv=None):
+    """Validate the command-line arguments (argv defaults to sys.argv[1:])."""
+    arguments, _ = split_arguments(sys.argv[1:] if argv is None else argv)
+    if len(arguments) < 3:
         raise UsageError()
 
-    command, project_dir, project_name = sys.argv[1:4]
+    command, project_dir, project_name = arguments[:3]
 
     if not os.path.isdir(project_dir):
         raise DirectoryError(project_dir)
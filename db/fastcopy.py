@@ -0,0 +1,139 @@
+"""
+This module copies files without passing their bytes through Python memory.
+
+copy_file tries, in order:
+- a reflink (FICLONE ioctl), which shares extents on btrfs, XFS and similar
+  filesystems and copies nothing;
+- os.copy_file_range, which copies inside the kernel (and may offload to the
+  filesystem or NFS server);
+- os.sendfile;
+- shutil.copyfileobj as the portable fallback.
+
+Functions:
+- copy_file: Copies src_path to dst_path with the cheapest available method.
+- default_file_mode: Returns the mode open() gives a new file.
+"""
+
+import errno
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# _IOW(0x94, 9, int) from linux/fs.h
+FICLONE = 0x40049409
+
+# errno values meaning "this method is not available here, try the next one"
+_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EBADF,
+    errno.EPERM,
+}
+
+_CHUNK = 1 << 30
+
+# The umask of the process, read once by default_file_mode
+_umask = None
+
+
+def _reflink(src, dst):
+    """Clone src into dst; return False if reflinks are not supported."""
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError as e:
+        if e.errno in _UNSUPPORTED:
+            return False
+        raise
+    return True
+
+
+def _kernel_copy(copy, src, dst, size):
+    """
+    Copy size bytes with os.copy_file_range or os.sendfile.
+
+    Returns:
+        bool: False if the method is unsupported and nothing was copied.
+    """
+    copied = 0
+    while copied < size:
+        try:
+            sent = copy(src.fileno(), dst.fileno(), min(_CHUNK, size - copied))
+        except OSError as e:
+            if copied == 0 and e.errno in _UNSUPPORTED:
+                return False
+            raise
+        if sent == 0:
+            break
+        copied += sent
+    return True
+
+
+def _copy_file_range(src_fd, dst_fd, count):
+    """os.copy_file_range with the (src, dst, count) signature used by _kernel_copy."""
+    return os.copy_file_range(src_fd, dst_fd, count)
+
+
+def _sendfile(src_fd, dst_fd, count):
+    """os.sendfile with the (src, dst, count) signature used by _kernel_copy."""
+    return os.sendfile(dst_fd, src_fd, None, count)
+
+
+def copy_file(src_path, dst_path):
+    """
+    Copy src_path to dst_path, truncating dst_path if it exists.
+
+    Args:
+        src_path (str): File to copy.
+        dst_path (str): Destination path.
+
+    Returns:
+        str: The method used: "reflink", "copy_file_range", "sendfile" or "userspace".
+    """
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        size = os.fstat(src.fileno()).st_size
+        if size and _reflink(src, dst):
+            return "reflink"
+        if hasattr(os, "copy_file_range") and _kernel_copy(
+            _copy_file_range, src, dst, size
+        ):
+            return "copy_file_range"
+        if hasattr(os, "sendfile") and _kernel_copy(_sendfile, src, dst, size):
+            return "sendfile"
+        src.seek(0)
+        dst.seek(0)
+        dst.truncate()
+        shutil.copyfileobj(src, dst)
+        return "userspace"
+
+
+def default_file_mode():
+    """
+    Return the mode open() gives a new file: 0o666 without the umask bits.
+
+    tempfile.mkstemp creates files with mode 0o600, which os.replace keeps;
+    files written through a temporary file are given this mode instead, so
+    they can be shared like any other file.
+    """
+    global _umask
+    if _umask is None:
+        try:
+            # Read without changing it, which os.umask cannot do
+            with open("/proc/self/status", encoding="ascii") as status:
+                _umask = next(
+                    int(line.split()[1], 8)
+                    for line in status
+                    if line.startswith("Umask:")
+                )
+        except (OSError, StopIteration, ValueError):
+            _umask = os.umask(0o022)
+            os.umask(_umask)
+    return 0o666 & ~_umask
@@ -0,0 +1,244 @@
+"""
+This module provides the append-only journal of template catalog mutations.
+
+Instead of rewriting admins.json for every change, upserts and deletes of a
+single technology, and replacements of a single tree node, are appended to
+admins.json.journal. Each line is
+
+    <crc32 of payload, 8 hex digits> <JSON payload>\n
+
+The first line is a header recording the stamp (mtime_ns, size, inode) of the
+snapshot the journal applies to. When the snapshot is rewritten (a full write
+or a compaction) the header no longer matches and the journal is ignored, so a
+crash between writing a snapshot and removing the journal cannot apply the
+same entries twice. Replay stops at the first torn or corrupted line; a
+writer truncates such a tail before appending.
+
+Functions:
+- journal_path: Returns the journal path of a catalog file.
+- journal_lock: Serializes catalog writers across threads and processes.
+- read_journal: Reads the valid entries of a journal from a byte offset.
+- append_entries: Appends entries to the journal of a snapshot.
+- apply_entries: Replays entries on top of catalog data.
+- replace_tree_node: Returns a copy of a project tree with one node replaced.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import zlib
+
+from .tree import json_default
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def journal_path(file_path):
+    """Return the path of the journal of a catalog file."""
+    return file_path + ".journal"
+
+
+@contextlib.contextmanager
+def journal_lock(file_path):
+    """
+    Hold the writer lock of a catalog.
+
+    A per-path thread lock serializes writers in this process and an flock on
+    <catalog>.lock serializes them across processes where fcntl is available.
+    """
+    key = os.path.abspath(file_path)
+    with _locks_lock:
+        lock = _locks.setdefault(key, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        with open(key + ".lock", "a", encoding="utf-8") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _encode(payload):
+    """Return one checksummed journal line for a JSON-serializable payload."""
+    body = json.dumps(
+        payload, ensure_ascii=False, separators=(",", ":"), default=json_default
+    )
+    body = body.encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(body), body)
+
+
+def _decode(line):
+    """Return the payload of a journal line, or None if it fails its checksum."""
+    if len(line) < 10 or line[8:9] != b" ":
+        return None
+    body = line[9:]
+    try:
+        if int(line[:8], 16) != zlib.crc32(body):
+            return None
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def read_journal(path, base, offset=0):
+    """
+    Read the valid entries of a journal.
+
+    Args:
+        path (str): Path to the journal file.
+        base (tuple): Stamp of the current snapshot, or None if it is missing.
+        offset (int): Byte offset to resume from; 0 reads and checks the header.
+
+    Returns:
+        tuple: (entries, offset). entries is None when the journal is missing
+        or belongs to another snapshot; offset is the end of the last valid
+        line, where the next read (or append) continues.
+    """
+    try:
+        with open(path, "rb") as file:
+            file.seek(offset)
+            raw = file.read()
+    except FileNotFoundError:
+        return None, 0
+
+    entries = []
+    position = 0
+    while True:
+        end = raw.find(b"\n", position)
+        if end < 0:
+            break
+        payload = _decode(raw[position:end])
+        if payload is None:
+            break
+        if offset == 0 and position == 0:
+            stamp = payload.get("base")
+            if (tuple(stamp) if stamp is not None else None) != base:
+                return None, 0
+        else:
+            entries.append(payload)
+        position = end + 1
+    if offset == 0 and position == 0:
+        return None, 0
+    return entries, offset + position
+
+
+def append_entries(path, base, entries):
+    """
+    Append entries to the journal of a snapshot and flush them to disk.
+
+    A journal belonging to another snapshot is replaced by a new one, and a
+    torn or corrupted tail is cut off first. Callers hold journal_lock.
+
+    Args:
+        path (str): Path to the journal file.
+        base (tuple): Stamp of the current snapshot, or None if it is missing.
+        entries (list): Journal payloads to append.
+
+    Returns:
+        int: The size of the journal after the append.
+    """
+    existing, offset = read_journal(path, base)
+    lines = b"".join(_encode(entry) for entry in entries)
+    if existing is None:
+        header = _encode({"base": list(base) if base is not None else None})
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(header + lines)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+        return len(header) + len(lines)
+
+    with open(path, "r+b") as file:
+        file.truncate(offset)
+        file.seek(offset)
+        file.write(lines)
+        file.flush()
+        os.fsync(file.fileno())
+    return offset + len(lines)
+
+
+def apply_entries(data, entries):
+    """
+    Replay journal entries on top of catalog data.
+
+    An upsert replaces the first project of its technology in place or appends
+    it; a delete removes every project of its technology; a node entry
+    replaces the node at a path of the first project of its technology.
+
+    Args:
+        data (dict): Catalog data; it is not modified.
+        entries (list): Journal payloads in the order they were written.
+
+    Returns:
+        dict: The resulting catalog data.
+    """
+    projects = list(data.get("projects", []))
+    for entry in entries:
+        if entry.get("op") == "upsert":
+            project = entry["project"]
+            technology = project.get("technology")
+            for position, existing in enumerate(projects):
+                if existing.get("technology") == technology:
+                    projects[position] = project
+                    break
+            else:
+                projects.append(project)
+        elif entry.get("op") == "delete":
+            projects = [
+                project
+                for project in projects
+                if project.get("technology") != entry["technology"]
+            ]
+        elif entry.get("op") == "node":
+            for position, project in enumerate(projects):
+                if project.get("technology") == entry["technology"]:
+                    tree = replace_tree_node(
+                        project.get("project_tree", []), entry["path"], entry["node"]
+                    )
+                    if tree is not None:
+                        projects[position] = dict(project, project_tree=tree)
+                    break
+    return dict(data, projects=projects)
+
+
+def replace_tree_node(tree, path, node):
+    """
+    Return a copy of a project tree with the node at path replaced.
+
+    Only the folders along the path are copied; the rest is shared.
+
+    Args:
+        tree (list): The project tree.
+        path (list): Names from the root of the tree down to the node.
+        node (dict): The new node.
+
+    Returns:
+        list: The new tree, or None if no node exists at path.
+    """
+    for position, existing in enumerate(tree):
+        if existing.get("name") != path[0]:
+            continue
+        if len(path) == 1:
+            replacement = node
+        elif existing.get("is_folder"):
+            children = replace_tree_node(existing.get("children", []), path[1:], node)
+            if children is None:
+                return None
+            replacement = dict(existing, children=children)
+        else:
+            return None
+        tree = list(tree)
+        tree[position] = replacement
+        return tree
+    return None
@@ -0,0 +1,103 @@
+"""
+This module persists stat/hash manifests of serialized source directories.
+
+A manifest records, for every file of a source directory serialized into a
+template, its mtime, size and content hash. Updating the template then only
+re-reads files whose stat differs from the manifest.
+
+Classes:
+- Manifest: Per-file (mtime_ns, size, sha256) records of one source directory.
+
+Functions:
+- load_manifest: Loads the manifest of a directory/technology pair.
+- save_manifest: Atomically writes a manifest.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from app.settings import MANIFESTS_DIR
+
+
+class Manifest:
+    """
+    Stat and hash records of the files of one serialized source directory.
+
+    Attributes:
+        directory (str): Absolute path of the source directory.
+        technology (str): Template the directory was serialized into.
+        files (dict): Relative path -> [mtime_ns, size, sha256].
+        scanned_at (int): time_ns() taken when the scan started. Files modified
+        at or after this instant may have changed unnoticed within the same
+        mtime tick and are always re-read.
+    """
+
+    def __init__(self, directory, technology, files=None, scanned_at=0):
+        self.directory = os.path.abspath(directory)
+        self.technology = technology
+        self.files = files or {}
+        self.scanned_at = scanned_at
+
+    def is_unchanged(self, rel_path, stat):
+        """Return True if the file stat matches the record and is not racy."""
+        record = self.files.get(rel_path)
+        return (
+            record is not None
+            and record[0] == stat.st_mtime_ns
+            and record[1] == stat.st_size
+            and stat.st_mtime_ns < self.scanned_at
+        )
+
+    def digest(self, rel_path):
+        """Return the recorded content hash of a file, or None."""
+        record = self.files.get(rel_path)
+        return record[2] if record else None
+
+
+def _manifest_path(directory, technology, manifests_dir):
+    """Return the file holding the manifest of a directory/technology pair."""
+    key = f"{os.path.abspath(directory)}\0{technology}".encode("utf-8")
+    return os.path.join(manifests_dir, hashlib.sha1(key).hexdigest() + ".json")
+
+
+def load_manifest(directory, technology, manifests_dir=MANIFESTS_DIR):
+    """
+    Load the manifest of a directory serialized into a technology.
+
+    Returns:
+        Manifest: The stored manifest, or an empty one if none is usable.
+    """
+    path = _manifest_path(directory, technology, manifests_dir)
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return Manifest(directory, technology)
+    if data.get("directory") != os.path.abspath(directory):
+        return Manifest(directory, technology)
+    return Manifest(
+        directory, technology, data.get("files", {}), data.get("scanned_at", 0)
+    )
+
+
+def save_manifest(manifest, manifests_dir=MANIFESTS_DIR):
+    """Atomically write a manifest next to the other manifests."""
+    os.makedirs(manifests_dir, exist_ok=True)
+    path = _manifest_path(manifest.directory, manifest.technology, manifests_dir)
+    data = {
+        "directory": manifest.directory,
+        "technology": manifest.technology,
+        "scanned_at": manifest.scanned_at,
+        "files": manifest.files,
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=manifests_dir, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,438 @@
+"""
+This module provides an inverted index for searching the template catalog.
+
+Every file of every technology is a document. Its terms are the words of its
+name, of its folder path (technology included) and of its content. Words are
+lower-cased runs of letters and digits, so "create_project" is found by both
+"create" and "project". Each term maps to a posting list of (document, weight)
+pairs kept in two compact arrays sorted by document. Every query word must
+match, and the word being typed (the last one) also matches as a prefix of
+indexed words. A query starts from the word with the fewest postings and
+narrows its documents down with the other words, bisecting their postings
+when they are much longer than the documents left.
+
+sync builds the index and keeps it up to date, and is meant to run on a worker
+thread while queries continue on another. It reads each technology through a
+storage backend, compares per-file signatures with the indexed ones and only
+tokenizes files that were added or changed. Removed files are tombstoned; their
+postings are dropped once tombstones outnumber live documents.
+
+Classes:
+- SearchHit: One ranked match of a query.
+- SearchIndex: Inverted index over the files of a catalog.
+"""
+
+import array
+import bisect
+import functools
+import heapq
+import itertools
+import math
+import operator
+import re
+import threading
+from collections import Counter, namedtuple
+
+from app.settings import CancelledError
+from .blobs import node_bytes
+
+_WORD = re.compile(r"[^\W_]+")
+
+# Bits of a posting weight: the term is a word of the file name, of its folder
+# path; the low bits count its occurrences in the content
+_NAME_BIT = 0x8000
+_PATH_BIT = 0x4000
+_MAX_COUNT = 0x3FFF
+
+NAME_WEIGHT = 8.0
+PATH_WEIGHT = 3.0
+# Score factor of an indexed word that the typed word is only a prefix of
+PREFIX_FACTOR = 0.5
+# Typed words shorter than this are matched exactly, not as prefixes
+MIN_PREFIX = 2
+# Most indexed words one prefix expands to (the shortest are kept)
+MAX_EXPANSIONS = 64
+# A word's postings are probed per candidate instead of read whole when they
+# are this many times larger than the candidates left
+PROBE_RATIO = 32
+# Files tokenized between two index updates visible to queries
+SYNC_BATCH = 256
+
+SearchHit = namedtuple("SearchHit", "score technology path")
+SearchHit.__doc__ = "A matching file; path is the tuple of names from the tree root."
+
+# SearchHit from a (score, technology, path) tuple without the Python-level
+# __new__ of namedtuple, which dominates the cost of large result lists
+_make_hit = functools.partial(tuple.__new__, SearchHit)
+
+_score_table = None
+
+
+def _scores():
+    """Return the score of every posting weight, computed on first use."""
+    global _score_table
+    if _score_table is None:
+        table = []
+        for weight in range(0x10000):
+            count = weight & _MAX_COUNT
+            score = 1.0 + math.log(count) if count else 0.0
+            if weight & _NAME_BIT:
+                score += NAME_WEIGHT
+            if weight & _PATH_BIT:
+                score += PATH_WEIGHT
+            table.append(score)
+        _score_table = table
+    return _score_table
+
+
+def _iter_files(tree):
+    """Yield (path, node) for every file node of a project tree."""
+    stack = [((), tree)]
+    while stack:
+        prefix, nodes = stack.pop()
+        for node in nodes:
+            path = prefix + (node["name"],)
+            if node.get("is_folder"):
+                stack.append((path, node.get("children") or []))
+            else:
+                yield path, node
+
+
+def _find_node(tree, path):
+    """Return the node at path in a project tree, or None."""
+    node = None
+    for name in path:
+        node = next((child for child in tree if child["name"] == name), None)
+        if node is None:
+            return None
+        tree = node.get("children") or []
+    return node
+
+
+def _signature(node):
+    """Return a value that changes whenever the body of a file node changes."""
+    if "blob" in node:
+        return node["blob"]
+    content = node.get("content") or ""
+    return len(content), hash(content)
+
+
+def _node_text(node):
+    """Return the text of a file node; binary and unreadable files have none."""
+    if node.get("binary"):
+        return ""
+    if "blob" not in node:
+        return node.get("content") or ""
+    try:
+        return node_bytes(node).decode("utf-8", "replace")
+    except OSError:
+        return ""
+
+
+def _document_terms(technology, path, text):
+    """Return {term: posting weight} of one file."""
+    terms = {
+        term: min(count, _MAX_COUNT)
+        for term, count in Counter(_WORD.findall(text.lower())).items()
+    }
+    for word in _WORD.findall(" ".join((technology,) + path[:-1]).lower()):
+        terms[word] = terms.get(word, 0) | _PATH_BIT
+    for word in _WORD.findall(path[-1].lower()):
+        terms[word] = terms.get(word, 0) | _NAME_BIT
+    return terms
+
+
+class SearchIndex:
+    """
+    Inverted index over file names, folder paths and file contents of a catalog.
+
+    search and snippets may be called from any thread while sync runs.
+    """
+
+    def __init__(self, backend):
+        """
+        Initializes an empty index; call sync to fill it.
+
+        Args:
+            backend (CatalogBackend): The catalog the files are read from.
+        """
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        # Document id -> (technology, path), or None once the file is removed
+        self._docs = []
+        # Technology -> {path: (document id, signature)}
+        self._files = {}
+        # Term -> (array of document ids, array of posting weights)
+        self._postings = {}
+        self._vocabulary = []
+        self._new_terms = []
+        self._live = 0
+        self._dead = 0
+
+    def __len__(self):
+        """Return the number of indexed files."""
+        return self._live
+
+    def sync(self, progress=None, cancel=None):
+        """
+        Bring the index up to date with the catalog.
+
+        Only files whose body changed since the last sync are tokenized again,
+        and queries see the new files in batches of SYNC_BATCH.
+
+        Args:
+            progress: Called as progress(files, chars) for the tokenized files.
+            cancel: threading.Event that stops the sync when set.
+
+        Raises:
+            CancelledError: If cancel was set; the files indexed so far stay.
+        """
+        with self._sync_lock:
+            technologies = self.backend.technologies()
+            for technology in set(self._files) - set(technologies):
+                with self._lock:
+                    self._remove(self._files.pop(technology).values())
+            files_read = chars_read = 0
+            for technology in technologies:
+                project = self.backend.get(technology) or {}
+                indexed = self._files.get(technology, {})
+                seen, batch = set(), []
+                for path, node in _iter_files(project.get("project_tree") or []):
+                    if cancel is not None and cancel.is_set():
+                        raise CancelledError("Indexing")
+                    seen.add(path)
+                    signature = _signature(node)
+                    entry = indexed.get(path)
+                    if entry is not None and entry[1] == signature:
+                        continue
+                    text = _node_text(node)
+                    terms = _document_terms(technology, path, text)
+                    batch.append((path, signature, terms))
+                    files_read += 1
+                    chars_read += len(text)
+                    if progress is not None:
+                        progress(files_read, chars_read)
+                    if len(batch) >= SYNC_BATCH:
+                        self._apply(technology, batch)
+                        batch = []
+                self._apply(technology, batch)
+                with self._lock:
+                    files = self._files.get(technology, {})
+                    removed = [path for path in files if path not in seen]
+                    self._remove(files.pop(path) for path in removed)
+                    self._merge_vocabulary()
+            if self._dead > max(self._live, 1024):
+                self._compact()
+
+    def _apply(self, technology, batch):
+        """Index a batch of (path, signature, terms), replacing older versions."""
+        with self._lock:
+            files = self._files.setdefault(technology, {})
+            for path, signature, terms in batch:
+                if path in files:
+                    self._remove([files[path]])
+                doc = len(self._docs)
+                self._docs.append((technology, path))
+                self._live += 1
+                for term, weight in terms.items():
+                    posting = self._postings.get(term)
+                    if posting is None:
+                        posting = (array.array("I"), array.array("H"))
+                        self._postings[term] = posting
+                        self._new_terms.append(term)
+                    posting[0].append(doc)
+                    posting[1].append(weight)
+                files[path] = (doc, signature)
+
+    def _remove(self, entries):
+        """Tombstone the documents of (document id, signature) entries."""
+        for doc, _signature in entries:
+            self._docs[doc] = None
+            self._live -= 1
+            self._dead += 1
+
+    def _merge_vocabulary(self):
+        """Merge the terms added since the last call into the sorted vocabulary."""
+        if self._new_terms:
+            self._vocabulary = list(
+                heapq.merge(self._vocabulary, sorted(self._new_terms))
+            )
+            self._new_terms = []
+
+    def _compact(self):
+        """
+        Drop the postings of tombstoned documents.
+
+        Only sync changes the postings, so the new lists are built without the
+        lock and swapped in at once.
+        """
+        docs = self._docs
+        postings = {}
+        for term, (ids, weights) in self._postings.items():
+            keep = [i for i, doc in enumerate(ids) if docs[doc] is not None]
+            if len(keep) == len(ids):
+                postings[term] = (ids, weights)
+            elif keep:
+                postings[term] = (
+                    array.array("I", (ids[i] for i in keep)),
+                    array.array("H", (weights[i] for i in keep)),
+                )
+        with self._lock:
+            self._postings = postings
+            self._vocabulary = sorted(postings)
+            self._new_terms = []
+            self._dead = 0
+
+    def _expand(self, word):
+        """Return the indexed words starting with word, the shortest first."""
+        vocabulary = self._vocabulary
+        start = bisect.bisect_left(vocabulary, word)
+        end = bisect.bisect_left(vocabulary, word + "\U0010ffff", start)
+        return heapq.nsmallest(MAX_EXPANSIONS, vocabulary[start:end], key=len)
+
+    def _match(self, word, prefix):
+        """
+        Return the postings of the indexed words matching one query word.
+
+        Returns:
+            list: (factor, document ids, weights) per matching term, by
+                ascending factor (rarer terms have larger factors).
+        """
+        terms = self._expand(word) if prefix else [word]
+        documents = max(self._live, 1)
+        matches = []
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            factor = math.log(1.0 + documents / len(posting[0]))
+            if term != word:
+                factor *= PREFIX_FACTOR
+            matches.append((factor,) + posting)
+        matches.sort(key=operator.itemgetter(0))
+        return matches
+
+    @staticmethod
+    def _scored(matches):
+        """
+        Return {document id: score} of the postings of one query word.
+
+        A document in several postings (expansions of a prefix) gets the score
+        of the rarest term, which is applied last. The dict is built with map
+        and update, so no Python code runs per posting.
+        """
+        table = _scores().__getitem__
+        scores = {}
+        for factor, ids, weights in matches:
+            values = map(operator.mul, map(table, weights), itertools.repeat(factor))
+            scores.update(zip(ids, values))
+        return scores
+
+    @staticmethod
+    def _probe(matches, candidates):
+        """
+        Return the candidates also in the postings of a word, with its score added.
+
+        Posting lists are sorted by document id, so each candidate is looked up
+        by bisection instead of reading the whole lists.
+        """
+        table = _scores()
+        found = {}
+        for doc, score in candidates.items():
+            best = None
+            for factor, ids, weights in matches:
+                position = bisect.bisect_left(ids, doc)
+                if position < len(ids) and ids[position] == doc:
+                    best = table[weights[position]] * factor
+            if best is not None:
+                found[doc] = score + best
+        return found
+
+    def search(self, query, limit=None):
+        """
+        Return the files matching every word of a query, best first.
+
+        Args:
+            query (str): Words to look for in file names, paths and contents.
+                Unless the query ends with a space or punctuation, its last
+                word also matches longer words it is a prefix of.
+            limit (int): Return at most this many hits; all if None.
+
+        Returns:
+            list: SearchHit tuples ordered by descending score.
+        """
+        words = _WORD.findall(query.lower())
+        if not words:
+            return []
+        typing = query[-1:].isalnum()
+        with self._lock:
+            self._merge_vocabulary()
+            matches = []
+            for position, word in enumerate(words):
+                prefix = typing and position == len(words) - 1
+                postings = self._match(word, prefix and len(word) >= MIN_PREFIX)
+                if not postings:
+                    return []
+                size = sum(len(ids) for _factor, ids, _weights in postings)
+                matches.append((size, postings))
+            # Start from the word with the fewest postings and narrow it down
+            matches.sort(key=operator.itemgetter(0))
+            candidates = self._scored(matches[0][1])
+            for size, postings in matches[1:]:
+                if len(candidates) * PROBE_RATIO < size:
+                    candidates = self._probe(postings, candidates)
+                    continue
+                scores = self._scored(postings)
+                narrowed = {}
+                for doc, score in candidates.items():
+                    other = scores.get(doc)
+                    if other is not None:
+                        narrowed[doc] = score + other
+                candidates = narrowed
+            docs = self._docs
+            ranked = []
+            for doc, score in candidates.items():
+                location = docs[doc]
+                if location is not None:
+                    ranked.append((score,) + location)
+        # Sorting on the score alone keeps ties in index order, which is cheaper
+        ranked.sort(key=operator.itemgetter(0), reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return list(map(_make_hit, ranked))
+
+    def snippets(self, hits, query, width=120):
+        """
+        Return the content line where each hit first matches the query.
+
+        Args:
+            hits (list): SearchHit tuples returned by search.
+            query (str): The query of the hits.
+            width (int): Maximum length of a returned line.
+
+        Returns:
+            list: "line: text" for each hit, or "" if only its path matched.
+        """
+        words = _WORD.findall(query.lower())
+        if not words:
+            return ["" for _hit in hits]
+        pattern = re.compile("|".join(map(re.escape, words)), re.IGNORECASE)
+        trees = {}
+        lines = []
+        for hit in hits:
+            if hit.technology not in trees:
+                project = self.backend.get(hit.technology) or {}
+                trees[hit.technology] = project.get("project_tree") or []
+            node = _find_node(trees[hit.technology], hit.path)
+            text = _node_text(node) if node is not None else ""
+            match = pattern.search(text)
+            if match is None:
+                lines.append("")
+                continue
+            start = text.rfind("\n", 0, match.start()) + 1
+            end = text.find("\n", match.end())
+            line = text[start : end if end >= 0 else len(text)].strip()
+            number = text.count("\n", 0, start) + 1
+            lines.append(f"{number}: {line[:width]}")
+        return lines
@@ -0,0 +1,369 @@
+"""
+This module provides the SQLite backend of the template catalog.
+
+The database runs in WAL mode, so readers see a consistent snapshot and never
+block on the single writer (nor it on them). Every thread (and process) uses
+its own connection.
+
+Tables:
+- catalog: One row with the top-level catalog keys other than "projects".
+- technologies: One row per project, indexed by technology name; fields holds
+  the project without its tree.
+- nodes: The project trees in pre-order, keyed by (project, node) and linked
+  to their parent node (indexed); file bodies live in blobs.
+- blobs: File bodies keyed by SHA-256, shared by identical files.
+
+Looking up a technology is two index range scans: its technologies row, then
+its nodes in pre-order.
+
+Classes:
+- SqliteBackend: CatalogBackend over an SQLite database file.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from app.profiling import timed
+from app.settings import StorageError
+from .compression import pack_catalog, unpack_tree
+from .storage import CatalogBackend
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    key INTEGER PRIMARY KEY CHECK (key = 0),
+    fields TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS technologies (
+    pk INTEGER PRIMARY KEY,
+    technology TEXT,
+    position INTEGER NOT NULL,
+    project_id INTEGER,
+    fields TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS technologies_by_name
+    ON technologies (technology, position);
+CREATE INDEX IF NOT EXISTS technologies_by_position ON technologies (position);
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS nodes (
+    project INTEGER NOT NULL REFERENCES technologies (pk) ON DELETE CASCADE,
+    node INTEGER NOT NULL,
+    parent INTEGER NOT NULL,
+    fields TEXT NOT NULL,
+    body TEXT REFERENCES blobs (digest),
+    PRIMARY KEY (project, node)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS nodes_by_body ON nodes (body);
+CREATE INDEX IF NOT EXISTS nodes_by_parent ON nodes (project, parent);
+"""
+
+
+def _dumps(value):
+    """Serialize a value for a fields column."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _split_node(node, blobs):
+    """
+    Return the (fields, body) columns of a node.
+
+    An inline string body is moved to blobs (digest -> bytes) and replaced by
+    a null placeholder, as are the children of a folder.
+    """
+    fields = dict(node)
+    body = None
+    if isinstance(fields.get("content"), str):
+        data = fields["content"].encode("utf-8")
+        body = hashlib.sha256(data).hexdigest()
+        blobs[body] = data
+        fields["content"] = None
+    if "children" in fields:
+        fields["children"] = None
+    return _dumps(fields), body
+
+
+class SqliteBackend(CatalogBackend):
+    """Catalog stored in an SQLite database."""
+
+    def __init__(self, file_path):
+        """
+        Initializes the backend for the given database file.
+
+        Args:
+            file_path (str): Path to the SQLite database; created on first use.
+        """
+        self.file_path = file_path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connection(self):
+        """Return the connection of the current thread, opening it if needed."""
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            # A connection must not be used across fork, so reopen in children
+            connection = sqlite3.connect(
+                self.file_path, timeout=30, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    connection.executescript(_SCHEMA)
+                    self._schema_ready = True
+            self._local.pid, self._local.connection = pid, connection
+        return self._local.connection
+
+    @contextlib.contextmanager
+    def _transaction(self, write=False):
+        """
+        Run a block in one transaction.
+
+        Reads get a consistent snapshot; writes take the write lock up front so
+        two writers never deadlock upgrading from a read. SQLite errors are
+        raised as StorageError.
+        """
+        try:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        except sqlite3.Error as exc:
+            raise StorageError(self.file_path, str(exc)) from exc
+        try:
+            yield connection
+            connection.execute("COMMIT")
+        except BaseException as exc:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            if isinstance(exc, sqlite3.Error):
+                raise StorageError(self.file_path, str(exc)) from exc
+            raise
+
+    def _first_project(self, connection, technology):
+        """Return (pk, project_id) of the first project of a technology, or None."""
+        return connection.execute(
+            "SELECT pk, project_id FROM technologies WHERE technology = ? "
+            "ORDER BY position LIMIT 1",
+            (technology,),
+        ).fetchone()
+
+    def _read_project(self, connection, pk, fields):
+        """Rebuild a project from its technologies row and its nodes."""
+        project = json.loads(fields)
+        if "project_tree" not in project:
+            return project
+        root = []
+        children = {0: root}
+        rows = connection.execute(
+            "SELECT nodes.node, nodes.parent, nodes.fields, blobs.data FROM nodes "
+            "LEFT JOIN blobs ON blobs.digest = nodes.body "
+            "WHERE nodes.project = ? ORDER BY nodes.node",
+            (pk,),
+        )
+        for node_id, parent, node_fields, body in rows:
+            node = json.loads(node_fields)
+            if body is not None:
+                node["content"] = body.decode("utf-8")
+            if "children" in node:
+                node["children"] = children[node_id] = []
+            children[parent].append(node)
+        project["project_tree"] = unpack_tree(root)
+        return project
+
+    def _insert_project(self, connection, project, position):
+        """Insert a project and its tree."""
+        fields = dict(project)
+        tree = fields.get("project_tree")
+        if "project_tree" in fields:
+            fields["project_tree"] = None
+        pk = connection.execute(
+            "INSERT INTO technologies (technology, position, project_id, fields) "
+            "VALUES (?, ?, ?, ?)",
+            (project.get("technology"), position, project.get("id"), _dumps(fields)),
+        ).lastrowid
+        nodes, blobs = [], {}
+        self._flatten(tree or [], 0, pk, nodes, blobs)
+        connection.executemany(
+            "INSERT OR IGNORE INTO blobs (digest, size, data) VALUES (?, ?, ?)",
+            ((digest, len(data), data) for digest, data in blobs.items()),
+        )
+        connection.executemany(
+            "INSERT INTO nodes (project, node, parent, fields, body) "
+            "VALUES (?, ?, ?, ?, ?)",
+            nodes,
+        )
+
+    def _flatten(self, tree, parent, pk, nodes, blobs):
+        """Append the nodes of a tree in pre-order, moving file bodies to blobs."""
+        for node in tree:
+            node_id = len(nodes) + 1
+            fields, body = _split_node(node, blobs)
+            nodes.append((pk, node_id, parent, fields, body))
+            if "children" in node:
+                self._flatten(node["children"] or [], node_id, pk, nodes, blobs)
+
+    def _release_bodies(self, connection, bodies):
+        """Delete the blobs of bodies that no node references any more."""
+        connection.executemany(
+            "DELETE FROM blobs WHERE digest = ? "
+            "AND NOT EXISTS (SELECT 1 FROM nodes WHERE body = ?)",
+            ((digest, digest) for digest in bodies),
+        )
+
+    def _delete_projects(self, connection, where, parameters):
+        """Delete the projects matching a condition and the blobs only they used."""
+        bodies = connection.execute(
+            "SELECT DISTINCT body FROM nodes WHERE body IS NOT NULL AND project IN "
+            f"(SELECT pk FROM technologies WHERE {where})",
+            parameters,
+        ).fetchall()
+        connection.execute(f"DELETE FROM technologies WHERE {where}", parameters)
+        self._release_bodies(connection, [digest for (digest,) in bodies])
+
+    @timed("catalog.sqlite_get")
+    def get(self, technology):
+        """Return the project of a technology with two indexed queries."""
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT pk, fields FROM technologies WHERE technology = ? "
+                "ORDER BY position LIMIT 1",
+                (technology,),
+            ).fetchone()
+            if row is None:
+                return None
+            return self._read_project(connection, *row)
+
+    def technologies(self):
+        """Return the sorted technology names of the catalog."""
+        with self._transaction() as connection:
+            rows = connection.execute(
+                "SELECT DISTINCT technology FROM technologies "
+                "WHERE technology IS NOT NULL ORDER BY technology"
+            ).fetchall()
+        return [technology for (technology,) in rows]
+
+    def exists(self):
+        """Return True if the catalog was ever saved or upserted to."""
+        with self._transaction() as connection:
+            return connection.execute("SELECT 1 FROM catalog").fetchone() is not None
+
+    def load(self):
+        """Return the whole catalog, or None if it was never saved."""
+        with self._transaction() as connection:
+            row = connection.execute("SELECT fields FROM catalog").fetchone()
+            if row is None:
+                return None
+            data = json.loads(row[0])
+            data["projects"] = [
+                self._read_project(connection, pk, fields)
+                for pk, fields in connection.execute(
+                    "SELECT pk, fields FROM technologies ORDER BY position"
+                ).fetchall()
+            ]
+        return data
+
+    def save(self, data, body_codec=None, stream_codec=None, level=None):
+        """
+        Replace the whole catalog with data in one transaction.
+
+        body_codec packs file bodies as in write_catalog; stream_codec does
+        not apply to a database and is ignored.
+        """
+        if body_codec is not None:
+            data = pack_catalog(data, body_codec, level)
+        fields = dict(data)
+        fields["projects"] = None
+        with self._transaction(write=True) as connection:
+            connection.execute("DELETE FROM nodes")
+            connection.execute("DELETE FROM technologies")
+            connection.execute("DELETE FROM blobs")
+            connection.execute(
+                "INSERT OR REPLACE INTO catalog (key, fields) VALUES (0, ?)",
+                (_dumps(fields),),
+            )
+            for position, project in enumerate(data.get("projects", [])):
+                self._insert_project(connection, project, position)
+
+    def upsert(self, project):
+        """Add or replace the first project of a technology, keeping its id."""
+        technology = project["technology"]
+        fields = {key: value for key, value in project.items() if key != "id"}
+        with self._transaction(write=True) as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO catalog (key, fields) VALUES (0, ?)",
+                (_dumps({"projects": None}),),
+            )
+            existing = self._first_project(connection, technology)
+            if existing is not None:
+                pk, project_id = existing
+                (position,) = connection.execute(
+                    "SELECT position FROM technologies WHERE pk = ?", (pk,)
+                ).fetchone()
+                self._delete_projects(connection, "pk = ?", (pk,))
+            else:
+                project_id, position = connection.execute(
+                    "SELECT COALESCE(MAX(project_id), 0) + 1, "
+                    "COALESCE(MAX(position), -1) + 1 FROM technologies"
+                ).fetchone()
+            self._insert_project(connection, {"id": project_id, **fields}, position)
+
+    def delete(self, technology):
+        """Remove every project of a technology; return False if there was none."""
+        with self._transaction(write=True) as connection:
+            if self._first_project(connection, technology) is None:
+                return False
+            self._delete_projects(connection, "technology = ?", (technology,))
+        return True
+
+    def replace_node(self, technology, path, node):
+        """
+        Replace the file node at path with one row update.
+
+        Folders cannot be replaced this way; use upsert for structural changes.
+        """
+        if not path or "children" in node:
+            return False
+        with self._transaction(write=True) as connection:
+            existing = self._first_project(connection, technology)
+            if existing is None:
+                return False
+            pk, parent, row = existing[0], 0, None
+            for name in path:
+                row = next(
+                    (
+                        candidate
+                        for candidate in connection.execute(
+                            "SELECT node, fields, body FROM nodes "
+                            "WHERE project = ? AND parent = ? ORDER BY node",
+                            (pk, parent),
+                        )
+                        if json.loads(candidate[1]).get("name") == name
+                    ),
+                    None,
+                )
+                if row is None:
+                    return False
+                parent = row[0]
+            node_id, old_fields, old_body = row
+            if "children" in json.loads(old_fields):
+                return False
+            blobs = {}
+            fields, body = _split_node(node, blobs)
+            connection.executemany(
+                "INSERT OR IGNORE INTO blobs (digest, size, data) VALUES (?, ?, ?)",
+                ((digest, len(data), data) for digest, data in blobs.items()),
+            )
+            connection.execute(
+                "UPDATE nodes SET fields = ?, body = ? WHERE project = ? AND node = ?",
+                (fields, body, pk, node_id),
+            )
+            if old_body is not None and old_body != body:
+                self._release_bodies(connection, [old_body])
+        return True
@@ -0,0 +1,213 @@
+"""
+This module defines the pluggable storage backends of the template catalog.
+
+A backend stores catalog data ({"projects": [...]}) and answers point queries
+for a single technology. Two backends are available:
+- JsonBackend: admins.json with its sidecar index and journal (db.catalog).
+- SqliteBackend: an SQLite database in WAL mode (db.sqlite_store).
+
+The default backend is chosen by STORAGE_BACKEND (the LAZY_PROJECT_STORAGE
+environment variable); open_backend picks one from a file extension. The
+first time get_backend returns an SQLite database that was never saved, it
+imports the JSON catalog (ADMINS_FILE_PATH) into it.
+
+Classes:
+- CatalogBackend: Interface every backend implements.
+- JsonBackend: Backend over a JSON catalog file.
+
+Functions:
+- open_backend: Returns the shared backend for a catalog file path.
+- get_backend: Returns the shared backend selected in the settings.
+"""
+
+import os
+import threading
+
+from app.settings import (
+    ADMINS_FILE_PATH,
+    SQLITE_FILE_PATH,
+    STORAGE_BACKEND,
+    StorageError,
+)
+from .catalog import (
+    get_catalog,
+    write_catalog,
+    update_catalog,
+    upsert_technology,
+    delete_technology,
+    replace_node,
+)
+
+SQLITE_EXTENSIONS = (".sqlite3", ".sqlite", ".db")
+
+
+class CatalogBackend:
+    """
+    Interface of a template catalog store.
+
+    Returned data is shared with other callers and must not be modified.
+    """
+
+    def get(self, technology):
+        """Return the project of a technology, or None if it is unknown."""
+        raise NotImplementedError
+
+    def technologies(self):
+        """Return the sorted technology names of the catalog."""
+        raise NotImplementedError
+
+    def exists(self):
+        """Return True if the catalog was ever saved."""
+        raise NotImplementedError
+
+    def load(self):
+        """Return the whole catalog, or None if it does not exist."""
+        raise NotImplementedError
+
+    def save(self, data, body_codec=None, stream_codec=None, level=None):
+        """Replace the whole catalog with data."""
+        raise NotImplementedError
+
+    def update(self, data, body_codec=None, stream_codec=None, level=None):
+        """Replace the catalog with data, writing only what changed if possible."""
+        self.save(data, body_codec, stream_codec, level)
+
+    def upsert(self, project):
+        """Add or replace the project of one technology, keeping its id."""
+        raise NotImplementedError
+
+    def delete(self, technology):
+        """Remove every project of a technology; return False if there was none."""
+        raise NotImplementedError
+
+    def replace_node(self, technology, path, node):
+        """
+        Replace the file node at path (names from the tree root) of a technology.
+
+        Returns False if the technology has no file node at path.
+        """
+        raise NotImplementedError
+
+
+class JsonBackend(CatalogBackend):
+    """Catalog stored as a JSON file, served through the shared TemplateCatalog."""
+
+    def __init__(self, file_path):
+        """
+        Initializes the backend for the given file.
+
+        Args:
+            file_path (str): Path to the catalog JSON file.
+        """
+        self.file_path = file_path
+
+    def get(self, technology):
+        """Return the project of a technology through the sidecar index or cache."""
+        return get_catalog(self.file_path).get(technology)
+
+    def technologies(self):
+        """Return the sorted technology names of the catalog."""
+        return get_catalog(self.file_path).technologies()
+
+    def exists(self):
+        """Return True if the catalog file exists."""
+        return os.path.exists(self.file_path)
+
+    def load(self):
+        """Return the whole catalog with the journal replayed."""
+        return get_catalog(self.file_path).data()
+
+    def save(self, data, body_codec=None, stream_codec=None, level=None):
+        """Rewrite the catalog file, see write_catalog."""
+        write_catalog(self.file_path, data, body_codec, stream_codec, level)
+
+    def update(self, data, body_codec=None, stream_codec=None, level=None):
+        """Journal the technologies that changed, see update_catalog."""
+        update_catalog(self.file_path, data, body_codec, stream_codec, level)
+
+    def upsert(self, project):
+        """Journal an upsert of one technology, see upsert_technology."""
+        upsert_technology(self.file_path, project)
+
+    def delete(self, technology):
+        """Journal the removal of one technology, see delete_technology."""
+        return delete_technology(self.file_path, technology)
+
+    def replace_node(self, technology, path, node):
+        """Journal the replacement of one node, see replace_node."""
+        return replace_node(self.file_path, technology, path, node)
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+# Paths of the databases already checked by _import_json
+_imported = set()
+_import_lock = threading.Lock()
+
+
+def open_backend(file_path):
+    """
+    Return the shared backend for a catalog file.
+
+    Files ending in one of SQLITE_EXTENSIONS are SQLite databases; anything
+    else is a JSON catalog.
+
+    Args:
+        file_path (str): Path to the catalog file.
+
+    Returns:
+        CatalogBackend: The backend bound to the given path.
+    """
+    key = os.path.abspath(file_path)
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            if key.endswith(SQLITE_EXTENSIONS):
+                from .sqlite_store import SqliteBackend
+
+                backend = SqliteBackend(key)
+            else:
+                backend = JsonBackend(key)
+            _backends[key] = backend
+        return backend
+
+
+def _import_json(backend, source):
+    """
+    Save the catalog of source into backend if backend was never saved.
+
+    Each backend is checked once per process, so only its first use pays for
+    the check.
+
+    Args:
+        backend (CatalogBackend): The catalog to fill.
+        source (CatalogBackend): The catalog to copy from.
+    """
+    with _import_lock:
+        if backend.file_path in _imported:
+            return
+        if not backend.exists() and source.exists():
+            backend.save(source.load())
+        _imported.add(backend.file_path)
+
+
+def get_backend(name=STORAGE_BACKEND):
+    """
+    Return the shared backend selected by name.
+
+    An SQLite database that was never saved is filled from the JSON catalog
+    on first use.
+
+    Args:
+        name (str): "json" or "sqlite".
+
+    Returns:
+        CatalogBackend: The backend of the default catalog file.
+    """
+    if name == "json":
+        return open_backend(ADMINS_FILE_PATH)
+    if name == "sqlite":
+        backend = open_backend(SQLITE_FILE_PATH)
+        _import_json(backend, open_backend(ADMINS_FILE_PATH))
+        return backend
+    raise StorageError(name, "unknown backend, expected 'json' or 'sqlite'")
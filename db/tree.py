@@ -0,0 +1,283 @@
+"""
+This module defines a compact in-memory representation of project trees.
+
+A project tree in the catalog is a list of JSON objects:
+    {"name", "is_folder": False, "content": <text>}
+    {"name", "is_folder": False, "blob": <digest>, "size": <bytes>[, "binary": True]}
+    {"name", "is_folder": True, "children": [...]}
+Held as dicts, every node costs a few hundred bytes. FileNode and DirNode
+hold the same fields in __slots__ (a fraction of that), intern their names,
+which repeat across folders and templates, and can load a blob body on
+demand instead of holding it.
+
+Nodes are read-only Mappings with the keys of their JSON object, so code
+written for dict nodes (node["name"], node.get("children"), "blob" in node,
+dict(node)) works on them unchanged, and trees may mix both kinds. Pass
+json_default to json.dumps to write them; the output is the JSON schema
+above.
+
+Classes:
+- FileNode: A file, with an inline body or a blob reference.
+- DirNode: A folder and its children.
+
+Functions:
+- from_json: Converts a JSON project tree into nodes.
+- to_json: Converts nodes back into a JSON project tree.
+- json_default: json.dumps hook writing nodes as their JSON objects.
+- blob_store_of: Returns the store holding the blob of a file node.
+
+Imports:
+- sys: For interning names.
+- get_blob_store: For loading blob bodies on demand.
+"""
+
+import sys
+from collections.abc import Mapping
+
+from .blobs import get_blob_store
+
+_intern = sys.intern
+
+_FILE_KEYS = frozenset(("name", "is_folder", "content", "blob", "size", "binary"))
+
+
+class FileNode(Mapping):
+    """
+    A file of a project tree.
+
+    Attributes:
+        name (str): The file name (interned).
+        blob (str): SHA-256 digest of an out-of-line body, or None.
+        size (int): Size in bytes of an out-of-line body, or None.
+        binary (bool): True for a binary body, which is never decoded.
+        store (BlobStore): Store holding the blob; None for the catalog store.
+    """
+
+    __slots__ = ("name", "_content", "blob", "size", "binary", "store")
+
+    is_folder = False
+
+    def __init__(
+        self, name, content=None, blob=None, size=None, binary=False, store=None
+    ):
+        """
+        Initializes the node with an inline body (content) or a blob reference.
+        """
+        self.name = _intern(name)
+        self._content = content
+        self.blob = blob
+        self.size = size
+        self.binary = binary
+        self.store = store
+
+    @property
+    def content(self):
+        """
+        The body as text.
+
+        An out-of-line text body is read from the blob store on every access
+        and not kept; binary bodies have no text and give None.
+        """
+        if self._content is None and self.blob is not None and not self.binary:
+            return (self.store or get_blob_store()).get(self.blob).decode("utf-8")
+        return self._content
+
+    def body(self):
+        """Return the body as bytes, inline or from the blob store."""
+        if self.blob is not None:
+            return (self.store or get_blob_store()).get(self.blob)
+        return (self._content or "").encode("utf-8")
+
+    def to_json(self):
+        """Return the JSON object of the node."""
+        if self.blob is None:
+            return {"name": self.name, "is_folder": False, "content": self._content}
+        node = {
+            "name": self.name,
+            "is_folder": False,
+            "blob": self.blob,
+            "size": self.size,
+        }
+        if self.binary:
+            node["binary"] = True
+        return node
+
+    def __getitem__(self, key):
+        if key == "name":
+            return self.name
+        if key == "is_folder":
+            return False
+        if self.blob is None:
+            if key == "content":
+                return self._content
+        elif key == "blob":
+            return self.blob
+        elif key == "size":
+            return self.size
+        elif key == "binary" and self.binary:
+            return True
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in ("name", "is_folder"):
+            return True
+        if self.blob is None:
+            return key == "content"
+        return key in ("blob", "size") or (key == "binary" and self.binary)
+
+    def __iter__(self):
+        return iter(self.to_json())
+
+    def __len__(self):
+        if self.blob is None:
+            return 3
+        return 5 if self.binary else 4
+
+    def __repr__(self):
+        return f"FileNode({self.name!r})"
+
+
+class DirNode(Mapping):
+    """
+    A folder of a project tree.
+
+    Attributes:
+        name (str): The folder name (interned).
+        children (list): The nodes of the folder.
+    """
+
+    __slots__ = ("name", "children")
+
+    is_folder = True
+
+    def __init__(self, name, children=None):
+        """
+        Initializes the folder with its child nodes.
+        """
+        self.name = _intern(name)
+        self.children = [] if children is None else children
+
+    def to_json(self):
+        """Return the JSON object of the folder, its children left as they are."""
+        return {"name": self.name, "is_folder": True, "children": self.children}
+
+    def __getitem__(self, key):
+        if key == "name":
+            return self.name
+        if key == "is_folder":
+            return True
+        if key == "children":
+            return self.children
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in ("name", "is_folder", "children")
+
+    def __iter__(self):
+        return iter(("name", "is_folder", "children"))
+
+    def __len__(self):
+        return 3
+
+    def __repr__(self):
+        return f"DirNode({self.name!r}, {len(self.children)} children)"
+
+
+def node_from_json(node, store=None):
+    """
+    Return the node of a JSON object, or the object itself if it is not in
+    the schema of this module (e.g. a node with extra keys), so that
+    converting back is lossless.
+
+    Args:
+        node (dict): A JSON tree node; its children are converted too.
+        store (BlobStore): Store the blob bodies are loaded from.
+    """
+    if not isinstance(node, dict) or not isinstance(node.get("name"), str):
+        return node
+    if node.get("is_folder") is True:
+        children = node.get("children")
+        if len(node) != 3 or not isinstance(children, list):
+            return node
+        return DirNode(node["name"], from_json(children, store))
+    if node.get("is_folder") is not False or not _FILE_KEYS.issuperset(node):
+        return node
+    if "blob" in node:
+        if (
+            "content" in node
+            or "size" not in node
+            or node.get("binary", True) is not True
+        ):
+            return node
+        return FileNode(
+            node["name"],
+            blob=node["blob"],
+            size=node.get("size"),
+            binary="binary" in node,
+            store=store,
+        )
+    content = node.get("content")
+    if not isinstance(content, str) or len(node) != 3:
+        return node
+    return FileNode(node["name"], content)
+
+
+def blob_store_of(node, default=None):
+    """
+    Return the store holding the blob of a file node.
+
+    A FileNode carries the store it was built with (e.g. by scan_tree), which
+    may differ from the catalog store; dict nodes carry none.
+
+    Args:
+        node (Mapping): A file node with a "blob" key.
+        default (BlobStore): Store used when the node carries none; the
+        catalog store if None.
+    """
+    return getattr(node, "store", None) or default or get_blob_store()
+
+
+def from_json(tree, store=None):
+    """
+    Convert a JSON project tree into FileNode and DirNode objects.
+
+    Args:
+        tree (list): The project tree; nodes that already are objects are kept.
+        store (BlobStore): Store the blob bodies are loaded from.
+
+    Returns:
+        list: The converted tree.
+    """
+    return [node_from_json(node, store) for node in tree]
+
+
+def to_json(tree):
+    """
+    Convert a project tree of nodes back into JSON objects.
+
+    Args:
+        tree (list): The project tree; dict nodes are copied as they are.
+
+    Returns:
+        list: A tree of dicts only.
+    """
+    result = []
+    for node in tree:
+        if node.get("is_folder"):
+            node = dict(node, children=to_json(node.get("children") or []))
+        elif isinstance(node, FileNode):
+            node = node.to_json()
+        result.append(node)
+    return result
+
+
+def json_default(value):
+    """
+    json.dumps hook writing FileNode and DirNode objects as their JSON objects.
+
+    Raises:
+        TypeError: For any other value, as json.dumps does without a hook.
+    """
+    if isinstance(value, (FileNode, DirNode)):
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -1,9 +1,16 @@
 """
 LazyProjectGUI is the main class for the graphical user interface (GUI) 
 that manages project templates, themes, and interactions with JSON data.
+
+Template operations run as jobs on a QThreadPool (gui.utils.jobs); the main
+thread only shows dialogs and updates widgets with their results. The catalog
+is browsed in a lazily loaded tree (gui.utils.template_model) with the body of
+the selected file in a side pane; the whole catalog is only dumped as JSON
+into the editor on request. The search box queries an index of every
+template (gui.utils.search_manager), refreshed whenever the catalog changes.
 """
 
-import json
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import (
     QMainWindow,
     QPushButton,
@@ -12,6 +19,10 @@ from PyQt5.QtWidgets import (
     QTextEdit,
     QComboBox,
     QLineEdit,
+    QListWidget,
+    QPlainTextEdit,
+    QSplitter,
+    QTreeView,
 )
 from .utils import (
     TemplateManager,
@@ -20,6 +31,9 @@ from .utils import (
     ThemeManager,
     JsonSerializer,
     HelpManager,
+    Job,
+    JobRunner,
+    TemplateTreeModel,
 )
 
 
@@ -32,11 +46,16 @@ class LazyProjectGUI(QMainWindow):
     Methods:
     - init_ui: Initializes the user interface components.
     - load_style: Loads a specific stylesheet for the GUI.
-    - load_json_data: Loads the JSON data into the editor.
+    - load_json_data: Reloads the template tree and the technology selector.
+    - show_json: Loads the whole catalog as JSON into the editor.
+    - show_file_body: Shows the selected file in the side pane.
+    - save_file_body: Writes the side pane back to the selected file only.
+    - show_search_hit: Selects the file of a search match in the tree.
     - create_template: Creates a new template and displays it in the editor.
     - update_template: Updates the selected template based on the editor content.
     - delete_specific_technology: Deletes the selected technology from the list.
     - serialize_template: Saves the content of the JSON editor to a file.
+    - cancel_jobs: Cancels the running template operations.
     """
 
     def __init__(self):
@@ -51,6 +70,7 @@ class LazyProjectGUI(QMainWindow):
         self.theme_manager = ThemeManager(self)
         self.menu_manager = MenuManager(self, self.theme_manager)
         self.help_manager = HelpManager(self)
+        self.jobs = JobRunner(self)
 
         self.init_ui()
 
@@ -92,6 +112,48 @@ class LazyProjectGUI(QMainWindow):
         self.serialize_button.clicked.connect(self.serialize_template)
         content_layout.addWidget(self.serialize_button)
 
+        self.cancel_button = QPushButton("Cancel", self)
+        self.cancel_button.setToolTip("Stops the running template operation.")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_jobs)
+        content_layout.addWidget(self.cancel_button)
+        self.jobs.busy_changed.connect(self.set_busy)
+
+        self.template_model = TemplateTreeModel(self.template_manager.backend, self)
+        self.tree_view = QTreeView(self)
+        self.tree_view.setModel(self.template_model)
+        self.tree_view.setUniformRowHeights(True)
+        self.tree_view.setToolTip("Technologies and their templates.")
+        self.tree_view.selectionModel().currentChanged.connect(self.show_file_body)
+
+        self.body_editor = QPlainTextEdit(self)
+        self.body_editor.setPlaceholderText("Select a file to see its content...")
+        self.body_editor.setReadOnly(True)
+        self.save_file_button = QPushButton("Save file", self)
+        self.save_file_button.setToolTip(
+            "Writes the edited file back to its template, leaving the rest unchanged."
+        )
+        self.save_file_button.setEnabled(False)
+        self.save_file_button.clicked.connect(self.save_file_body)
+        body_layout = QVBoxLayout()
+        body_layout.setContentsMargins(0, 0, 0, 0)
+        body_layout.addWidget(self.body_editor)
+        body_layout.addWidget(self.save_file_button)
+        body_pane = QWidget(self)
+        body_pane.setLayout(body_layout)
+
+        splitter = QSplitter(Qt.Horizontal, self)
+        splitter.addWidget(self.tree_view)
+        splitter.addWidget(body_pane)
+        content_layout.addWidget(splitter)
+
+        self.show_json_button = QPushButton("Show JSON", self)
+        self.show_json_button.setToolTip(
+            "Loads the whole catalog as JSON into the editor below."
+        )
+        self.show_json_button.clicked.connect(self.show_json)
+        content_layout.addWidget(self.show_json_button)
+
         self.json_editor = QTextEdit(self)
         self.json_editor.setPlaceholderText("JSON content will appear here...")
         self.json_editor.setToolTip("A text editor for editing and viewing JSON data.")
@@ -99,9 +161,16 @@ class LazyProjectGUI(QMainWindow):
 
         self.search_line_edit = QLineEdit(self)
         self.search_line_edit.setPlaceholderText("Search...")
-        self.search_line_edit.setToolTip("Search for technologies by name.")
+        self.search_line_edit.setToolTip(
+            "Search file names, paths and contents of all templates."
+        )
         content_layout.addWidget(self.search_line_edit)
 
+        self.search_results = QListWidget(self)
+        self.search_results.setUniformItemSizes(True)
+        self.search_results.setToolTip("Matches, best first; activate one to open it.")
+        content_layout.addWidget(self.search_results)
+
         self.technology_selector = QComboBox(self)
         self.technology_selector.setToolTip("Select a technology from the list.")
         content_layout.addWidget(self.technology_selector)
@@ -117,14 +186,17 @@ class LazyProjectGUI(QMainWindow):
         self.setCentralWidget(central_widget)
 
         self.search_manager = SearchManager(
-            self, self.json_editor, self.search_line_edit
+            self,
+            self.search_line_edit,
+            self.search_results,
+            self.template_manager.backend,
+            self.show_search_hit,
         )
         self.json_serializer = JsonSerializer(
             self, self.template_manager, self.json_editor, self.technology_selector
         )
 
         self.load_json_data()
-        self.template_manager.populate_technology_selector(self.technology_selector)
         self.theme_manager.apply_theme()
 
     def load_style(self, style_file):
@@ -142,45 +214,183 @@ class LazyProjectGUI(QMainWindow):
         except FileNotFoundError:
             self.statusBar().showMessage(f"Style file {style_file} not found")
 
+    def set_busy(self, busy):
+        """
+        Enables the Cancel button while jobs run and the catalog-changing
+        buttons otherwise.
+        """
+        self.cancel_button.setEnabled(busy)
+        for button in (self.create_button, self.update_button, self.delete_button):
+            button.setEnabled(not busy)
+
+    def cancel_jobs(self):
+        """
+        Cancels the running template operations; a directory scan stops at
+        its next entry.
+        """
+        self.jobs.cancel_all()
+        self.statusBar().showMessage("Cancelling...")
+
+    def show_progress(self, files, bytes_read):
+        """
+        Shows the progress of a directory scan in the status bar.
+        """
+        self.statusBar().showMessage(
+            f"Scanning: {files} files, {bytes_read / (1024 * 1024):.1f} MiB read"
+        )
+
+    def show_job_error(self, message):
+        """
+        Shows the error of a failed job in the status bar.
+        """
+        self.statusBar().showMessage(f"Error: {message}")
+
+    def show_cancelled(self):
+        """
+        Reports a cancelled job in the status bar.
+        """
+        self.statusBar().showMessage("Operation cancelled")
+
     def load_json_data(self):
         """
-        Loads the current JSON data into the editor from the TemplateManager.
+        Reloads the template tree and the technology selector, reading the
+        technologies on a worker thread. Projects are read when expanded.
+        """
+        self.jobs.start(
+            Job(self.template_manager.backend.technologies),
+            on_finished=self.show_technologies,
+            on_failed=self.show_job_error,
+        )
+
+    def show_json(self):
+        """
+        Loads the whole catalog as indented JSON into the editor, dumping it
+        on a worker thread.
         """
-        json_data = self.template_manager.load_json_data()
-        if json_data:
-            self.json_editor.setPlainText(json.dumps(json_data, indent=4))
+        self.jobs.start(
+            Job(self.template_manager.load_editor_state),
+            on_finished=self.show_editor_state,
+            on_failed=self.show_job_error,
+        )
+
+    def show_file_body(self, current, _previous=None):
+        """
+        Shows the body of the file selected in the tree in the side pane.
+        """
+        text, editable = self.template_model.file_body(current)
+        self.body_editor.setPlainText(text or "")
+        self.body_editor.setReadOnly(not editable)
+        self.save_file_button.setEnabled(editable)
+
+    def save_file_body(self):
+        """
+        Writes the side pane back to the selected file; only that node of
+        its template is written.
+        """
+        index = self.tree_view.currentIndex()
+        if self.template_model.set_file_body(index, self.body_editor.toPlainText()):
+            path = self.template_model.data(index, Qt.ToolTipRole)
+            self.statusBar().showMessage(f"{path} saved")
+            self.search_manager.refresh_index()
+        else:
+            self.statusBar().showMessage("The file no longer exists in its template")
+
+    def show_search_hit(self, hit):
+        """
+        Selects the file of a search match in the tree, showing its body.
+        """
+        index = self.template_model.find(hit.technology, hit.path)
+        if index.isValid():
+            self.tree_view.setCurrentIndex(index)
+            self.tree_view.scrollTo(index)
+        else:
+            self.statusBar().showMessage("The file no longer exists in its template")
+
+    def show_editor_state(self, state):
+        """
+        Puts the catalog read by load_json_data into the editor and selector.
+        """
+        json_text, technologies = state
+        if json_text:
+            self.json_editor.setPlainText(json_text)
+        self.template_manager.populate_technology_selector(
+            self.technology_selector, technologies
+        )
 
     def create_template(self):
         """
         Creates a new template using the TemplateManager and displays the
-        JSON content in the editor.
+        JSON content in the editor. The directory is scanned on a worker
+        thread with its progress shown in the status bar.
+        """
+        directory = self.template_manager.choose_directory()
+        if not directory:
+            self.statusBar().showMessage("No directory selected")
+            return
+        self.statusBar().showMessage(f"Scanning {directory}...")
+        job = Job(
+            self.template_manager.create_template, directory, reports_progress=True
+        )
+        self.jobs.start(
+            job,
+            on_finished=self.template_created,
+            on_failed=self.show_job_error,
+            on_progress=self.show_progress,
+            on_cancelled=self.show_cancelled,
+        )
+
+    def template_created(self, result):
+        """
+        Displays the JSON content of a created template.
         """
-        json_text, message = self.template_manager.create_template()
+        json_text, message = result
         if json_text:
             self.json_editor.setPlainText(json_text)
+            self.load_json_data()
         self.statusBar().showMessage(message)
 
+    def show_technologies(self, technologies):
+        """
+        Fills the template tree and the technology selector with technologies
+        read on a worker thread, and brings the search index up to date.
+        """
+        self.template_model.reload(technologies)
+        self.template_manager.populate_technology_selector(
+            self.technology_selector, technologies
+        )
+        self.search_manager.refresh_index()
+
     def update_template(self):
         """
         Updates the currently selected template with the JSON data from the editor.
         """
         json_text = self.json_editor.toPlainText()
-        message = self.template_manager.update_template(json_text)
-        if "successfully" in message:
-            self.load_json_data()
-            self.template_manager.populate_technology_selector(self.technology_selector)
-        self.statusBar().showMessage(message)
+        self.jobs.start(
+            Job(self.template_manager.update_template, json_text),
+            on_finished=self.template_changed,
+            on_failed=self.show_job_error,
+        )
 
     def delete_specific_technology(self):
         """
         Deletes the currently selected technology from the list using TemplateManager.
         """
         selected_technology = self.technology_selector.currentText()
-        message = self.template_manager.delete_specific_technology(selected_technology)
+        self.jobs.start(
+            Job(self.template_manager.delete_specific_technology, selected_technology),
+            on_finished=self.template_changed,
+            on_failed=self.show_job_error,
+        )
+
+    def template_changed(self, message):
+        """
+        Shows the outcome of an update or delete and reloads the editor on success.
+        """
+        if not message:
+            return
         self.statusBar().showMessage(message)
-        if "removed successfully" in message:
+        if "successfully" in message:
             self.load_json_data()
-            self.template_manager.populate_technology_selector(self.technology_selector)
 
     def serialize_template(self):
         """
@@ -5,11 +5,13 @@ This package provides utility functions and classes used throughout the
 'gui' module of the project.
 
 Functions:
-- build_tree: Function to build a project tree structure.
+- build_tree: Function to build a project tree structure in a single scandir pass.
 - build_project_structure: Function to set up the project structure.
 
 Classes:
 - TemplateManager: Class to manage and apply templates in the project.
+- Job, JobRunner: Run template operations on a QThreadPool with progress and cancel.
+- TemplateTreeModel: Lazily loaded tree model of the catalog's project trees.
 """
 
 from .utils import build_tree, build_project_structure
@@ -19,3 +21,5 @@ from .menu_manager import MenuManager
 from .them_manager import ThemeManager
 from .search_manager import SearchManager
 from .help_manager import HelpManager
+from .jobs import Job, JobRunner
+from .template_model import TemplateTreeModel
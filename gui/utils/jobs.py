@@ -0,0 +1,156 @@
+"""
+This module runs template operations off the Qt main thread.
+
+A Job wraps a callable in a QRunnable executed on the global QThreadPool.
+Its results, errors and progress are delivered back to the main thread
+through Qt signals, so the window keeps repainting and handling input while
+a large directory is scanned or the catalog is written.
+
+Classes:
+- JobSignals: Signals a Job emits to the main thread.
+- Job: QRunnable running one callable, with progress reporting and cancellation.
+- JobRunner: Starts jobs on the thread pool and cancels the running ones.
+"""
+
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from app import CancelledError
+
+# Minimum interval between two progress signals of one job, in seconds
+PROGRESS_INTERVAL = 0.1
+
+
+class JobSignals(QObject):
+    """
+    Signals emitted by a Job.
+
+    - progress(files, bytes_read): Running totals of a scan.
+    - finished(result): The callable returned result.
+    - failed(message): The callable raised an exception.
+    - cancelled(): The callable stopped because the job was cancelled.
+    """
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Job(QRunnable):
+    """
+    Runs func(*args, **kwargs) on a worker thread.
+
+    With reports_progress=True the callable also receives progress= and
+    cancel= keyword arguments: a progress(files, bytes_read) callback and a
+    threading.Event that is set when the job is cancelled.
+    """
+
+    def __init__(self, func, *args, reports_progress=False, **kwargs):
+        """
+        Initializes the job.
+
+        :param func: The callable to run on the worker thread.
+        :param args: Positional arguments of func.
+        :param reports_progress: Pass progress= and cancel= to func.
+        :param kwargs: Keyword arguments of func.
+        """
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.reports_progress = reports_progress
+        self.signals = JobSignals()
+        self.cancel_event = threading.Event()
+        self._last_progress = 0.0
+
+    def cancel(self):
+        """Ask the job to stop; a scan notices it at its next directory entry."""
+        self.cancel_event.set()
+
+    def report(self, files, bytes_read):
+        """Emit a progress signal, at most once per PROGRESS_INTERVAL."""
+        now = time.monotonic()
+        if now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.signals.progress.emit(files, bytes_read)
+
+    def run(self):
+        """Run the callable and emit its outcome (called by the thread pool)."""
+        kwargs = dict(self.kwargs)
+        if self.reports_progress:
+            kwargs.update(progress=self.report, cancel=self.cancel_event)
+        try:
+            result = self.func(*self.args, **kwargs)
+        except CancelledError:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            if self.cancel_event.is_set():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.finished.emit(result)
+
+
+class JobRunner(QObject):
+    """
+    Starts jobs on the global QThreadPool and tracks the running ones.
+
+    busy_changed(bool) is emitted when the first job starts and when the last
+    one ends, so the window can toggle its buttons.
+    """
+
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        """
+        Initializes the runner.
+
+        :param parent: The parent QObject (typically the main window).
+        """
+        super().__init__(parent)
+        self.pool = QThreadPool.globalInstance()
+        self.running = set()
+
+    def start(
+        self, job, on_finished=None, on_failed=None, on_progress=None, on_cancelled=None
+    ):
+        """
+        Connect the callbacks of a job and queue it on the thread pool.
+
+        The callbacks run on the main thread.
+
+        :param job: The Job to run.
+        :param on_finished: Called with the result of the job.
+        :param on_failed: Called with the error message of the job.
+        :param on_progress: Called with (files, bytes_read) while the job runs.
+        :param on_cancelled: Called when the job stopped after a cancel.
+        """
+        for signal, callback in (
+            (job.signals.finished, on_finished),
+            (job.signals.failed, on_failed),
+            (job.signals.progress, on_progress),
+            (job.signals.cancelled, on_cancelled),
+        ):
+            if callback is not None:
+                signal.connect(callback)
+        for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+            signal.connect(lambda *_, job=job: self._done(job))
+
+        self.running.add(job)
+        if len(self.running) == 1:
+            self.busy_changed.emit(True)
+        self.pool.start(job)
+
+    def _done(self, job):
+        """Forget a job that emitted its outcome."""
+        self.running.discard(job)
+        if not self.running:
+            self.busy_changed.emit(False)
+
+    def cancel_all(self):
+        """Cancel every running job."""
+        for job in list(self.running):
+            job.cancel()
@@ -1,49 +1,136 @@
 """
-This module manages search functionality within the JSON editor.
-It provides real-time search capabilities and highlights matching text.
+This module manages search across all templates of the catalog.
+It queries an inverted index (db.search_index) of file names, paths and
+contents as the user types and lists every match with its path and the
+matching line.
 """
 
-from PyQt5.QtCore import Qt
+import time
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QListWidgetItem
+from db.search_index import SearchIndex
+from .jobs import Job, JobRunner
+
+# Delay after the last keystroke before a query runs, in milliseconds
+DEBOUNCE_MS = 150
+
+# Number of matches listed; the status bar shows the total
+DISPLAY_LIMIT = 200
+
 
 class SearchManager:
     """
-    Manages search operations within the JSON editor, including real-time text search
-    and highlighting of matching text.
+    Manages catalog-wide search: keeps the search index up to date on a
+    worker thread, runs debounced queries and lists ranked matches.
     """
 
-    def __init__(self, parent, json_editor, search_line_edit):
+    def __init__(self, parent, search_line_edit, results_view, backend, open_hit):
         """
-        Initializes the SearchManager with the parent widget, JSON editor, and search line edit.
+        Initializes the SearchManager and starts building the index.
 
         :param parent: The parent widget (typically a QMainWindow or QWidget).
-        :param json_editor: The text editor widget where the search is performed.
         :param search_line_edit: The line edit widget used for entering search terms.
+        :param results_view: The QListWidget listing the matches.
+        :param backend: The CatalogBackend whose templates are searched.
+        :param open_hit: Called with the SearchHit of an activated match.
         """
         self.parent = parent
-        self.json_editor = json_editor
         self.search_line_edit = search_line_edit
-        self.search_line_edit.textChanged.connect(self.search_text)
+        self.results_view = results_view
+        self.open_hit = open_hit
+        self.index = SearchIndex(backend)
+        self.jobs = JobRunner(parent)
+        self.indexing = False
+        self.reindex_pending = False
 
-    def search_text(self):
+        self.timer = QTimer(parent)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(DEBOUNCE_MS)
+        self.timer.timeout.connect(self.search_text)
+        self.search_line_edit.textChanged.connect(self.timer.start)
+        self.results_view.itemActivated.connect(self.activate_item)
+
+    def refresh_index(self):
+        """
+        Brings the index up to date with the catalog on a worker thread.
+
+        Only files that changed are indexed again. A refresh asked for while
+        one runs is started when it ends.
+        """
+        if self.indexing:
+            self.reindex_pending = True
+            return
+        self.indexing = True
+        self.jobs.start(
+            Job(self.index.sync, reports_progress=True),
+            on_finished=self.index_ready,
+            on_failed=self.index_failed,
+            on_progress=self.show_progress,
+            on_cancelled=self.index_ready,
+        )
+
+    def show_progress(self, files, _chars):
+        """
+        Shows the number of files indexed so far in the status bar.
+        """
+        self.parent.statusBar().showMessage(f"Indexing templates: {files} files")
+
+    def index_ready(self, _result=None):
+        """
+        Starts a pending refresh, or reruns the current query on the new index.
         """
-        Performs a search based on the text in the search line edit.
-        Highlights the matching text and updates the status bar with search results.
-        """
-        search_term = self.search_line_edit.text()
-        cursor = self.json_editor.textCursor()
-        cursor.movePosition(cursor.Start)
-        char_format = cursor.charFormat()
-        char_format.setBackground(Qt.yellow)
-        cursor.setCharFormat(char_format)
-        cursor = self.json_editor.textCursor()
-
-        if search_term:
-            cursor = self.json_editor.document().find(search_term, cursor)
-            if cursor.isNull():
-                self.parent.statusBar().showMessage("No matches found")
-            else:
-                self.json_editor.setTextCursor(cursor)
-                self.parent.statusBar().showMessage("Text found")
+        self.indexing = False
+        if self.reindex_pending:
+            self.reindex_pending = False
+            self.refresh_index()
+        elif self.search_line_edit.text().strip():
+            self.search_text()
         else:
-            self.json_editor.setTextCursor(cursor)
+            self.parent.statusBar().showMessage(f"{len(self.index)} files indexed")
+
+    def index_failed(self, message):
+        """
+        Reports a failed index refresh in the status bar.
+        """
+        self.indexing = False
+        self.reindex_pending = False
+        self.parent.statusBar().showMessage(f"Search index error: {message}")
+
+    def search_text(self):
+        """
+        Searches all templates for the text in the search line edit and lists
+        the matches, best first, with the line where each one matches.
+        """
+        query = self.search_line_edit.text()
+        self.results_view.clear()
+        if not query.strip():
             self.parent.statusBar().showMessage("")
+            return
+
+        start = time.perf_counter()
+        hits = self.index.search(query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        shown = hits[:DISPLAY_LIMIT]
+        for hit, snippet in zip(shown, self.index.snippets(shown, query)):
+            path = "/".join((hit.technology,) + hit.path)
+            item = QListWidgetItem(f"{path}  {snippet}" if snippet else path)
+            item.setToolTip(path)
+            item.setData(Qt.UserRole, hit)
+            self.results_view.addItem(item)
+
+        if not hits:
+            message = "No matches found"
+        else:
+            message = f"{len(hits)} matches in {elapsed_ms:.1f} ms"
+            if len(hits) > len(shown):
+                message += f", showing the first {len(shown)}"
+        if self.indexing:
+            message += " (indexing...)"
+        self.parent.statusBar().showMessage(message)
+
+    def activate_item(self, item):
+        """
+        Opens the file of an activated match.
+        """
+        self.open_hit(item.data(Qt.UserRole))
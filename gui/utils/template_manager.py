@@ -2,13 +2,23 @@
 TemplateManager class for handling template operations.
 
 This module provides functionalities to create, update, delete, serialize,
-and load project templates in JSON format. It also includes methods to
-populate a QComboBox with technology data from the JSON file.
+and load project templates. The catalog is read and changed through the
+configured storage backend (db.storage): with the JSON backend,
+single-technology changes are appended to the catalog journal and full
+rewrites can compress file bodies or the whole file. Apart from
+choose_directory and populate_technology_selector, the methods do not touch
+widgets and can run on a worker thread (see gui.utils.jobs). It also includes
+methods to populate a QComboBox with technology data from the catalog.
+The template operations are timed as profiling spans (see app.profiling) and
+their latency is recorded in the metrics registry (see app.metrics).
 """
 import json
-import os
 from PyQt5.QtWidgets import QFileDialog
-from app import ProjectError, DirectoryError, AdminDataError, ADMINS_FILE_PATH
+from app import ProjectError, DirectoryError, AdminDataError, CancelledError
+from app.metrics import observed
+from app.profiling import timed
+from db.storage import get_backend
+from db.tree import json_default
 from .utils import build_project_structure
 
 
@@ -17,32 +27,70 @@ class TemplateManager:
     Manages project templates including creation, update, deletion, and serialization.
     """
 
-    def __init__(self, status_bar):
+    def __init__(
+        self, status_bar, body_codec=None, stream_codec=None, level=None, backend=None
+    ):
         """
         Initializes TemplateManager with a status bar.
 
         Args:
             status_bar: Status bar widget to display messages.
+            body_codec: "zlib" or "lzma" to compress every file body on rewrite.
+            stream_codec: "zlib" or "lzma" to compress the whole catalog on rewrite.
+            level: Compression level passed to the codec.
+            backend: Catalog storage backend; the configured one if None.
         """
         self.status_bar = status_bar
+        self.backend = backend or get_backend()
+        self.write_options = {
+            "body_codec": body_codec,
+            "stream_codec": stream_codec,
+            "level": level,
+        }
+
+    def choose_directory(self):
+        """
+        Asks the user for the directory of a new template (main thread only).
 
-    def create_template(self):
+        Returns:
+            The selected directory, or an empty string if the dialog was cancelled.
+        """
+        return QFileDialog.getExistingDirectory(None, "Choose project directory")
+
+    @timed("TemplateManager.create_template")
+    @observed("TemplateManager.create_template")
+    def create_template(self, directory=None, progress=None, cancel=None):
         """
         Creates a new template based on the user's selected directory.
 
+        Args:
+            directory: Directory to serialize; asks the user if None.
+            progress: Called as progress(files, bytes_read) during the scan.
+            cancel: threading.Event that stops the scan when set.
+
         Returns:
             Tuple containing JSON string of the project structure and a status message.
         """
-        directory = QFileDialog.getExistingDirectory(None, "Choose project directory")
+        if directory is None:
+            directory = self.choose_directory()
         if directory:
             try:
-                project_structure = build_project_structure(directory)
-                with open(ADMINS_FILE_PATH, "w", encoding="utf-8") as file:
-                    json.dump(project_structure, file, indent=4)
-                return (
-                    json.dumps(project_structure, indent=4),
-                    "Admins JSON created successfully",
+                skipped = []
+                project_structure = build_project_structure(
+                    directory, progress=progress, cancel=cancel, skipped=skipped
                 )
+                for project in project_structure["projects"]:
+                    self.backend.upsert(project)
+                message = "Admins JSON created successfully"
+                if skipped:
+                    message += (
+                        f" ({len(skipped)} file(s) over the size limit skipped: "
+                        f"{', '.join(rel_path for rel_path, _size in skipped)})"
+                    )
+                text = json.dumps(project_structure, indent=4, default=json_default)
+                return text, message
+            except CancelledError:
+                return None, "Template creation cancelled"
             except (AdminDataError, DirectoryError, ProjectError) as e:
                 return None, f"Error creating project structure: {str(e)}"
             except (IOError, json.JSONDecodeError) as e:
@@ -51,6 +99,8 @@ class TemplateManager:
 
 
 
+    @timed("TemplateManager.update_template")
+    @observed("TemplateManager.update_template")
     def update_template(self, json_text):
         """
         Updates the existing template with the provided JSON text.
@@ -64,8 +114,7 @@ class TemplateManager:
         if json_text:
             try:
                 data = json.loads(json_text)
-                with open(ADMINS_FILE_PATH, "w", encoding="utf-8") as file:
-                    json.dump(data, file, indent=4)
+                self.backend.update(data, **self.write_options)
                 return "Admins JSON updated successfully"
             except json.JSONDecodeError:
                 return "Invalid JSON format"
@@ -73,6 +122,8 @@ class TemplateManager:
                 return f"Error updating admins JSON: {str(e)}"
 
 
+    @timed("TemplateManager.delete_specific_technology")
+    @observed("TemplateManager.delete_specific_technology")
     def delete_specific_technology(self, technology):
         """
         Deletes all projects with the specified technology from the JSON file.
@@ -84,17 +135,9 @@ class TemplateManager:
             Status message indicating success or failure.
         """
         try:
-            with open(ADMINS_FILE_PATH, "r", encoding="utf-8") as file:
-                json_data = json.load(file)
-
-            json_data["projects"] = [
-                project
-                for project in json_data.get("projects", [])
-                if project["technology"] != technology
-            ]
-
-            with open(ADMINS_FILE_PATH, "w", encoding="utf-8") as file:
-                json.dump(json_data, file, indent=4)
+            if self.backend.load() is None:
+                return "Admins JSON file not found"
+            self.backend.delete(technology)
 
             return f"{technology} technology removed successfully."
         except FileNotFoundError:
@@ -102,6 +145,8 @@ class TemplateManager:
         except (AdminDataError, DirectoryError, ProjectError) as e:
             return f"Error updating admins JSON: {str(e)}"
 
+    @timed("TemplateManager.serialize_template")
+    @observed("TemplateManager.serialize_template")
     def serialize_template(self, json_text, file_name):
         """
         Serializes the JSON text to a specified file.
@@ -126,34 +171,53 @@ class TemplateManager:
                     return f"Error serializing admins JSON: {str(e)}"
         return None
 
+    @timed("TemplateManager.load_json_data")
+    @observed("TemplateManager.load_json_data")
     def load_json_data(self):
         """
-        Loads JSON data from the admins file.
+        Loads the catalog data from the storage backend.
 
         Returns:
             Loaded JSON data or None if file does not exist.
         """
         try:
-            if os.path.exists(ADMINS_FILE_PATH):
-                with open(ADMINS_FILE_PATH, "r", encoding="utf-8") as file:
-                    return json.load(file)
-            else:
-                return None
+            return self.backend.load()
         except (IOError, json.JSONDecodeError) as e:
             return f"Error handling file or JSON: {str(e)}"
         return None
 
-    def populate_technology_selector(self, combo_box):
+    @timed("TemplateManager.load_editor_state")
+    @observed("TemplateManager.load_editor_state")
+    def load_editor_state(self):
+        """
+        Reads what the window shows: the catalog as indented JSON and its technologies.
+
+        Returns:
+            Tuple (JSON text or None, list of technologies or None).
+        """
+        json_data = self.load_json_data()
+        json_text = (
+            json.dumps(json_data, indent=4, default=json_default) if json_data else None
+        )
+        try:
+            technologies = self.backend.technologies()
+        except (IOError, json.JSONDecodeError):
+            technologies = None
+        return json_text, technologies
+
+    def populate_technology_selector(self, combo_box, technologies=None):
         """
         Populates the QComboBox with technologies from the JSON file.
 
         Args:
             combo_box: QComboBox widget to be populated.
+            technologies: Technologies already read on a worker thread, if any.
         """
-        json_data = self.load_json_data()
-        if json_data:
-            technologies = {
-                project.get("technology") for project in json_data.get("projects", [])
-            }
+        if technologies is None:
+            try:
+                technologies = self.backend.technologies()
+            except (IOError, json.JSONDecodeError):
+                return
+        if technologies:
             combo_box.clear()
-            combo_box.addItems(sorted(technologies))
+            combo_box.addItems(technologies)
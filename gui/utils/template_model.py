@@ -0,0 +1,238 @@
+"""
+This module provides a lazily loaded tree model of the template catalog.
+
+TemplateTreeModel is a QAbstractItemModel whose top-level rows are the
+technologies of the catalog. The project of a technology is only read from
+the storage backend when its row is expanded, and the rows of every folder
+are created in batches through canFetchMore/fetchMore, so a view only holds
+items for what has been scrolled into view. File bodies are not part of the
+tree: file_body returns one for a side pane, and set_file_body writes one
+edited file back through CatalogBackend.replace_node. find fetches the rows
+down to a search hit.
+
+Classes:
+- TemplateTreeModel: Item model over the project trees of the catalog.
+"""
+
+from PyQt5.QtCore import QAbstractItemModel, QModelIndex, Qt
+from db.blobs import get_blob_store
+
+# Number of child rows created by one fetchMore call
+FETCH_BATCH = 200
+
+# Node keys describing how a file body is stored; replaced on write-back
+_BODY_KEYS = ("content", "blob", "size", "binary")
+
+
+class _Item:
+    """One row of the model: a technology, or a node of its project tree."""
+
+    __slots__ = ("parent", "row", "technology", "path", "node", "children", "source")
+
+    def __init__(self, parent, row, technology, path=(), node=None):
+        """
+        :param parent: The parent item (None for the invisible root).
+        :param row: The row of the item under its parent.
+        :param technology: The technology the item belongs to.
+        :param path: Names from the root of the project tree down to the node.
+        :param node: The tree node, or None for a technology row.
+        """
+        self.parent = parent
+        self.row = row
+        self.technology = technology
+        self.path = path
+        self.node = node
+        self.children = []
+        # Child nodes not yet turned into items; None until the project is read
+        self.source = node.get("children", []) if node is not None else None
+
+    def is_folder(self):
+        """Return True for technology rows and folder nodes."""
+        return self.node is None or bool(self.node.get("is_folder"))
+
+
+def _body_size(node):
+    """Return the size in bytes of a file node's body."""
+    if "size" in node:
+        return node["size"]
+    return len((node.get("content") or "").encode("utf-8"))
+
+
+class TemplateTreeModel(QAbstractItemModel):
+    """
+    Two-column (name, size) tree of the technologies and their project trees.
+    """
+
+    HEADERS = ("Name", "Size")
+
+    def __init__(self, backend, parent=None):
+        """
+        Initializes the model.
+
+        :param backend: The CatalogBackend the projects are read from and written to.
+        :param parent: The parent QObject.
+        """
+        super().__init__(parent)
+        self.backend = backend
+        self.root = _Item(None, 0, None)
+
+    def reload(self, technologies):
+        """
+        Resets the model to the given technologies; their projects are read on expand.
+
+        :param technologies: Technology names, e.g. read on a worker thread.
+        """
+        self.beginResetModel()
+        self.root = _Item(None, 0, None)
+        self.root.children = [
+            _Item(self.root, row, technology)
+            for row, technology in enumerate(technologies or [])
+        ]
+        self.endResetModel()
+
+    def _item(self, index):
+        """Return the item of an index, the root for an invalid one."""
+        return index.internalPointer() if index.isValid() else self.root
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        return self.createIndex(row, column, self._item(parent).children[row])
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self.root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self._item(parent).children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        item = self._item(parent)
+        if item is self.root:
+            return bool(item.children)
+        if not item.is_folder():
+            return False
+        return bool(item.children) or item.source is None or bool(item.source)
+
+    def canFetchMore(self, parent):
+        item = self._item(parent)
+        if item is self.root or not item.is_folder():
+            return False
+        return item.source is None or len(item.children) < len(item.source)
+
+    def fetchMore(self, parent):
+        """Creates the next FETCH_BATCH child rows, reading the project if needed."""
+        item = self._item(parent)
+        if item.source is None:
+            project = self.backend.get(item.technology)
+            item.source = project.get("project_tree", []) if project else []
+        start = len(item.children)
+        end = min(len(item.source), start + FETCH_BATCH)
+        if end <= start:
+            return
+        self.beginInsertRows(parent, start, end - 1)
+        for row in range(start, end):
+            node = item.source[row]
+            item.children.append(
+                _Item(item, row, item.technology, item.path + (node["name"],), node)
+            )
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = index.internalPointer()
+        if role == Qt.DisplayRole:
+            if index.column() == 0:
+                return item.technology if item.node is None else item.node["name"]
+            if not item.is_folder():
+                return str(_body_size(item.node))
+            return None
+        if role == Qt.ToolTipRole:
+            return "/".join((item.technology,) + item.path)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def find(self, technology, path):
+        """
+        Returns the index of a node, fetching the rows down to it as needed.
+
+        :param technology: The technology of the node.
+        :param path: Names from the root of the project tree down to the node.
+        :return: The index of the node, invalid if it does not exist.
+        """
+        item = next(
+            (child for child in self.root.children if child.technology == technology),
+            None,
+        )
+        if item is None:
+            return QModelIndex()
+        index = self.createIndex(item.row, 0, item)
+        for name in path:
+            checked, child = 0, None
+            while child is None:
+                child = next(
+                    (c for c in item.children[checked:] if c.node["name"] == name),
+                    None,
+                )
+                checked = len(item.children)
+                if child is None:
+                    if not self.canFetchMore(index):
+                        return QModelIndex()
+                    self.fetchMore(index)
+            item, index = child, self.createIndex(child.row, 0, child)
+        return index
+
+    def file_body(self, index):
+        """
+        Returns the body of the file at index for the side pane.
+
+        :param index: Index of a file row.
+        :return: Tuple (text, editable); text is None for folders and technologies.
+        """
+        item = self._item(index)
+        if item.is_folder():
+            return None, False
+        node = item.node
+        if "content" in node:
+            return node["content"] or "", True
+        if not node.get("binary") and "blob" in node:
+            try:
+                return get_blob_store().get(node["blob"]).decode("utf-8"), True
+            except (OSError, UnicodeDecodeError):
+                pass
+        return f"<binary file, {_body_size(node)} bytes>", False
+
+    def set_file_body(self, index, text):
+        """
+        Writes an edited file body back to the backend, touching only that node.
+
+        :param index: Index of a file row.
+        :param text: The new body.
+        :return: True if the node was written.
+        """
+        item = self._item(index)
+        if item.is_folder():
+            return False
+        node = {key: value for key, value in item.node.items() if key not in _BODY_KEYS}
+        node["content"] = text
+        if not self.backend.replace_node(item.technology, list(item.path), node):
+            return False
+        item.node = node
+        self.dataChanged.emit(
+            index.sibling(index.row(), 0), index.sibling(index.row(), 1)
+        )
+        return True
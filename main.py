@@ -3,32 +3,95 @@ main.py
 
 This module contains the entry point for the LazyProject application. 
 It allows you to run either the GUI version or the console version based on command-line arguments.
+With --profile, a per-phase timing breakdown is printed when the run ends
+(see app.profiling).
 """
 
 import sys
+import time
 import argparse
-from PyQt5.QtWidgets import QApplication
-from gui import LazyProjectGUI
-from app import main as console_main
 
 
 def run_gui():
     """
     Initialize and run the LazyProject GUI application.
+
+    PyQt5 and the gui package are imported here so the console path never loads Qt.
     """
+    from PyQt5.QtWidgets import QApplication
+    from gui import LazyProjectGUI
+
     app = QApplication(sys.argv)
     window = LazyProjectGUI()
     window.show()
     sys.exit(app.exec_())
 
 
-def run_console():
+def run_console(profiling=False):
     """
     Run the LazyProject console application.
+
+    The command runs on the daemon when one is serving (see run_server), and in
+    this process otherwise, with --no-daemon or when profiling.
     """
+    from client import forward
+
+    status = None if profiling else forward(sys.argv[1:])
+    if status is not None:
+        sys.exit(status)
+
+    from app import main as console_main
+
     sys.exit(console_main())
 
 
+def run_server(metrics_port=None):
+    """
+    Run the LazyProject daemon, which keeps the catalog loaded and runs the
+    console commands of other processes.
+
+    With metrics_port, its metrics are also served over HTTP for scraping.
+    """
+    from app import ProjectError
+    from app.daemon import serve
+
+    try:
+        serve(metrics_port=metrics_port)
+    except ProjectError as e:
+        print(f"Error: {e.message}")
+        sys.exit(1)
+
+
+def print_metrics(fmt):
+    """Print the metrics of the running daemon (see app.metrics)."""
+    from client import fetch_metrics
+
+    status = fetch_metrics(fmt)
+    if status is None:
+        print("Error: no daemon is running (start one with --serve).")
+        sys.exit(1)
+    sys.exit(status)
+
+
+def start_profiling(args):
+    """
+    Enable the profiling spans for this run.
+
+    The imports of the app package, which the profiling module is part of, are
+    timed here and reported as the "import" phase.
+    """
+    started = time.perf_counter_ns()
+    from app import profiling
+
+    profiling.enable(
+        cprofile_path=args.profile_cprofile,
+        tracemalloc_path=args.profile_tracemalloc,
+        started=started,
+    )
+    profiling.record("import", (time.perf_counter_ns() - started) / 1e9)
+    return profiling
+
+
 def main():
     """
     Main function to parse arguments and run the appropriate version of the application.
@@ -42,16 +105,68 @@ def main():
         action="store_true",
         help="Run the console version of the application.",
     )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run the daemon serving console commands over a Unix socket.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="With --serve, also serve the metrics over HTTP on localhost:PORT.",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Print the metrics of the running daemon.",
+    )
+    parser.add_argument(
+        "--metrics-format",
+        choices=("prometheus", "json"),
+        default="prometheus",
+        help="Format of --metrics: Prometheus text (default) or JSON.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a per-phase timing breakdown to stderr when the run ends.",
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        metavar="FILE",
+        help="With --profile, also write cProfile stats (pstats format) to FILE.",
+    )
+    parser.add_argument(
+        "--profile-tracemalloc",
+        metavar="FILE",
+        help="With --profile, also write the top allocation sites to FILE.",
+    )
 
-    args = parser.parse_args()
+    # The console command and its options are read from sys.argv by app.manage.
+    args, rest = parser.parse_known_args()
 
-    if args.gui:
-        run_gui()
-    elif args.console:
-        run_console()
-    else:
-        print("Please specify either --gui or --console.")
-        sys.exit(1)
+    profiling = None
+    if args.profile or args.profile_cprofile or args.profile_tracemalloc:
+        # app.manage must not see the profiling options or their values
+        sys.argv = [sys.argv[0], *rest]
+        profiling = start_profiling(args)
+
+    try:
+        if args.gui:
+            run_gui()
+        elif args.console:
+            run_console(profiling is not None)
+        elif args.serve:
+            run_server(args.metrics_port)
+        elif args.metrics:
+            print_metrics(args.metrics_format)
+        else:
+            print("Please specify either --gui, --console, --serve or --metrics.")
+            sys.exit(1)
+    finally:
+        if profiling is not None:
+            profiling.finish()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+"""
+Tests of ASAR unpacking (app.admin.archive_adm) with crafted headers.
+
+Run with:
+    python -m pytest tests
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import app  # noqa: F401  (app must be imported before db, see db.db)
+from app.admin.archive_adm import pack_template, unpack_template
+from app.settings import ArchiveError
+
+
+def write_archive(archive_path, files, data=b"owned\n"):
+    """Write an archive with the given header "files" mapping and data section."""
+    header = json.dumps({"files": files}).encode("utf-8")
+    padded = (len(header) + 3) & ~3
+    header_pickle = (
+        struct.pack("<II", 4 + padded, len(header))
+        + header
+        + b"\0" * (padded - len(header))
+    )
+    with open(archive_path, "wb") as archive:
+        archive.write(struct.pack("<II", 4, len(header_pickle)))
+        archive.write(header_pickle)
+        archive.write(data)
+
+
+def body(size=6):
+    """Return the header entry of a file body at the start of the data section."""
+    return {"offset": "0", "size": size}
+
+
+class UnpackTest(unittest.TestCase):
+    """unpack_template only writes below the project directory."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="lazy_archive_")
+        self.addCleanup(shutil.rmtree, self.root)
+        self.target = os.path.join(self.root, "target", "deep")
+        os.makedirs(self.target)
+        self.archive_path = os.path.join(self.root, "template.asar")
+
+    def unpack(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            unpack_template(self.archive_path, self.target, "demo_app")
+
+    def written_files(self):
+        """Return every file under root but the archive."""
+        paths = set()
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                paths.add(os.path.relpath(os.path.join(directory, name), self.root))
+        paths.discard("template.asar")
+        return paths
+
+    def test_round_trip(self):
+        tree = [
+            {"name": "run.py", "is_folder": False, "content": "print(1)\n"},
+            {
+                "name": "pkg",
+                "is_folder": True,
+                "children": [{"name": "a.txt", "is_folder": False, "content": "a"}],
+            },
+        ]
+        pack_template(tree, self.archive_path)
+        self.unpack()
+        with open(os.path.join(self.target, "demo_app", "run.py")) as file:
+            self.assertEqual(file.read(), "print(1)\n")
+        # Nested files land where deserialize puts them, below the folder
+        nested = os.walk(os.path.join(self.target, "demo_app", "pkg"))
+        self.assertIn("a.txt", {name for _, _, names in nested for name in names})
+
+    def test_malicious_names(self):
+        absolute = os.path.join(self.root, "absolute.txt")
+        headers = {
+            "parent": {"..": {"files": {"escape.txt": body()}}},
+            "parent file": {"..": body()},
+            "traversal": {"../../escape.txt": body()},
+            "absolute": {absolute: body()},
+            "separator": {"pkg/escape.txt": body()},
+            "backslash": {"..\\escape.txt": body()},
+            "nul": {"a\0b.txt": body()},
+            "dot": {".": {"files": {"escape.txt": body()}}},
+            "empty": {"": body()},
+            "nested": {"pkg": {"files": {"..": {"files": {"x.txt": body()}}}}},
+        }
+        for case, files in headers.items():
+            with self.subTest(case):
+                write_archive(self.archive_path, files)
+                with self.assertRaises(ArchiveError) as raised:
+                    self.unpack()
+                self.assertIn("invalid entry name", raised.exception.message)
+                self.assertEqual(self.written_files(), set())
+
+    def test_body_outside_archive(self):
+        write_archive(self.archive_path, {"a.txt": {"offset": "-16", "size": 6}})
+        with self.assertRaises(ArchiveError):
+            self.unpack()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,258 @@
+"""
+Tests of the ignore rules (app.admin.ignore_adm), checked against git.
+
+Every case writes a small tree, serializes it with scan_tree and compares the
+files kept with those git lists as untracked and not ignored
+(git ls-files --others --exclude-standard) in a fresh repository holding the
+same tree. Git does not read .lazyignore files, so in the tree given to git
+the rules of each .lazyignore are appended to the .gitignore of the same
+directory, where they have the same, highest, priority.
+
+Run with:
+    python -m pytest tests
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+import app  # noqa: F401  (app must be imported before db, see db.db)
+from app.admin.ignore_adm import IgnoreMatcher
+from app.admin.serialize_adm import scan_tree
+
+
+def write_tree(root, files):
+    """Write files, a dict of relative path to content, under root."""
+    for rel_path, content in files.items():
+        file_path = os.path.join(root, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+
+def git_tree(files):
+    """Return files with every .lazyignore also appended to its .gitignore."""
+    result = dict(files)
+    for rel_path, content in files.items():
+        directory, _, name = rel_path.rpartition("/")
+        if name == ".lazyignore":
+            gitignore = f"{directory}/.gitignore" if directory else ".gitignore"
+            result[gitignore] = result.get(gitignore, "") + "\n" + content
+    return result
+
+
+def git_files(root):
+    """Return the files git lists as untracked and not ignored under root."""
+    env = dict(
+        os.environ,
+        GIT_CONFIG_GLOBAL=os.devnull,
+        GIT_CONFIG_NOSYSTEM="1",
+        GIT_DIR=os.path.join(root, ".git"),
+        GIT_WORK_TREE=root,
+    )
+    subprocess.run(["git", "init", "-q", root], check=True, env=env)
+    output = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+        cwd=root,
+        env=env,
+        check=True,
+        capture_output=True,
+    ).stdout
+    return {path for path in output.decode("utf-8").split("\0") if path}
+
+
+def scanned_files(tree, prefix=""):
+    """Return the relative paths of the files of a scan_tree tree."""
+    paths = set()
+    for node in tree:
+        if node.get("is_folder"):
+            paths |= scanned_files(node["children"], f"{prefix}{node['name']}/")
+        else:
+            paths.add(prefix + node["name"])
+    return paths
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class ScanTreeMatchesGitTest(unittest.TestCase):
+    """scan_tree keeps exactly the files git does not ignore."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="lazy_ignore_")
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def assertMatchesGit(self, files, exclude=None):
+        """Compare scan_tree and git on a tree, and check the tree is not trivial."""
+        scan_root = os.path.join(self.root, "scan")
+        git_root = os.path.join(self.root, "git")
+        write_tree(scan_root, files)
+        write_tree(git_root, git_tree(files))
+        expected = git_files(git_root)
+        if exclude is not None:
+            write_tree(scan_root, {".git/info/exclude": exclude})
+            write_tree(git_root, {".git/info/exclude": exclude})
+            expected = git_files(git_root)
+        self.assertEqual(scanned_files(scan_tree(scan_root)), expected)
+        # Every case must ignore something and keep something
+        self.assertTrue(expected)
+        self.assertLess(len(expected), len(files))
+        return expected
+
+    def test_negation(self):
+        kept = self.assertMatchesGit(
+            {
+                ".gitignore": "*.log\n!keep.log\nbuild/\n!build/inside.txt\n",
+                "a.log": "",
+                "keep.log": "",
+                "sub/b.log": "",
+                "sub/keep.log": "",
+                "build/inside.txt": "",
+                "notes.txt": "",
+            }
+        )
+        # A file in an ignored directory cannot be re-included
+        self.assertNotIn("build/inside.txt", kept)
+        self.assertIn("sub/keep.log", kept)
+
+    def test_negation_order(self):
+        self.assertMatchesGit(
+            {
+                ".gitignore": "!first.txt\n*.txt\n!last.txt\n",
+                "first.txt": "",
+                "last.txt": "",
+                "other.txt": "",
+                "other.md": "",
+            }
+        )
+
+    def test_dir_only(self):
+        kept = self.assertMatchesGit(
+            {
+                ".gitignore": "out/\ncache/\n",
+                "out/result.txt": "",
+                "sub/out": "a file, not a directory",
+                "a/b/cache/entry": "",
+                "cache.txt": "",
+            }
+        )
+        self.assertIn("sub/out", kept)
+
+    def test_double_star(self):
+        self.assertMatchesGit(
+            {
+                ".gitignore": "**/gen/*.txt\ndocs/**/draft.md\nlogs/**\na/**/b\n",
+                "gen/x.txt": "",
+                "src/gen/y.txt": "",
+                "src/gen/keep.py": "",
+                "docs/draft.md": "",
+                "docs/v1/old/draft.md": "",
+                "docs/final.md": "",
+                "logs/today/run.log": "",
+                "logs.txt": "",
+                "a/b": "",
+                "a/x/y/b": "",
+                "a/bb": "",
+            }
+        )
+
+    def test_anchored_and_unanchored(self):
+        self.assertMatchesGit(
+            {
+                ".gitignore": "/root.txt\nname.txt\nsub/x.txt\n/top/\n*.tmp\n",
+                "root.txt": "",
+                "deep/root.txt": "",
+                "name.txt": "",
+                "deep/er/name.txt": "",
+                "sub/x.txt": "",
+                "deep/sub/x.txt": "",
+                "top/a": "",
+                "deep/top/a": "",
+                "deep/er/scratch.tmp": "",
+            }
+        )
+
+    def test_globs(self):
+        self.assertMatchesGit(
+            {
+                ".gitignore": "[0-9]*.dat\nfile?.c\n*.[ch]pp\n\\#hash\n",
+                "1.dat": "",
+                "x1.dat": "",
+                "file1.c": "",
+                "file12.c": "",
+                "a.cpp": "",
+                "a.hpp": "",
+                "a.opp": "",
+                "#hash": "",
+            }
+        )
+
+    def test_nested_gitignore(self):
+        kept = self.assertMatchesGit(
+            {
+                ".gitignore": "*.md\nlocal.txt\n",
+                "README.md": "",
+                "local.txt": "",
+                "sub/.gitignore": "!README.md\n/only_here.txt\n",
+                "sub/README.md": "",
+                "sub/only_here.txt": "",
+                "sub/deeper/only_here.txt": "",
+                "sub/deeper/README.md": "",
+                "sub/local.txt": "",
+                "other/README.md": "",
+            }
+        )
+        # Patterns with a "/" are relative to the directory of their file
+        self.assertIn("sub/deeper/only_here.txt", kept)
+
+    def test_lazyignore(self):
+        kept = self.assertMatchesGit(
+            {
+                ".gitignore": "*.log\n",
+                ".lazyignore": "!important.log\nsecret/\n",
+                "debug.log": "",
+                "important.log": "",
+                "secret/key": "",
+                "sub/.gitignore": "!*.log\n",
+                "sub/.lazyignore": "trace.log\n",
+                "sub/trace.log": "",
+                "sub/run.log": "",
+                "sub/secret/key": "",
+            }
+        )
+        self.assertIn("important.log", kept)
+        self.assertNotIn("sub/trace.log", kept)
+
+    def test_info_exclude(self):
+        self.assertMatchesGit(
+            {".gitignore": "!kept.bak\n", "a.bak": "", "kept.bak": "", "a.txt": ""},
+            exclude="*.bak\n",
+        )
+
+
+class IgnoreMatcherTest(unittest.TestCase):
+    """IgnoreMatcher without a scan."""
+
+    def test_defaults(self):
+        matcher = IgnoreMatcher()
+        self.assertTrue(matcher.ignored("node_modules", "node_modules", True))
+        self.assertFalse(matcher.ignored("node_modules", "node_modules", False))
+        self.assertTrue(matcher.ignored("pkg/mod.pyc", "mod.pyc", False))
+        self.assertFalse(matcher.ignored("pkg/mod.py", "mod.py", False))
+
+    def test_enter_reads_ignore_files(self):
+        root = tempfile.mkdtemp(prefix="lazy_ignore_")
+        self.addCleanup(shutil.rmtree, root)
+        write_tree(root, {"sub/.gitignore": "*.txt\n", "sub/.lazyignore": "!a.txt\n"})
+        matcher = IgnoreMatcher()
+        self.assertIs(matcher.enter(root, "", {"sub"}), matcher)
+        sub = matcher.enter(
+            os.path.join(root, "sub"), "sub/", {".gitignore", ".lazyignore"}
+        )
+        self.assertTrue(sub.ignored("sub/b.txt", "b.txt", False))
+        self.assertFalse(sub.ignored("sub/a.txt", "a.txt", False))
+        self.assertFalse(matcher.ignored("sub/b.txt", "b.txt", False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+Tests of the catalog-backed settings (app.settings) on compressed catalogs.
+
+Run with:
+    python -m pytest tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import app  # noqa: F401  (app must be imported before db, see db.db)
+from app import settings
+from app.settings import AdminDataError, UsageError, load_technologies
+from db.catalog import write_catalog
+
+# A technology TemplateCommands already has, so none is added to the enum
+CATALOG = {"technologies": ["flask"], "projects": []}
+
+
+class CompressedCatalogTest(unittest.TestCase):
+    """The technologies and the usage message survive a compressed catalog."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="lazy_settings_")
+        self.addCleanup(shutil.rmtree, self.root)
+        self.file_path = os.path.join(self.root, "admins.json")
+
+    def test_load_technologies(self):
+        for codecs in ({}, {"stream_codec": "zlib"}, {"stream_codec": "lzma"}):
+            with self.subTest(**codecs):
+                write_catalog(self.file_path, CATALOG, **codecs)
+                self.assertEqual(load_technologies(self.file_path), ["flask"])
+
+    def test_usage_error(self):
+        write_catalog(self.file_path, CATALOG, stream_codec="zlib")
+        with mock.patch.object(settings, "ADMINS_FILE_PATH", self.file_path):
+            with mock.patch.object(settings, "_technologies", None):
+                message = UsageError().message
+        self.assertIn("Usage: python main.py", message)
+        self.assertIn("flask", message.splitlines()[-1])
+
+    def test_invalid_catalog(self):
+        with open(self.file_path, "wb") as file:
+            file.write(b"{\xff")
+        with self.assertRaises(AdminDataError):
+            load_technologies(self.file_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
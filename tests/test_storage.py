@@ -0,0 +1,64 @@
+"""
+Tests of the storage backends (db.storage) on a fresh SQLite catalog.
+
+Run with:
+    python -m pytest tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import app  # noqa: F401  (app must be imported before db, see db.db)
+from db import storage
+from db.catalog import write_catalog
+
+CATALOG = {
+    "projects": [
+        {
+            "id": 1,
+            "technology": "flask",
+            "project_tree": [{"name": "run.py", "is_folder": False, "content": ""}],
+        }
+    ]
+}
+
+
+class SqliteFirstUseTest(unittest.TestCase):
+    """get_backend fills a database that was never saved from admins.json."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="lazy_storage_")
+        self.addCleanup(shutil.rmtree, self.root)
+        self.json_path = os.path.join(self.root, "admins.json")
+        self.sqlite_path = os.path.join(self.root, "admins.sqlite3")
+        for name, path in (
+            ("ADMINS_FILE_PATH", self.json_path),
+            ("SQLITE_FILE_PATH", self.sqlite_path),
+        ):
+            patcher = mock.patch.object(storage, name, path)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_imports_json_catalog(self):
+        write_catalog(self.json_path, CATALOG)
+        backend = storage.get_backend("sqlite")
+        self.assertTrue(backend.exists())
+        self.assertEqual(backend.technologies(), ["flask"])
+        self.assertEqual(backend.get("flask")["project_tree"][0]["name"], "run.py")
+
+    def test_keeps_saved_database(self):
+        write_catalog(self.json_path, CATALOG)
+        storage.open_backend(self.sqlite_path).save({"projects": []})
+        self.assertEqual(storage.get_backend("sqlite").technologies(), [])
+
+    def test_without_json_catalog(self):
+        backend = storage.get_backend("sqlite")
+        self.assertFalse(backend.exists())
+        self.assertIsNone(backend.load())
+
+
+if __name__ == "__main__":
+    unittest.main()